@@ -0,0 +1,300 @@
+"""
+Adaptive question selection (opt-in with ``ADAPTIVE_SELECTION=1``).
+
+A Rasch (1-parameter IRT) model scored Elo-style: a student answers a
+question correctly with probability ``sigmoid(theta - b)``, where ``theta``
+is their ability and ``b`` the question's difficulty.
+
+- Abilities live in the session as an ``Ability``: one overall ``theta`` plus
+  one per (topic, subtopic) group the student has answered, each with an
+  answer count. A group estimate is shrunk towards the overall one until the
+  student has answered a few questions in it.
+- Question difficulties start from the calibrated p-value where the
+  calibration job (``calibration``) has one, else from the bank's difficulty
+  label (``LEVEL_PRIORS``), plus an offset learned from graded answers.
+- Each graded answer nudges both by ``k * (correct - p)``, with ``k``
+  shrinking as counts grow: O(answers) work per submission.
+- The next batch is the unused questions with the highest Fisher information
+  ``p * (1 - p)`` (those the student gets right about half the time), at most
+  ``MAX_PER_GROUP`` of ``num`` from one group so a batch still covers
+  several topics.
+
+Learned offsets and answer counts are saved next to the bank (see
+``BankStore.sidecar_path``) as a small ``.npz`` of two arrays. Every
+``ADAPTIVE_FLUSH_INTERVAL`` seconds (and at exit) a process adds what it has
+learned since its last save to the file under a lock and reloads the
+result, so gunicorn workers pool their updates and estimates survive
+restarts and deploys.
+
+The session's ``difficulty`` becomes the level whose prior is closest to
+the overall ability, so reports and the /submit responses keep their
+"Very easy" .. "Difficult" vocabulary. /submit answers ``success`` when the
+level goes up, ``fail`` when it goes down and ``continue`` when it stays.
+"""
+
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+ENABLED = os.getenv("ADAPTIVE_SELECTION", "0").lower() in ("1", "true", "yes")
+
+LEVELS = ("Very easy", "Easy", "Moderate", "Difficult")
+LEVEL_PRIORS = {"very easy": -1.5, "easy": -0.5, "moderate": 0.5, "difficult": 1.5}
+START_THETA = LEVEL_PRIORS["very easy"]
+MASTERY_SCORE = int(os.getenv("ADAPTIVE_MASTERY_SCORE", 8))
+MAX_PER_GROUP = 0.4  # share of a batch one (topic, subtopic) group may take
+FLUSH_INTERVAL = float(os.getenv("ADAPTIVE_FLUSH_INTERVAL", 30))
+
+STUDENT_K = 0.6
+GROUP_K = 0.8
+ITEM_K = 0.2
+SHRINK = 5  # group answers at which group and overall estimates weigh the same
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on ``path`` across processes: ``flock``, or ``msvcrt.locking`` on Windows."""
+    with open(path, "w") as f:
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # gave up after ~10 s of retries; keep waiting
+                    continue
+            try:
+                yield
+            finally:
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield  # released when the file is closed
+
+
+def level_rank(level):
+    """Index of ``level`` in ``LEVELS`` (case-insensitive), -1 if unknown."""
+    names = [name.lower() for name in LEVELS]
+    return names.index(level.lower()) if isinstance(level, str) and level.lower() in names else -1
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _k(base, count):
+    return base / (1.0 + 0.1 * count)
+
+
+class Ability:
+    """A student's overall and per-group ability estimates."""
+
+    __slots__ = ("theta", "count", "groups")
+
+    def __init__(self, theta=START_THETA, count=0, groups=None):
+        self.theta = theta
+        self.count = count
+        self.groups = groups or {}  # group code -> [theta, count]
+
+    def group_theta(self, code):
+        entry = self.groups.get(code)
+        if entry is None:
+            return self.theta
+        theta, count = entry
+        weight = count / (count + SHRINK)
+        return weight * theta + (1 - weight) * self.theta
+
+    def thetas(self, codes):
+        """Ability for each group code in ``codes`` (-1: ungrouped, overall ability)."""
+        out = np.full(len(codes), self.theta, dtype=float)
+        for code in self.groups:
+            out[codes == code] = self.group_theta(code)
+        return out
+
+    def level(self):
+        return min(LEVELS, key=lambda level: abs(LEVEL_PRIORS[level.lower()] - self.theta))
+
+    def to_dict(self):
+        return {
+            "t": round(self.theta, 4),
+            "n": self.count,
+            "g": {str(code): [round(theta, 4), n] for code, (theta, n) in self.groups.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data:
+            return cls()
+        groups = {int(code): list(entry) for code, entry in data.get("g", {}).items()}
+        return cls(data.get("t", START_THETA), data.get("n", 0), groups)
+
+
+class ItemDifficulties:
+    """Per-question difficulty for one bank: calibrated or label prior plus a learned offset."""
+
+    def __init__(self, bank, stats=None, path=None):
+        self.path = path
+        self.prior = np.zeros(len(bank), dtype=np.float32)
+        for level, positions in bank.levels.items():
+            self.prior[positions] = LEVEL_PRIORS.get(level, 0.0)
+        if stats is not None:
+            # Rasch difficulty of a question a typical student gets right with probability p.
+            known = ~np.isnan(stats.p_value)
+            p = np.clip(stats.p_value[known], 0.02, 0.98)
+            self.prior[known] = np.log((1 - p) / p)
+        self.offset = np.zeros(len(bank), dtype=np.float32)
+        self.count = np.zeros(len(bank), dtype=np.uint32)
+        # Learned here since the last save; added to the shared file on ``save``.
+        self._delta = np.zeros(len(bank), dtype=np.float32)
+        self._new = np.zeros(len(bank), dtype=np.uint32)
+        self.saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        if path is not None:
+            saved = self._read()
+            if saved is not None:
+                self.offset, self.count = saved
+
+    def difficulty(self, positions=None):
+        if positions is None:
+            return self.prior + self.offset
+        return self.prior[positions] + self.offset[positions]
+
+    def learn(self, pos, change):
+        # Caller holds ``self._lock``.
+        self.offset[pos] += change
+        self.count[pos] += 1
+        self._delta[pos] += change
+        self._new[pos] += 1
+
+    def _read(self):
+        try:
+            with np.load(self.path) as data:
+                offset, count = data["offset"], data["count"]
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(offset) != len(self.offset):
+            return None
+        return offset.astype(np.float32), count.astype(np.uint32)
+
+    def save(self):
+        """Add what this process learned since the last save to the shared file, then reload it."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._new.any():
+                self.saved_at = time.monotonic()
+                return
+            delta, new = self._delta, self._new
+            self._delta = np.zeros_like(delta)
+            self._new = np.zeros_like(new)
+
+        with _file_lock(f"{self.path}.lock"):
+            saved = self._read()
+            offset, count = saved if saved is not None else (np.zeros_like(delta), np.zeros_like(new))
+            offset = offset + delta
+            count = count + new
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, offset=offset, count=count)
+            os.replace(tmp, self.path)
+
+        with self._lock:
+            # Keep anything learned while the file was being written.
+            self.offset = offset + self._delta
+            self.count = count + self._new
+            self.saved_at = time.monotonic()
+
+
+class AdaptiveEngine:
+    """Updates abilities from graded answers and picks the most informative next batch."""
+
+    def __init__(self, question_stats=None, state_path=None, flush_interval=FLUSH_INTERVAL):
+        """``state_path(bank_id)``: where that bank's learned offsets are saved (None: not saved)."""
+        self.question_stats = question_stats
+        self.state_path = state_path
+        self.flush_interval = flush_interval
+        self._items = {}
+        self._lock = threading.Lock()
+        atexit.register(self.save)
+
+    def save(self):
+        for items in list(self._items.values()):
+            try:
+                items.save()
+            except OSError as e:
+                print("Adaptive state save error:", e)
+
+    def items(self, bank_id, bank):
+        items = self._items.get(bank_id)
+        if items is None:
+            stats = self.question_stats.for_bank(bank_id, bank) if self.question_stats is not None else None
+            with self._lock:
+                path = self.state_path(bank_id) if self.state_path is not None else None
+                items = self._items.setdefault(bank_id, ItemDifficulties(bank, stats, path))
+        return items
+
+    def update(self, bank_id, bank, ability, positions, correct):
+        """Score one submission: ``positions`` of the answered questions and whether each was right."""
+        items = self.items(bank_id, bank)
+        positions = np.asarray(positions, dtype=np.int64)
+        codes = bank.group_codes[positions]
+        with items._lock:
+            for pos, code, right in zip(positions, codes, correct):
+                b = float(items.difficulty(pos))
+                code = int(code)
+                surprise = float(right) - float(_sigmoid(ability.group_theta(code) - b))
+                ability.theta += _k(STUDENT_K, ability.count) * surprise
+                ability.count += 1
+                if code >= 0:
+                    theta, n = ability.groups.get(code, (ability.theta, 0))
+                    ability.groups[code] = [theta + _k(GROUP_K, n) * surprise, n + 1]
+                items.learn(pos, -_k(ITEM_K, items.count[pos]) * surprise)
+        if time.monotonic() - items.saved_at >= self.flush_interval:
+            try:
+                items.save()
+            except OSError as e:
+                print("Adaptive state save error:", e)
+        return ability
+
+    def select(self, bank_id, bank, ability, used, num=10, rng=None):
+        """Positions of the ``num`` unused questions with the most information for ``ability``."""
+        rng = np.random.default_rng(rng)
+        available = used.difference(np.arange(len(bank)))
+        if len(available) < num:
+            used.clear()
+            available = np.arange(len(bank))
+        if not len(available):
+            return available
+
+        items = self.items(bank_id, bank)
+        codes = bank.group_codes[available]
+        p = _sigmoid(ability.thetas(codes) - items.difficulty(available))
+        # A little noise so equally informative questions rotate between batches.
+        info = p * (1 - p) + rng.uniform(0, 1e-3, len(available))
+
+        shortlist = min(len(available), 8 * num)
+        best = np.argpartition(-info, shortlist - 1)[:shortlist]
+        best = best[np.argsort(-info[best], kind="stable")]
+        cap = max(1, int(np.ceil(MAX_PER_GROUP * num)))
+        picked, per_group = [], {}
+        for i in best:
+            code = int(codes[i])
+            if code >= 0 and per_group.get(code, 0) >= cap:
+                continue
+            per_group[code] = per_group.get(code, 0) + 1
+            picked.append(i)
+            if len(picked) == num:
+                break
+        if len(picked) < num:
+            taken = set(picked)
+            picked.extend([i for i in best if i not in taken][:num - len(picked)])
+
+        positions = available[np.array(picked, dtype=np.int64)]
+        used.add(positions)
+        return positions
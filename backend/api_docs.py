@@ -0,0 +1,65 @@
+"""
+Swagger UI and spec (flasgger), loaded on the first docs request.
+
+Importing flasgger and registering its blueprint at startup costs every
+worker a few hundred milliseconds and several MB. ``LazySwagger`` wraps the
+app's WSGI callable instead. Requests under ``DOCS_PREFIXES`` (/apidocs,
+/apispec_1.json, the UI's static files) go to a small Flask app carrying
+the Swagger blueprint, built on the first such request. Its spec is still
+generated from the main app's routes. All other requests go straight
+through.
+
+``API_DOCS=off`` disables the docs entirely.
+"""
+
+import os
+import threading
+
+from flask import Flask
+
+API_DOCS = os.getenv("API_DOCS", "lazy").lower()
+DOCS_PREFIXES = ("/apidocs", "/apispec", "/flasgger_static", "/oauth2-redirect.html")
+
+
+class LazySwagger:
+    def __init__(self, app):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self._docs = None
+        self._lock = threading.Lock()
+        app.wsgi_app = self
+
+    def docs_app(self):
+        if self._docs is None:
+            with self._lock:
+                if self._docs is None:
+                    self._docs = self._build()
+        return self._docs
+
+    def _build(self):
+        from flasgger import Swagger
+
+        main = self.app
+
+        class AppSwagger(Swagger):
+            # Describe the main app's routes, not the docs app's.
+            def get_apispecs(self, endpoint="apispec_1"):
+                with main.app_context():
+                    return super().get_apispecs(endpoint)
+
+        docs = Flask(__name__)
+        docs.config.update(SWAGGER=main.config.get("SWAGGER", {}))
+        AppSwagger(docs)
+        return docs
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO", "").startswith(DOCS_PREFIXES):
+            return self.docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+def init_docs(app):
+    """Serve the API docs for ``app`` according to ``API_DOCS``."""
+    if API_DOCS == "off":
+        return None
+    return LazySwagger(app)
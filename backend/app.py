@@ -1,34 +1,43 @@
 import os
+import json
 import time
-import pandas as pd
-from flask import Flask, request, jsonify, send_file
+from contextlib import closing
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from dotenv import load_dotenv
-import google.generativeai as genai
-from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-from flasgger import Swagger
 
-
-# Import your report generator
-from ml_model import report_generator  # Make sure ml_model/__init__.py exists
+from api_docs import init_docs
+from metrics import instrument, stage
+from llm_gateway import get_gateway
+from report_jobs import QueueFull, ReportJobQueue, cached_report
+from report_store import REPORTS_DIR, download_name
+from bank_storage import BankStore, bank_key_for_stream
+from ingest import IngestError, read_question_bank
+from grading import grade
+from sqlalchemy.exc import IntegrityError
+from database import configure_database, create_tables
+from models import db, User, AnswerRecord
+from passwords import HasherBusy, hasher, issue_token, token_username
+from attempt_log import AttemptWriter, attempt_rows, new_attempt_id
+from sampling import stratified_sample
+from bitset import QuestionBitset
+from session_store import SessionState, create_session_store
+from calibration import QuestionStats
+import adaptive
+from adaptive import AdaptiveEngine, Ability, level_rank
 
 # -------------------- Flask Setup --------------------
 app = Flask(__name__)
 CORS(app)
-Swagger(app) 
+init_docs(app)  # Swagger UI at /apidocs, loaded on first visit
+instrument(app)  # per-route latency + GET /metrics; PROFILE_SLOW_MS enables the profiler
 
 # -------------------- Database Setup --------------------
-DB_PATH = r"users.db"
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{DB_PATH}"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db = SQLAlchemy(app)
+configure_database(app, db)
+create_tables(app, db)
 
-# -------------------- User Model --------------------
-class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
+with app.app_context():
+    # Graded attempts are persisted in batches off the request path.
+    attempt_writer = AttemptWriter(db.engine)
 
 # -------------------- Auth Routes --------------------
 @app.route("/signup", methods=["POST"])
@@ -39,14 +48,23 @@ def signup():
 
     if not username or not password:
         return jsonify({"error": "Username and password required"}), 400
-
-    if User.query.filter_by(username=username).first():
+    if username == ANONYMOUS_SESSION:
+        # Requests without a token share this session key.
         return jsonify({"error": "Username already exists"}), 400
 
-    hashed_pw = generate_password_hash(password)
+    # Insert directly and let the UNIQUE constraint catch duplicates: a
+    # check-then-insert needs two statements and races between workers.
+    try:
+        hashed_pw = hasher.hash(password)
+    except HasherBusy:
+        return jsonify({"error": "Server busy. Please retry shortly."}), 503
     new_user = User(username=username, password=hashed_pw)
     db.session.add(new_user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Username already exists"}), 400
 
     return jsonify({"message": "Signup successful!"})
 
@@ -57,304 +75,310 @@ def login():
     password = data.get("password")
 
     user = User.query.filter_by(username=username).first()
-    if not user or not check_password_hash(user.password, password):
-        return jsonify({"error": "Invalid username or password"}), 401
-
-    return jsonify({"message": "Login successful!", "username": username})
-
-# -------------------- Load Gemini API Key --------------------
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    print("⚠️ No Gemini API key found. Set GOOGLE_API_KEY in .env")
-
-# -------------------- Global Variables --------------------
-dataset = None
-used_questions = {}
-current_difficulty = "Very easy"
-user_sessions = {}
+    try:
+        if not user or not hasher.verify(user.password, password):
+            return jsonify({"error": "Invalid username or password"}), 401
+        if hasher.needs_rehash(user.password):
+            # Hash settings changed since this password was stored.
+            user.password = hasher.hash(password)
+            db.session.commit()
+    except HasherBusy:
+        return jsonify({"error": "Server busy. Please retry shortly."}), 503
+
+    return jsonify({"message": "Login successful!", "username": username, "token": issue_token(username)})
+
+# -------------------- Sessions & Question Banks --------------------
+# Banks are read-only once built and persisted under a content hash, so every
+# worker memory-maps the same files. Per-student state lives in the session
+# store (SESSION_BACKEND=sqlite shares it across gunicorn workers).
+bank_store = BankStore()
+session_store = create_session_store()
+# Per-question statistics from the offline calibration job (calibration.py).
+question_stats = QuestionStats.load()
+# Learned question difficulties are saved next to each bank and shared by workers.
+adaptive_engine = AdaptiveEngine(question_stats,
+                                 state_path=lambda bank_id: bank_store.sidecar_path(bank_id, "adaptive.npz"))
+
+NEXT_LEVEL = {"very easy": "Easy", "easy": "Moderate", "moderate": "Difficult"}
+
+# Key shared by requests that carry no session token (the original single-user mode).
+ANONYMOUS_SESSION = "test_user"
+# Key token-less requests by the posted username, as before /login issued tokens.
+# Anyone can then act as any user; only for old clients on trusted networks.
+LEGACY_USERNAME_SESSIONS = os.environ.get("LEGACY_USERNAME_SESSIONS") == "1"
+
+class InvalidSessionToken(Exception):
+    """Raised by ``session_key`` for a forged or expired session token."""
+
+@app.errorhandler(InvalidSessionToken)
+def invalid_session_token(e):
+    return jsonify({"error": "Session expired or invalid. Please log in again."}), 401
+
+def session_key(data=None):
+    """Username of the session token, else the anonymous (or, in legacy mode, posted username) key."""
+    token = request.headers.get("X-Session-Token")
+    auth = request.headers.get("Authorization", "")
+    if not token and auth.startswith("Bearer "):
+        token = auth[len("Bearer "):]
+    if token:
+        username = token_username(token)
+        if username is None:
+            raise InvalidSessionToken()
+        return username
+    if LEGACY_USERNAME_SESSIONS:
+        username = (data or {}).get("username") or request.form.get("username")
+        return username or ANONYMOUS_SESSION
+    return ANONYMOUS_SESSION
 
 # -------------------- Utility Functions --------------------
-def standardize_dataset(df):
-    df.columns = [c.strip().lower() for c in df.columns]
-    rename_map = {
-        "question_text": ["question_text","questiontext", "question text", "question", "ques", "q"],
-        "option_a": ["optiona", "option a", "a", "a)", "ans_a", "answer_a", "opt1", "option_a","A","A)"],
-        "option_b": ["optionb", "option b", "b", "b)", "ans_b", "answer_b", "opt2", "option_b","B","B)"],
-        "option_c": ["optionc", "option c", "c", "c)", "ans_c", "answer_c", "opt3", "option_c","C","C)"],
-        "option_d": ["optiond", "option d", "d", "d)", "ans_d", "answer_d", "opt4", "option_d","D","D)"],
-        "answer": ["answer", "ans", "solution", "correct answer", "correct", "answer key"],
-        "topic": ["topic", "subject", "category", "chapter"],
-        "subtopic": ["subtopic", "sub-topic", "section", "sub_section", "subchapter","tag","tags","Tags"],
-        "difficulty": ["difficulty", "level", "hardness"]
-    }
-
-    new_cols = {}
-    for std_col, variants in rename_map.items():
-        for variant in variants:
-            if variant.lower() in df.columns:
-                new_cols[variant.lower()] = std_col
-                break
-    df.rename(columns=new_cols, inplace=True)
-
-    defaults = {
-        "question_text": "No question text",
-        "answer": "a",
-        "difficulty": "Very easy",
-        "topic": "N/A",
-        "subtopic": "N/A"
-    }
-    for col, val in defaults.items():
-        if col not in df.columns:
-            df[col] = val
-
-    return df
-
-def select_questions(available, difficulty, already_used, num=10):
-    if available.empty:
-        return pd.DataFrame()
-    
-    available = available[~available["id"].isin(already_used)]
-    selected = pd.DataFrame()
-    
-    if available.empty:
-        return selected
-
-    grouped = available.groupby(["topic","subtopic"], sort=False)
-    group_counts = grouped.size()
-    total_questions = group_counts.sum()
-    
-    group_allocation = {k: (count / total_questions) * num for k, count in group_counts.items()}
-    floor_alloc = {k: int(v) for k,v in group_allocation.items()}
-    allocated_total = sum(floor_alloc.values())
-    remaining_slots = num - allocated_total
-    
-    fractional_parts = {k: group_allocation[k]-floor_alloc[k] for k in group_allocation}
-    for k in sorted(fractional_parts, key=fractional_parts.get, reverse=True):
-        if remaining_slots <= 0:
-            break
-        floor_alloc[k] += 1
-        remaining_slots -= 1
-    
-    for (topic, subtopic), count in floor_alloc.items():
-        group = grouped.get_group((topic, subtopic))
-        take = min(count, len(group))
-        selected = pd.concat([selected, group.sample(take, replace=False)])
-    
-    if len(selected) < num:
-        remaining = available[~available["id"].isin(selected["id"])]
-        extra_needed = num - len(selected)
-        if not remaining.empty:
-            selected = pd.concat([selected, remaining.sample(min(extra_needed, len(remaining)), replace=False)])
-    
-    selected = selected.head(num)
-    already_used.update(selected["id"].tolist())
-    return selected
+def select_questions(bank, difficulty, already_used, num=10, rng=None, skip=None):
+    """Stratified batch at ``difficulty``; ``skip`` (bool per bank row) is avoided while enough others remain."""
+    layout = bank.layout(difficulty)
+    excluded = already_used.contains(layout.order)
+    if skip is not None:
+        avoided = excluded | skip[layout.order]
+        if (~avoided).sum() >= num:
+            excluded = avoided
+    positions = stratified_sample(layout, excluded, num=num, rng=rng)
+    already_used.add(positions)
+    return bank.records(positions)
+
+def next_questions(bank, state, num=10):
+    """Pick the next batch at the session's difficulty, recycling its questions once fewer than ``num`` remain."""
+    if adaptive.ENABLED:
+        ability = Ability.from_dict(state.ability)
+        return bank.records(adaptive_engine.select(state.bank_id, bank, ability, state.used, num=num))
+    if len(bank.available_positions(state.difficulty, state.used)) < num:
+        state.used.discard(bank.difficulty_positions(state.difficulty))
+    stats = question_stats.for_bank(state.bank_id, bank)
+    skip = stats.flagged if stats is not None else None
+    with stage("select_questions"):
+        return select_questions(bank, state.difficulty, state.used, num=num, skip=skip)
 
 # -------------------- Upload Dataset --------------------
 @app.route("/upload", methods=["POST"])
 def upload_dataset():
-    global dataset, used_questions, current_difficulty
-
     file = request.files.get("file")
     if not file:
         return jsonify({"error": "No file uploaded"}), 400
 
-    try:
-        if file.filename.endswith(".xlsx"):
-            df = pd.read_excel(file)
-        else:
-            content = file.read().decode()
-            file.seek(0)
-            delimiters = [';', ',', '\t', '|']
-            for delim in delimiters:
-                try:
-                    df = pd.read_csv(file, sep=delim)
-                    if df.shape[1] > 1:
-                        break
-                    file.seek(0)
-                except Exception:
-                    file.seek(0)
-            else:
-                return jsonify({"error": "Failed to detect delimiter. Please use CSV with ; , \\t or |"}), 400
-    except Exception as e:
-        return jsonify({"error": f"Failed to read file: {str(e)}"}), 400
-
-    dataset = standardize_dataset(df)
-    if "id" not in dataset.columns:
-        dataset.insert(0, "id", range(1, len(dataset)+1))
-
-    used_questions.clear()
-    current_difficulty = "Very easy"
-    used_questions[current_difficulty] = set()
-
-    available = dataset[dataset["difficulty"].str.lower() == current_difficulty.lower()]
-    selected = select_questions(available, current_difficulty, used_questions[current_difficulty], num=10)
+    bank_id = bank_key_for_stream(file.stream, file.filename)
+    bank = bank_store.get(bank_id)
+    if bank is None:
+        try:
+            bank = bank_store.put(bank_id, read_question_bank(file.stream, file.filename))
+        except IngestError as e:
+            return jsonify({"error": str(e)}), 400
 
-    user_sessions["test_user"] = {"start_time": time.time(), "time_logs": {}}
+    state = SessionState(bank_id=bank_id, used=QuestionBitset(len(bank)))
+    selected = next_questions(bank, state)
+    session_store.save(session_key(), state)
 
     return jsonify({
         "message": "Dataset uploaded successfully!",
-        "questions": selected.to_dict(orient="records"),
+        "questions": selected,
         "time_limit": 3600
     })
 
 # -------------------- Submit Answers --------------------
 @app.route("/submit", methods=["POST"])
 def submit_answers():
-    global dataset, current_difficulty, used_questions
-
     data = request.json
     answers = data.get("answers", {})
     time_logs = data.get("time_logs", {})
 
-    session = user_sessions.get("test_user", {})
-    start_time = session.get("start_time", time.time())
-    elapsed_time = time.time() - start_time
+    key = session_key(data)
+    state = session_store.get(key)
+    bank = bank_store.get(state.bank_id) if state else None
+    if bank is None:
+        return jsonify({"error": "No active test. Please upload a dataset first."}), 400
+
+    elapsed_time = time.time() - state.start_time
     if elapsed_time > 3600:
         return jsonify({"error": "⏳ Test time exceeded 1 hour. Auto-submitted."}), 403
 
-    correct_count = 0
-    solutions = []
-    total_time = 0
-    max_time_val = -1
-    max_time_q = None
+    with stage("grading"):
+        graded = grade(bank, answers, time_logs)
+    correct_count = graded.score
+    solutions = graded.solutions
+    attempt_id = new_attempt_id()
+    attempted_level = state.difficulty
+
+    def log_attempt(result):
+        attempt_writer.record(*attempt_rows(attempt_id, key, state.bank_id, attempted_level,
+                                            result, graded, elapsed_time))
+
+    if adaptive.ENABLED:
+        # Every answer moves the ability estimate; the level follows it both ways.
+        ability = Ability.from_dict(state.ability)
+        positions = bank.positions([s["question_id"] for s in solutions])
+        adaptive_engine.update(state.bank_id, bank, ability, positions, [s["is_correct"] for s in solutions])
+        state.ability = ability.to_dict()
+        next_level = ability.level()
+        mastered = level_rank(next_level) == len(adaptive.LEVELS) - 1 and correct_count >= adaptive.MASTERY_SCORE
+    elif correct_count == 10:
+        next_level = NEXT_LEVEL.get(state.difficulty.lower())
+        mastered = next_level is None
+    else:
+        next_level, mastered = state.difficulty, False
+
+    if mastered:
+        session_store.delete(key)
+        log_attempt("completed")
+        return jsonify({
+            "result": "completed",
+            "attempt_id": attempt_id,
+            "message": "🎉 Congratulations! You mastered all levels!",
+            "score": correct_count,
+            "solutions": solutions,
+            "average_time": graded.average_time,
+            "max_time_question": graded.max_time_question,
+            "max_time_value": round(graded.max_time_value, 2),
+            "topic_breakdown": graded.topic_breakdown,
+            "elapsed_time": round(elapsed_time, 2)
+        })
 
-    for qid, user_ans in answers.items():
-        try:
-            qid_int = int(float(qid))
-            row = dataset[dataset["id"] == qid_int].iloc[0]
-            correct_ans = str(row["answer"]).strip().lower()
-            user_ans_clean = str(user_ans).strip().lower()
-            is_correct = correct_ans == user_ans_clean
-            if is_correct:
-                correct_count += 1
-
-            q_time = float(time_logs.get(str(qid), 0))
-            total_time += q_time
-            if q_time > max_time_val:
-                max_time_val = q_time
-                max_time_q = row["question_text"]
-
-            solutions.append({
-                "question": row["question_text"],
-                "user_answer": user_ans,
-                "correct_answer": row["answer"],
-                "is_correct": is_correct,
-                "time_taken": round(q_time, 2),
-                "topic": row.get("topic", "General"),
-                "subtopic": row.get("subtopic", "General")
-            })
-        except Exception:
-            continue
-
-    avg_time = round(total_time / len(answers), 2) if answers else 0
-
-    if correct_count == 10:
-        next_level_map = {"very easy": "Easy", "easy": "Moderate", "moderate": "Difficult"}
-        current_difficulty = next_level_map.get(current_difficulty.lower(), None)
-        if not current_difficulty:
-            return jsonify({
-                "result": "completed",
-                "message": "🎉 Congratulations! You mastered all levels!",
-                "score": correct_count,
-                "solutions": solutions,
-                "average_time": avg_time,
-                "max_time_question": max_time_q,
-                "max_time_value": round(max_time_val, 2),
-                "elapsed_time": round(elapsed_time, 2)
-            })
-
-        if current_difficulty not in used_questions:
-            used_questions[current_difficulty] = set()
-
-        available = dataset[dataset["difficulty"].str.lower() == current_difficulty.lower()]
-        remaining = available[~available["id"].isin(used_questions[current_difficulty])]
-        if len(remaining) < 10:
-            used_questions[current_difficulty] = set()
-            remaining = available
-        selected = select_questions(remaining, current_difficulty, used_questions[current_difficulty], num=10)
+    if level_rank(next_level) > level_rank(state.difficulty):
+        state.difficulty = next_level
+        selected = next_questions(bank, state)
+        session_store.save(key, state)
+        log_attempt("success")
 
         return jsonify({
             "result": "success",
-            "message": f"✅ You completed {current_difficulty} level!",
+            "attempt_id": attempt_id,
+            "message": f"✅ You completed {state.difficulty} level!",
             "score": correct_count,
             "solutions": solutions,
-            "average_time": avg_time,
-            "max_time_question": max_time_q,
-            "max_time_value": round(max_time_val, 2),
+            "average_time": graded.average_time,
+            "max_time_question": graded.max_time_question,
+            "max_time_value": round(graded.max_time_value, 2),
+            "topic_breakdown": graded.topic_breakdown,
             "elapsed_time": round(elapsed_time, 2),
-            "next_level": current_difficulty,
-            "questions": selected.to_dict(orient="records")
+            "next_level": state.difficulty,
+            "questions": selected
         })
 
-    available = dataset[
-        (dataset["difficulty"].str.lower() == current_difficulty.lower()) &
-        (~dataset["id"].isin(used_questions[current_difficulty]))
-    ]
-    if len(available) < 10:
-        used_questions[current_difficulty] = set()
-        available = dataset[dataset["difficulty"].str.lower() == current_difficulty.lower()]
-    selected = select_questions(available, current_difficulty, used_questions[current_difficulty], num=10)
+    if level_rank(next_level) == level_rank(state.difficulty) and adaptive.ENABLED:
+        # The ability moved, but not across a level boundary: neither passed nor failed.
+        result = "continue"
+        mark = "✅" if correct_count >= adaptive.MASTERY_SCORE else "🔁"
+        message = f"{mark} You got {correct_count}/10 correct. Keep going at {next_level} level!"
+    else:
+        result = "fail"
+        message = f"❌ You got {correct_count}/10 correct. Try again!"
+    state.difficulty = next_level
+    selected = next_questions(bank, state)
+    session_store.save(key, state)
+    log_attempt(result)
 
     return jsonify({
-        "result": "fail",
-        "message": f"❌ You got {correct_count}/10 correct. Try again!",
+        "result": result,
+        "attempt_id": attempt_id,
+        "message": message,
         "score": correct_count,
         "solutions": solutions,
-        "average_time": avg_time,
-        "max_time_question": max_time_q,
-        "max_time_value": round(max_time_val, 2),
+        "average_time": graded.average_time,
+        "max_time_question": graded.max_time_question,
+        "max_time_value": round(graded.max_time_value, 2),
+        "topic_breakdown": graded.topic_breakdown,
         "elapsed_time": round(elapsed_time, 2),
-        "questions": selected.to_dict(orient="records")
+        "questions": selected
     })
 
 # -------------------- Generate Report with Gemini AI Analysis --------------------
+report_jobs = ReportJobQueue()
+
+def report_solutions(data):
+    """
+    Solutions posted with the request, or those of a stored ``attempt_id``,
+    annotated with calibrated question statistics when their bank has any.
+    """
+    if data.get("solutions") or not data.get("attempt_id"):
+        bank_id = data.get("bank_id")
+        if bank_id is None and len(question_stats):
+            state = session_store.get(session_key(data))
+            bank_id = state.bank_id if state else None
+        return question_stats.annotate(bank_id, data.get("solutions"))
+    records = (AnswerRecord.query.filter_by(attempt_id=str(data["attempt_id"]))
+               .order_by(AnswerRecord.position).all())
+    if not records and attempt_writer.pending():
+        # Submitted to this worker moments ago and not flushed yet.
+        attempt_writer.flush()
+        records = (AnswerRecord.query.filter_by(attempt_id=str(data["attempt_id"]))
+                   .order_by(AnswerRecord.position).all())
+    if not records:
+        return []
+    return question_stats.annotate(records[0].bank_id, [record.to_solution() for record in records])
+
+def send_report(path, student_name):
+    """``send_file`` response for a stored report, or None if the store has pruned it."""
+    try:
+        # Once open, the file can be pruned without breaking the download.
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    return send_file(f, as_attachment=True, download_name=download_name(student_name))
+
 @app.route("/generate_report", methods=["POST"])
 def generate_report_endpoint():
     data = request.json
-    solutions = data.get("solutions")
+    solutions = report_solutions(data)
     student_name = data.get("student_name", "Student")
 
     if not solutions or len(solutions) == 0:
+        if data.get("attempt_id"):
+            return jsonify({"error": "Unknown attempt"}), 404
         return jsonify({"error": "No solutions provided for report"}), 400
 
     try:
-        # Generate standard report first
-        reports_dir = "backend/reports"
-        os.makedirs(reports_dir, exist_ok=True)
-        report_path = report_generator.generate_report(
-            solutions=solutions,
-            output_dir=reports_dir,
-            student_name=student_name
-        )
-
-        # -------------------- Gemini AI Analysis --------------------
-        if GEMINI_API_KEY:
-            try:
-                model = genai.GenerativeModel("gemini-2.5-flash-lite")
-                prompt = (
-                    f"Summarize the test performance of student {student_name}. "
-                    "Provide a concise, professional analysis highlighting strengths, weaknesses, "
-                    "and any suggestions for improvement."
-                )
-                ai_response = model.generate_content(prompt)
-                ai_summary = ai_response.text.strip()
-
-                # Append AI analysis at the end of the report
-                report_generator.append_ai_analysis(report_path, ai_summary)
-
-            except Exception as e:
-                print("Gemini AI analysis error:", e)
-
-        return send_file(report_path, as_attachment=True)
+        response = send_report(cached_report(solutions, REPORTS_DIR, student_name), student_name)
+        if response is None:
+            # Pruned by another worker between building and sending: build it again.
+            response = send_report(cached_report(solutions, REPORTS_DIR, student_name), student_name)
+        return response or (jsonify({"error": "Report was removed before it could be sent"}), 503)
 
     except Exception as e:
         print("Report generation error:", e)
         return jsonify({"error": f"Failed to generate report: {str(e)}"}), 500
 
+# -------------------- Background Report Jobs --------------------
+@app.route("/reports", methods=["POST"])
+def create_report_job():
+    data = request.json
+    solutions = report_solutions(data)
+    student_name = data.get("student_name", "Student")
+
+    if not solutions or len(solutions) == 0:
+        if data.get("attempt_id"):
+            return jsonify({"error": "Unknown attempt"}), 404
+        return jsonify({"error": "No solutions provided for report"}), 400
+
+    try:
+        job_id = report_jobs.submit(solutions, REPORTS_DIR, student_name)
+    except QueueFull:
+        return jsonify({"error": "Report queue is full. Please retry shortly."}), 503
+
+    return jsonify({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/reports/{job_id}"
+    }), 202
+
+@app.route("/reports/<job_id>", methods=["GET"])
+def report_job_status(job_id):
+    info = report_jobs.status(job_id)
+    if info is None:
+        return jsonify({"error": "Unknown report job"}), 404
+    if info["status"] == "done":
+        response = send_report(info["path"], info["student_name"])
+        if response is None:
+            return jsonify({"error": "Report has expired. Please request it again."}), 410
+        return response
+    if info["status"] == "failed":
+        return jsonify(info), 500
+    return jsonify(info), 202
+
 # -------------------- Chatbot Endpoint --------------------
 @app.route("/chatbot", methods=["POST"])
 def chatbot():
@@ -365,13 +389,50 @@ def chatbot():
         if not user_message:
             return jsonify({"error": "Message required"}), 400
 
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
-        response = model.generate_content(user_message)
-        return jsonify({"reply": response.text})
+        reply = get_gateway().generate(user_message)
+        return jsonify({"reply": reply})
     except Exception as e:
         print("Chatbot error:", e)
         return jsonify({"error": str(e)}), 500
 
+CHATBOT_STREAM_TIMEOUT = float(os.environ.get("CHATBOT_STREAM_TIMEOUT", 60))
+
+def sse_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.route("/chatbot/stream", methods=["POST"])
+def chatbot_stream():
+    """
+    Server-Sent Events version of /chatbot: one ``data: {"text": ...}`` event per
+    chunk, then ``event: done`` (or ``event: error``).
+    """
+    data = request.json or {}
+    user_message = data.get("message", "")
+    if not user_message:
+        return jsonify({"error": "Message required"}), 400
+
+    def events():
+        # Closing this generator (client disconnected) closes the gateway
+        # stream, which stops reading from the model.
+        with closing(get_gateway().stream(user_message, timeout=CHATBOT_STREAM_TIMEOUT)) as chunks:
+            try:
+                for chunk in chunks:
+                    yield sse_event({"text": chunk})
+                yield sse_event({}, event="done")
+            except TimeoutError as e:
+                yield sse_event({"error": str(e)}, event="error")
+            except Exception as e:
+                print("Chatbot stream error:", e)
+                yield sse_event({"error": str(e)}, event="error")
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/chatbot/stats", methods=["GET"])
+def chatbot_stats():
+    return jsonify(get_gateway().stats())
+
 # -------------------- Main --------------------
 if __name__ == "__main__":
     # Use host 0.0.0.0 so external servers can reach your app
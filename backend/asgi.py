@@ -0,0 +1,175 @@
+"""
+Optional ASGI entry point for I/O-bound serving.
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+    # or: gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+
+The LLM routes are served natively on the event loop, so a waiting Gemini
+call costs a coroutine instead of a worker:
+
+- ``POST /chatbot`` and ``POST /chatbot/stream`` await the async gateway;
+- ``GET /reports/<job_id>`` streams a finished report file in chunks.
+
+Every other request (and every other method on those paths, e.g. CORS
+preflights) goes to the unchanged Flask app through asgiref's ``WsgiToAsgi``,
+which runs it on a thread pool. ``gunicorn app:app`` keeps working as before.
+"""
+
+import asyncio
+import json
+import os
+import re
+import unicodedata
+from urllib.parse import quote
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.datastructures import Headers
+
+import app as flask_module
+from llm_gateway import get_gateway
+from report_store import download_name
+
+FILE_CHUNK = 256 * 1024
+REPORT_PATH = re.compile(r"^/reports/([^/]+)$")
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+wsgi_app = WsgiToAsgi(flask_module.app)
+
+
+# -------------------- Helpers --------------------
+def _headers(content_type, extra=()):
+    # Same CORS policy as ``CORS(app)`` on the Flask side (any origin).
+    return [(b"content-type", content_type.encode()), (b"access-control-allow-origin", b"*"),
+            *[(name.encode(), value.encode()) for name, value in extra]]
+
+
+def attachment_header(name):
+    """Content-Disposition for downloading ``name``, built as ``send_file`` does (RFC 6266)."""
+    try:
+        name.encode("ascii")
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+        names = {"filename": simple, "filename*": f"UTF-8''{quote(name, safe='!#$&+-.^_`|~')}"}
+    else:
+        names = {"filename": name}
+    headers = Headers()
+    headers.set("Content-Disposition", "attachment", **names)
+    return headers["Content-Disposition"]
+
+
+async def read_json(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    try:
+        return json.loads(body or b"null")
+    except ValueError:
+        return None
+
+
+async def send_json(send, status, data):
+    body = json.dumps(data).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": _headers("application/json", [("content-length", str(len(body)))])})
+    await send({"type": "http.response.body", "body": body})
+
+
+# -------------------- Chatbot --------------------
+async def chatbot(scope, receive, send):
+    data = await read_json(receive) or {}
+    user_message = data.get("message", "") if isinstance(data, dict) else ""
+    if not user_message:
+        return await send_json(send, 400, {"error": "Message required"})
+    try:
+        reply = await get_gateway().agenerate(user_message)
+    except Exception as e:
+        print("Chatbot error:", e)
+        return await send_json(send, 500, {"error": str(e)})
+    await send_json(send, 200, {"reply": reply})
+
+
+async def chatbot_stream(scope, receive, send):
+    data = await read_json(receive) or {}
+    user_message = data.get("message", "") if isinstance(data, dict) else ""
+    if not user_message:
+        return await send_json(send, 400, {"error": "Message required"})
+
+    async def events():
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": _headers("text/event-stream", [("cache-control", "no-cache"),
+                                                              ("x-accel-buffering", "no")])})
+        chunks = get_gateway().astream(user_message, timeout=flask_module.CHATBOT_STREAM_TIMEOUT)
+        try:
+            async for chunk in chunks:
+                await send({"type": "http.response.body", "body": flask_module.sse_event({"text": chunk}).encode(),
+                            "more_body": True})
+            tail = flask_module.sse_event({}, event="done")
+        except TimeoutError as e:
+            tail = flask_module.sse_event({"error": str(e)}, event="error")
+        except Exception as e:
+            print("Chatbot stream error:", e)
+            tail = flask_module.sse_event({"error": str(e)}, event="error")
+        finally:
+            await chunks.aclose()
+        await send({"type": "http.response.body", "body": tail.encode()})
+
+    # Stop generating as soon as the client goes away.
+    stream = asyncio.ensure_future(events())
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+    await asyncio.wait([stream, disconnect], return_when=asyncio.FIRST_COMPLETED)
+    for task in (stream, disconnect):
+        task.cancel()
+    await asyncio.gather(stream, disconnect, return_exceptions=True)
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+# -------------------- Report Downloads --------------------
+async def report_download(scope, receive, send, path, name):
+    """Stream the report; False (nothing sent) if the report store has pruned it."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return False
+    with f:
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": _headers(DOCX_TYPE, [("content-length", str(os.fstat(f.fileno()).st_size)),
+                                                    ("content-disposition", attachment_header(name))])})
+        while True:
+            chunk = await asyncio.to_thread(f.read, FILE_CHUNK)
+            await send({"type": "http.response.body", "body": chunk, "more_body": bool(chunk)})
+            if not chunk:
+                break
+    return True
+
+
+# -------------------- Router --------------------
+async def app(scope, receive, send):
+    if scope["type"] == "http":
+        method, path = scope["method"], scope["path"]
+        if method == "POST" and path == "/chatbot":
+            return await chatbot(scope, receive, send)
+        if method == "POST" and path == "/chatbot/stream":
+            return await chatbot_stream(scope, receive, send)
+        match = REPORT_PATH.match(path)
+        if method == "GET" and match:
+            info = flask_module.report_jobs.status(match.group(1))
+            if info and info["status"] == "done":
+                if await report_download(scope, receive, send, info["path"], download_name(info["student_name"])):
+                    return
+                # Pruned: the Flask route answers 410.
+    elif scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    return await wsgi_app(scope, receive, send)
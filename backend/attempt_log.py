@@ -0,0 +1,171 @@
+"""
+Write-behind persistence of graded attempts.
+
+/submit hands each graded attempt to ``AttemptWriter.record`` and returns
+straight away; a background thread writes everything recorded since the last
+flush as two ``executemany`` inserts in one transaction. With SQLite in WAL
+mode (see ``database``) that is one fsync per batch instead of one per
+submission, so grading latency no longer depends on the disk.
+
+Configuration:
+- ``ATTEMPT_FLUSH_INTERVAL``: seconds between flushes (default 0.5)
+- ``ATTEMPT_BATCH_SIZE``: attempts that trigger an early flush (default 200)
+- ``ATTEMPT_MAX_RETRIES``: failed flushes an attempt survives before it is
+  dead-lettered (default 5)
+- ``ATTEMPT_MAX_PENDING``: buffered attempts before ``record`` flushes
+  synchronously; whatever still does not fit is dead-lettered (default 10000)
+- ``ATTEMPT_DEAD_LETTER_PATH``: JSON-lines file for attempts that could not
+  be written (default ``backend/attempts_dead_letter.jsonl``), kept so they
+  can be replayed once the database is fixed
+
+Attempts still buffered when the process exits are flushed by ``atexit``.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+
+from models import AnswerRecord, Attempt
+
+DEFAULT_DEAD_LETTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "attempts_dead_letter.jsonl")
+
+
+def new_attempt_id():
+    return uuid.uuid4().hex
+
+
+class AttemptWriter:
+    """Buffers ``(attempt_row, answer_rows)`` and inserts them in batches."""
+
+    def __init__(self, engine, flush_interval=None, batch_size=None, max_retries=None, max_pending=None,
+                 dead_letter_path=None):
+        self.engine = engine
+        self.flush_interval = float(os.getenv("ATTEMPT_FLUSH_INTERVAL", 0.5) if flush_interval is None
+                                    else flush_interval)
+        self.batch_size = int(os.getenv("ATTEMPT_BATCH_SIZE", 200) if batch_size is None else batch_size)
+        self.max_retries = int(os.getenv("ATTEMPT_MAX_RETRIES", 5) if max_retries is None else max_retries)
+        self.max_pending = int(os.getenv("ATTEMPT_MAX_PENDING", 10000) if max_pending is None else max_pending)
+        self.dead_letter_path = dead_letter_path or os.getenv("ATTEMPT_DEAD_LETTER_PATH", DEFAULT_DEAD_LETTER_PATH)
+        self._pending = []  # (attempt_row, answer_rows, failed flushes so far)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.stats = {"flushes": 0, "attempts": 0, "answers": 0, "errors": 0, "dead_lettered": 0,
+                      "last_flush_ms": 0.0}
+        atexit.register(self.flush)
+
+    def _ensure_thread(self):
+        # Threads do not survive fork; each worker process starts its own.
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="attempt-writer", daemon=True)
+            self._thread.start()
+
+    def record(self, attempt_row, answer_rows):
+        """Queue one attempt (a dict of ``Attempt`` columns) and its answers."""
+        with self._lock:
+            self._ensure_thread()
+            self._pending.append((attempt_row, answer_rows, 0))
+            full = len(self._pending) >= self.batch_size
+            overflow = len(self._pending) > self.max_pending
+        if overflow:
+            # The writer is not keeping up (or the database keeps failing):
+            # write in the request instead of growing the buffer.
+            self.flush()
+            with self._lock:
+                dropped = self._pending[:max(0, len(self._pending) - self.max_pending)]
+                del self._pending[:len(dropped)]
+            if dropped:
+                self._dead_letter(dropped, "buffer full")
+        elif full:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything recorded so far; returns the number of attempts written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            attempts = [attempt for attempt, _, _ in batch]
+            answers = [answer for _, rows, _ in batch for answer in rows]
+            start = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(Attempt.__table__.insert(), attempts)
+                    if answers:
+                        conn.execute(AnswerRecord.__table__.insert(), answers)
+            except Exception as e:
+                print("Attempt write error:", e)
+                self.stats["errors"] += 1
+                retry = [(attempt, rows, tries + 1) for attempt, rows, tries in batch]
+                failed = [entry for entry in retry if entry[2] >= self.max_retries]
+                with self._lock:
+                    # Keep the rest for the next flush.
+                    self._pending[:0] = [entry for entry in retry if entry[2] < self.max_retries]
+                if failed:
+                    self._dead_letter(failed, e)
+                return 0
+            self.stats["flushes"] += 1
+            self.stats["attempts"] += len(attempts)
+            self.stats["answers"] += len(answers)
+            self.stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+            return len(attempts)
+
+    def _dead_letter(self, entries, error):
+        print(f"Attempt write error: giving up on {len(entries)} attempts ({error}); "
+              f"saved to {self.dead_letter_path}")
+        self.stats["dead_lettered"] += len(entries)
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for attempt, rows, _ in entries:
+                    f.write(json.dumps({"attempt": attempt, "answers": rows, "error": str(error)}, default=str) + "\n")
+        except OSError as e:
+            print("Attempt dead-letter write error:", e)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+
+def attempt_rows(attempt_id, student, bank_id, difficulty, result, graded, elapsed_time):
+    """``Attempt`` and ``AnswerRecord`` rows for a ``grading.Grade``."""
+    attempt = {
+        "id": attempt_id,
+        "student": student,
+        "bank_id": bank_id,
+        "difficulty": difficulty,
+        "result": result,
+        "score": graded.score,
+        "answered": graded.answered,
+        "total_time": graded.total_time,
+        "average_time": graded.average_time,
+        "elapsed_time": round(elapsed_time, 2),
+        "submitted_at": time.time(),
+    }
+    answers = [{
+        "attempt_id": attempt_id,
+        "position": i,
+        "bank_id": bank_id,
+        "question_id": s["question_id"],
+        "question": s["question"],
+        "topic": s["topic"],
+        "subtopic": s["subtopic"],
+        "difficulty": s["difficulty"],
+        "user_answer": None if s["user_answer"] is None else str(s["user_answer"]),
+        "correct_answer": s["correct_answer"],
+        "is_correct": s["is_correct"],
+        "time_taken": s["time_taken"],
+    } for i, s in enumerate(graded.solutions)]
+    return attempt, answers
@@ -0,0 +1,179 @@
+"""
+On-disk storage for preprocessed question banks.
+
+Each uploaded bank is written once, under a hash of the uploaded file, as a
+directory of ``.npy`` arrays (question columns plus the QuestionBank
+indexes) and a small ``meta.json``. Loading memory-maps the arrays
+read-only, so every gunicorn worker shares one page-cache copy of the bank
+and a restart or a second worker never has to re-parse the upload.
+
+The directory defaults to ``backend/banks`` and can be moved with
+``QUESTION_BANK_DIR``.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from question_bank import QuestionBank, StringColumn
+from sampling import GroupLayout
+
+# Bump when standardization or the on-disk layout changes so old banks are re-parsed.
+STORAGE_VERSION = 2
+
+DEFAULT_BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "banks")
+
+
+def bank_key(raw, filename=""):
+    """Content hash identifying an uploaded bank file."""
+    return bank_key_for_stream(io.BytesIO(raw), filename)
+
+
+def bank_key_for_stream(stream, filename="", block_size=1 << 20):
+    """``bank_key`` of a seekable binary stream, read in blocks; the stream is rewound."""
+    digest = hashlib.sha256(f"v{STORAGE_VERSION}:{os.path.splitext(filename)[1].lower()}:".encode())
+    for block in iter(lambda: stream.read(block_size), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def save_bank(path, bank):
+    """Write ``bank`` to directory ``path`` atomically (temp dir + rename)."""
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = os.path.join(parent, f".tmp-{os.path.basename(path)}-{os.getpid()}-{threading.get_ident()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    def save(name, array):
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+    columns = []
+    for i, (name, column) in enumerate(bank.columns.items()):
+        if isinstance(column, StringColumn):
+            save(f"col{i}_data", column.data)
+            save(f"col{i}_offsets", column.offsets)
+            save(f"col{i}_nulls", column.nulls)
+            columns.append({"name": name, "kind": "string"})
+        else:
+            save(f"col{i}", column)
+            columns.append({"name": name, "kind": "numeric"})
+
+    levels = list(bank.levels)
+    for i, level in enumerate(levels):
+        save(f"level{i}", bank.levels[level])
+        save(f"layout{i}_order", bank.layouts[level].order)
+        save(f"layout{i}_offsets", bank.layouts[level].offsets)
+
+    save("ids", bank.ids)
+    save("sorted_ids", bank.sorted_ids)
+    save("sorted_pos", bank.sorted_pos)
+    save("group_codes", bank.group_codes)
+    save("answer_codes", bank.answer_codes)
+
+    meta = {
+        "version": STORAGE_VERSION,
+        "rows": len(bank),
+        "columns": columns,
+        "levels": levels,
+        "group_keys": [list(key) for key in bank.group_keys],
+        "answer_vocab": bank.answer_vocab,
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, default=_json_default)
+
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # Another worker stored the same bank first; its copy is identical.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_bank(path):
+    """Memory-map a bank previously written by ``save_bank``."""
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != STORAGE_VERSION:
+        return None
+
+    def load(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    columns = {}
+    for i, col in enumerate(meta["columns"]):
+        if col["kind"] == "string":
+            columns[col["name"]] = StringColumn(load(f"col{i}_data"), load(f"col{i}_offsets"), load(f"col{i}_nulls"))
+        else:
+            columns[col["name"]] = load(f"col{i}")
+
+    levels, layouts = {}, {}
+    for i, level in enumerate(meta["levels"]):
+        levels[level] = load(f"level{i}")
+        layouts[level] = GroupLayout(load(f"layout{i}_order"), load(f"layout{i}_offsets"))
+
+    return QuestionBank(
+        columns=columns,
+        ids=load("ids"),
+        sorted_ids=load("sorted_ids"),
+        sorted_pos=load("sorted_pos"),
+        group_codes=load("group_codes"),
+        group_keys=[tuple(key) for key in meta["group_keys"]],
+        levels=levels,
+        layouts=layouts,
+        answer_codes=load("answer_codes"),
+        answer_vocab=meta["answer_vocab"],
+    )
+
+
+class BankStore:
+    """
+    Process-local cache of banks in front of the on-disk store. ``get`` lazily
+    maps a bank the first time this process needs it.
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or os.getenv("QUESTION_BANK_DIR", DEFAULT_BANK_DIR))
+        self._banks = {}
+        self._lock = threading.Lock()
+
+    def _path(self, bank_id):
+        return os.path.join(self.root, bank_id)
+
+    def sidecar_path(self, bank_id, name):
+        """Path for mutable per-bank state kept next to the (immutable) bank directory."""
+        return os.path.join(self.root, f"{bank_id}.{name}")
+
+    def get(self, bank_id):
+        """The bank stored under ``bank_id``, or None if it was never uploaded."""
+        if not bank_id:
+            return None
+        bank = self._banks.get(bank_id)
+        if bank is not None:
+            return bank
+        path = self._path(bank_id)
+        if not os.path.isfile(os.path.join(path, "meta.json")):
+            return None
+        with self._lock:
+            bank = self._banks.get(bank_id)
+            if bank is None:
+                bank = load_bank(path)
+                if bank is not None:
+                    self._banks[bank_id] = bank
+        return bank
+
+    def put(self, bank_id, bank):
+        """Persist ``bank`` and return the memory-mapped copy that should be served."""
+        save_bank(self._path(bank_id), bank)
+        with self._lock:
+            self._banks.pop(bank_id, None)
+        return self.get(bank_id) or bank
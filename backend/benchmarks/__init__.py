@@ -0,0 +1,5 @@
+"""
+Benchmark scripts for the backend. Run from ``backend/``, e.g.::
+
+    python -m benchmarks.bench_question_bank
+"""
@@ -0,0 +1,112 @@
+"""
+Rounds a student needs to reach their level: fixed ladder vs. adaptive selection.
+
+Simulated students have a true overall ability plus a per-topic deviation and
+answer each question correctly with probability ``sigmoid(ability - b)``,
+where ``b`` is the question's labelled level (``adaptive.LEVEL_PRIORS``) plus
+per-question noise. Each student sits rounds of 10 questions until the
+session's level equals the level closest to their true ability, or
+``--max-rounds`` is reached.
+
+- ladder:   ``select_questions`` at the session level, advancing on 10/10
+- adaptive: ``adaptive.AdaptiveEngine`` selection and level estimate
+
+Reports the median and p90 rounds (capped runs count as ``--max-rounds``),
+the share of students placed, and per-submission update/selection time.
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from adaptive import Ability, AdaptiveEngine, LEVEL_PRIORS, LEVELS, level_rank
+from bitset import QuestionBitset
+from question_bank import QuestionBank
+from sampling import stratified_sample
+from benchmarks.synthetic import make_question_bank
+
+
+def true_difficulties(bank, rng):
+    b = np.zeros(len(bank))
+    for level, positions in bank.levels.items():
+        b[positions] = LEVEL_PRIORS[level]
+    return b + rng.normal(0, 0.3, len(bank))
+
+
+def answer(rng, student, bank, b, positions):
+    theta = student["theta"] + student["topics"][bank.group_codes[positions]]
+    return rng.random(len(positions)) < 1 / (1 + np.exp(-(theta - b[positions])))
+
+
+def ladder(rng, student, bank, b, target, max_rounds):
+    level, used = LEVELS[0], QuestionBitset(len(bank))
+    for rounds in range(1, max_rounds + 1):
+        if len(bank.available_positions(level, used)) < 10:
+            used.discard(bank.difficulty_positions(level))
+        layout = bank.layout(level)
+        positions = stratified_sample(layout, used.contains(layout.order), num=10, rng=rng)
+        used.add(positions)
+        if answer(rng, student, bank, b, positions).sum() == 10 and level != LEVELS[-1]:
+            level = LEVELS[level_rank(level) + 1]
+        if level == target:
+            return rounds, 0.0
+    return max_rounds, 0.0
+
+
+def adaptive_run(rng, engine, student, bank, b, target, max_rounds):
+    state, used, spent = {}, QuestionBitset(len(bank)), 0.0
+    for rounds in range(1, max_rounds + 1):
+        start = time.perf_counter()
+        ability = Ability.from_dict(state)
+        positions = engine.select("bench", bank, ability, used, num=10, rng=rng)
+        spent += time.perf_counter() - start
+        correct = answer(rng, student, bank, b, positions)
+        start = time.perf_counter()
+        engine.update("bench", bank, ability, positions, correct)
+        state = ability.to_dict()
+        spent += time.perf_counter() - start
+        if ability.level() == target:
+            return rounds, spent / rounds
+    return max_rounds, spent / max_rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--max-rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    bank = QuestionBank.from_frame(make_question_bank(args.questions))
+    b = true_difficulties(bank, rng)
+    num_groups = len(bank.group_keys)
+    students = [{"theta": rng.uniform(-2, 2), "topics": rng.normal(0, 0.5, num_groups)}
+                for _ in range(args.students)]
+    targets = [min(LEVELS, key=lambda level: abs(LEVEL_PRIORS[level.lower()] - s["theta"])) for s in students]
+    engine = AdaptiveEngine()
+
+    print(f"{args.students} students, {args.questions} questions, cap {args.max_rounds} rounds")
+    for name in ("ladder", "adaptive"):
+        rounds, costs = [], []
+        for student, target in zip(students, targets):
+            if name == "ladder":
+                n, cost = ladder(rng, student, bank, b, target, args.max_rounds)
+            else:
+                n, cost = adaptive_run(rng, engine, student, bank, b, target, args.max_rounds)
+            rounds.append(n)
+            costs.append(cost)
+        placed = sum(n < args.max_rounds for n in rounds) / len(rounds)
+        p90 = sorted(rounds)[int(0.9 * (len(rounds) - 1))]
+        print(f"{name:<9} rounds median {statistics.median(rounds):5.1f}  p90 {p90:3d}  "
+              f"mean {statistics.mean(rounds):5.2f}  placed {placed:6.1%}  "
+              f"select+update {statistics.mean(costs) * 1000:6.3f} ms/round")
+    print(f"ability state in session: {len(json.dumps(Ability.from_dict(None).to_dict()))}"
+          f"-{len(json.dumps(Ability(0.1234, 40, {i: [0.1234, 5] for i in range(8)}).to_dict()))} bytes")
+
+
+if __name__ == "__main__":
+    main()
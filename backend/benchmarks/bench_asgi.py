@@ -0,0 +1,103 @@
+"""
+Concurrent chatbot load: ``gunicorn app:app`` (sync WSGI) vs. ``uvicorn asgi:app``.
+
+Starts each server on a free local port with the fake LLM (``--llm-latency``
+seconds per answer, response cache disabled so every request waits on the
+model), fires ``--requests`` unique /chatbot requests from ``--concurrency``
+clients at once, and reports throughput and latency percentiles.
+
+Run from ``backend/``; the servers' database, banks and reports live in a
+temporary directory.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, proc, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def ask(port, i):
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    conn.request("POST", "/chatbot", body=json.dumps({"message": f"aptitude question number {i}"}),
+                 headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status, time.perf_counter() - start
+
+
+def load(port, requests, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda i: ask(port, i), range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(t for _, t in results)
+    ok = sum(status == 200 for status, _ in results)
+    return elapsed, ok, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.25)
+    parser.add_argument("--sync-workers", type=int, default=1, help="gunicorn workers (render.yaml uses the default, 1)")
+    args = parser.parse_args()
+
+    modes = {
+        "sync  gunicorn app:app": [sys.executable, "-m", "gunicorn", "-w", str(args.sync_workers),
+                                   "--timeout", "600", "app:app"],
+        "async uvicorn asgi:app": [sys.executable, "-m", "uvicorn", "--log-level", "warning", "asgi:app"],
+    }
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent, fake LLM latency {args.llm_latency}s")
+    for name, cmd in modes.items():
+        port = free_port()
+        bind = ["-b", f"127.0.0.1:{port}"] if "gunicorn" in cmd else ["--port", str(port)]
+        with tempfile.TemporaryDirectory(prefix="bench-asgi-") as tmp:
+            env = dict(os.environ, LLM_BACKEND="fake", LLM_FAKE_LATENCY=str(args.llm_latency), LLM_CACHE_SIZE="0",
+                       SECRET_KEY="bench", USERS_DB_PATH=os.path.join(tmp, "users.db"),
+                       QUESTION_BANK_DIR=os.path.join(tmp, "banks"), REPORTS_DIR=os.path.join(tmp, "reports"),
+                       QUESTION_STATS_PATH=os.path.join(tmp, "stats.npz"),
+                       ATTEMPT_DEAD_LETTER_PATH=os.path.join(tmp, "dead_letter.jsonl"))
+            proc = subprocess.Popen(cmd + bind, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_until_up(port, proc)
+                ask(port, -1)  # warm up imports and the model
+                elapsed, ok, latencies = load(port, args.requests, args.concurrency)
+            finally:
+                proc.terminate()
+                proc.wait()
+        p = lambda q: latencies[int(q * (len(latencies) - 1))] * 1000
+        print(f"{name:<24} {elapsed:7.2f}s {args.requests / elapsed:8.1f} req/s  ok {ok}/{args.requests}  "
+              f"p50 {p(0.5):8.1f}ms p95 {p(0.95):8.1f}ms p99 {p(0.99):8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Persisting graded attempts: one commit per /submit vs. the write-behind ``AttemptWriter``.
+
+Stores ``--attempts`` graded 10-answer attempts into a fresh SQLite file from
+``--threads`` concurrent "request" threads and reports the time each
+request spends persisting (p50/p99) plus overall attempts/s. ``commit``
+inserts through the ORM and commits per attempt (what a naive /submit would
+do); ``write-behind`` only queues, and the writer batches the inserts.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+import database  # noqa: F401  (WAL / busy_timeout on every SQLite connection)
+from attempt_log import AttemptWriter, attempt_rows, new_attempt_id
+from grading import grade_many
+from models import AnswerRecord, Attempt, db
+from question_bank import QuestionBank
+from benchmarks.bench_grading import make_attempts
+from benchmarks.synthetic import make_question_bank
+
+
+def make_app(path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def run(store, rows, threads):
+    def timed(row):
+        start = time.perf_counter()
+        store(row)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        latencies = sorted(pool.map(timed, rows))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    df = make_question_bank(5000)
+    bank = QuestionBank.from_frame(df)
+    grades = grade_many(bank, make_attempts(df, args.attempts))
+    rows = [attempt_rows(new_attempt_id(), f"student{i}", "bank", "Easy", "fail", g, 60.0)
+            for i, g in enumerate(grades)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "commit.db"))
+
+        def commit(row):
+            attempt, answers = row
+            with app.app_context():
+                db.session.add(Attempt(**attempt))
+                db.session.add_all(AnswerRecord(**answer) for answer in answers)
+                db.session.commit()
+
+        elapsed, latencies = run(commit, rows, args.threads)
+        report("commit per attempt", elapsed, latencies, args.attempts)
+
+        app = make_app(os.path.join(tmp, "behind.db"))
+        with app.app_context():
+            writer = AttemptWriter(db.engine)
+            start = time.perf_counter()
+            elapsed, latencies = run(lambda row: writer.record(*row), rows, args.threads)
+            writer.flush()
+            drained = time.perf_counter() - start
+            count = Attempt.query.count()
+        report("write-behind", elapsed, latencies, args.attempts)
+        print(f"  all {count} attempts on disk after {drained:.2f}s, "
+              f"{writer.stats['flushes']} flushes")
+
+
+def report(name, elapsed, latencies, n):
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+    print(f"{name:<20} {n / elapsed:9.0f} attempts/s   per-request p50 "
+          f"{statistics.median(latencies) * 1000:7.3f}ms  p99 {p99 * 1000:7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
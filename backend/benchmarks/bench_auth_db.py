@@ -0,0 +1,132 @@
+"""
+Signup/login throughput from N processes sharing one SQLite users database.
+
+Each of ``--procs`` worker processes (standing in for gunicorn workers)
+performs ``--users`` signups and then the same number of logins through the
+Flask test client against one fresh database file, after all processes are
+ready. Two configurations:
+
+- legacy: default Flask-SQLAlchemy engine (rollback journal, 5 s timeout) and
+  the old query-then-insert /signup;
+- tuned:  the app as shipped (``database``: WAL, busy_timeout,
+  synchronous=NORMAL, pooled engine; insert-and-catch /signup).
+
+Password hashing is swapped for a 1-iteration PBKDF2 in both, so the numbers
+reflect database contention rather than hashing cost. Failed requests
+(e.g. "database is locked") are counted.
+
+Run from ``backend/``.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+WORKER = r"""
+import json, os, sys, time
+from functools import partial
+from werkzeug.security import generate_password_hash, check_password_hash
+mode, worker, users = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+fast_hash = partial(generate_password_hash, method="pbkdf2:sha256:1")
+
+if mode == "tuned":
+    os.environ["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:1"
+    from app import app
+else:
+    from flask import Flask, request, jsonify
+    from flask_sqlalchemy import SQLAlchemy
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.environ["USERS_DB_PATH"]
+    db = SQLAlchemy(app)
+
+    class User(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        username = db.Column(db.String(100), unique=True, nullable=False)
+        password = db.Column(db.String(200), nullable=False)
+
+    @app.route("/signup", methods=["POST"])
+    def signup():
+        data = request.json
+        if User.query.filter_by(username=data["username"]).first():
+            return jsonify({"error": "Username already exists"}), 400
+        db.session.add(User(username=data["username"], password=fast_hash(data["password"])))
+        db.session.commit()
+        return jsonify({"message": "Signup successful!"})
+
+    @app.route("/login", methods=["POST"])
+    def login():
+        data = request.json
+        user = User.query.filter_by(username=data["username"]).first()
+        if not user or not check_password_hash(user.password, data["password"]):
+            return jsonify({"error": "Invalid username or password"}), 401
+        return jsonify({"message": "Login successful!"})
+
+client = app.test_client()
+print("ready", flush=True)
+sys.stdin.readline()
+statuses = {}
+start = time.perf_counter()
+for path in ("/signup", "/login"):
+    for i in range(users):
+        try:
+            status = client.post(path, json={"username": f"w{worker}u{i}", "password": "pw"}).status_code
+        except Exception:
+            status = "exception"
+        statuses[f"{path} {status}"] = statuses.get(f"{path} {status}", 0) + 1
+print(json.dumps({"seconds": time.perf_counter() - start, "statuses": statuses}), flush=True)
+"""
+
+
+def run(mode, procs, users, db_path):
+    env = dict(os.environ, USERS_DB_PATH=db_path, LLM_BACKEND="fake", SECRET_KEY="bench")
+    if mode == "legacy":
+        # The legacy app creates its table here, before the workers start.
+        subprocess.run([sys.executable, "-c", WORKER.replace("client = app.test_client()",
+                        "with app.app_context(): db.create_all()\nraise SystemExit"), mode, "0", "0"],
+                       env=env, check=True, capture_output=True)
+    workers = [subprocess.Popen([sys.executable, "-W", "ignore", "-c", WORKER, mode, str(w), str(users)],
+                                env=env, cwd=os.getcwd(), text=True,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+               for w in range(procs)]
+    for w in workers:
+        line = w.stdout.readline()
+        if line.strip() != "ready":
+            raise RuntimeError(f"worker failed to start ({mode}): {line!r}")
+    start = time.perf_counter()
+    for w in workers:
+        w.stdin.write("go\n")
+        w.stdin.flush()
+    results = [json.loads(w.stdout.readline()) for w in workers]
+    elapsed = time.perf_counter() - start
+    for w in workers:
+        w.wait()
+
+    statuses = {}
+    for result in results:
+        for key, count in result["statuses"].items():
+            statuses[key] = statuses.get(key, 0) + count
+    return elapsed, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--procs", default="1,4,8")
+    parser.add_argument("--users", type=int, default=200, help="signups (and logins) per process")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'procs':>5} {'ops/s':>9} {'failed':>7}  statuses")
+    for procs in map(int, args.procs.split(",")):
+        for mode in ("legacy", "tuned"):
+            with tempfile.TemporaryDirectory() as tmp:
+                elapsed, statuses = run(mode, procs, args.users, os.path.join(tmp, "users.db"))
+            ops = 2 * procs * args.users
+            failed = sum(n for key, n in statuses.items() if not key.endswith(" 200"))
+            print(f"{mode:<8} {procs:>5} {ops / elapsed:>9.0f} {failed:>7}  {json.dumps(statuses, sort_keys=True)}")
+
+
+if __name__ == "__main__":
+    main()
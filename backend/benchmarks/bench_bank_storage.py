@@ -0,0 +1,73 @@
+"""
+Worker start-up cost for a question bank: re-parsing the upload vs. mapping the stored bank.
+
+For each bank size the CSV is written once and stored once with
+``bank_storage``; then a fresh subprocess (standing in for a new gunicorn
+worker) either parses the CSV and builds the indexes, or memory-maps the
+stored bank, and reports the time taken and its private (anonymous) RSS
+growth. Mapped pages are file-backed and shared between workers.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bank_storage import BankStore, bank_key
+from question_bank import QuestionBank
+from benchmarks.synthetic import make_question_bank
+
+WORKER = r"""
+import json, sys, time
+def rss_anon():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) * 1024
+    return 0
+import numpy, pandas
+from question_bank import QuestionBank
+from bank_storage import BankStore
+mode, path, arg = sys.argv[1:4]
+base = rss_anon()
+start = time.perf_counter()
+if mode == "parse":
+    bank = QuestionBank.from_frame(pandas.read_csv(path, sep=";"))
+else:
+    bank = BankStore(path).get(arg)
+bank.records(bank.difficulty_positions("easy")[:10])
+print(json.dumps({"seconds": time.perf_counter() - start, "rss_anon": rss_anon() - base}))
+"""
+
+
+def run_worker(*args):
+    out = subprocess.run([sys.executable, "-c", WORKER, *args], capture_output=True,
+                         text=True, check=True, cwd=os.getcwd())
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,50000,200000")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'parse ms':>9} {'parse RSS MB':>13} {'mmap ms':>8} {'mmap RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in map(int, args.sizes.split(",")):
+            csv_path = os.path.join(tmp, f"bank{size}.csv")
+            make_question_bank(size).to_csv(csv_path, sep=";", index=False)
+            with open(csv_path, "rb") as f:
+                bank_id = bank_key(f.read(), csv_path)
+            store_dir = os.path.join(tmp, "banks")
+            BankStore(store_dir).put(bank_id, QuestionBank.from_frame(make_question_bank(size)))
+
+            parse = run_worker("parse", csv_path, "")
+            mapped = run_worker("mmap", store_dir, bank_id)
+            print(f"{size:>8} {parse['seconds'] * 1e3:>9.1f} {parse['rss_anon'] / 1e6:>13.1f} "
+                  f"{mapped['seconds'] * 1e3:>8.1f} {mapped['rss_anon'] / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
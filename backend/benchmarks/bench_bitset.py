@@ -0,0 +1,89 @@
+"""
+Memory for used-question tracking: per-difficulty ``set`` of ids vs. QuestionBitset.
+
+Simulates ``--students`` active students on a ``--bank``-question bank, each
+having been served ``--seen`` questions, and reports resident size (via
+tracemalloc) and serialized size per student, plus the cost of the
+"available at this level" set difference.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from bitset import QuestionBitset
+
+LEVELS = ("Very easy", "Easy", "Moderate", "Difficult")
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objs = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return objs, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--bank", type=int, default=20000)
+    parser.add_argument("--seen", default="30,200,1000")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    level_of = rng.integers(0, len(LEVELS), args.bank)
+    candidates = np.flatnonzero(level_of == 1)
+
+    print(f"{args.students} students, {args.bank}-question bank")
+    print(f"{'seen':>6} {'sets MB':>9} {'bitset MB':>10} {'json B/st':>10} "
+          f"{'bitset B/st':>12} {'sets diff us':>13} {'bitset diff us':>15}")
+    for seen in map(int, args.seen.split(",")):
+        picks = [rng.choice(args.bank, seen, replace=False) for _ in range(args.students)]
+
+        def build_sets():
+            out = []
+            for pos in picks:
+                used = {level: set() for level in LEVELS}
+                for p in pos.tolist():
+                    used[LEVELS[level_of[p]]].add(p + 1)
+                out.append(used)
+            return out
+
+        def build_bitsets():
+            out = []
+            for pos in picks:
+                bits = QuestionBitset(args.bank)
+                bits.add(pos)
+                out.append(bits)
+            return out
+
+        sets, sets_mem = measure(build_sets)
+        bitsets, bits_mem = measure(build_bitsets)
+
+        sample = range(0, args.students, max(1, args.students // 200))
+        json_size = np.mean([len(json.dumps({k: sorted(v) for k, v in sets[i].items()})) for i in sample])
+        bits_size = np.mean([len(bitsets[i].to_bytes()) for i in sample])
+
+        cand_ids = candidates + 1
+        start = time.perf_counter()
+        for i in sample:
+            used = np.fromiter(sets[i]["Easy"], dtype=np.int64)
+            cand_ids[~np.isin(cand_ids, used)]
+        sets_diff = (time.perf_counter() - start) / len(sample)
+        start = time.perf_counter()
+        for i in sample:
+            bitsets[i].difference(candidates)
+        bits_diff = (time.perf_counter() - start) / len(sample)
+
+        print(f"{seen:>6} {sets_mem / 1e6:>9.1f} {bits_mem / 1e6:>10.1f} {json_size:>10.0f} "
+              f"{bits_size:>12.0f} {sets_diff * 1e6:>13.1f} {bits_diff * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Calibration job throughput and memory: chunked ``calibration.calibrate`` vs.
+loading the whole answer table into pandas.
+
+Fills a fresh SQLite file with ``--records`` answer records. They come from
+simulated 10-question attempts: Rasch abilities, per-question difficulty
+and median time, and 1% of questions with a wrong answer key. The benchmark
+then reports answers/s, peak Python allocation (tracemalloc) and how well
+the estimates recover the simulated values: p-value correlation, median
+time error, and which miskeyed questions got flagged.
+
+Run from ``backend/``.
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from calibration import QUERY, QuestionStats, calibrate
+
+SCHEMA = """
+CREATE TABLE attempt (id TEXT PRIMARY KEY, student TEXT, bank_id TEXT, score INTEGER,
+                      answered INTEGER, submitted_at REAL);
+CREATE TABLE answer_record (id INTEGER PRIMARY KEY, attempt_id TEXT, position INTEGER,
+                            bank_id TEXT, question_id INTEGER, is_correct BOOLEAN, time_taken REAL);
+"""
+
+
+def fill(path, records, questions, seed=0):
+    rng = np.random.default_rng(seed)
+    b = rng.normal(0, 1.2, questions)
+    median = rng.uniform(10, 120, questions)
+    miskeyed = rng.random(questions) < 0.01
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    attempts = records // 10
+    for start in range(0, attempts, 20_000):
+        n = min(20_000, attempts - start)
+        theta = rng.normal(0, 1, n)
+        qs = rng.integers(0, questions, (n, 10))
+        correct = rng.random((n, 10)) < 1 / (1 + np.exp(-(theta[:, None] - b[qs])))
+        correct = np.where(miskeyed[qs], rng.random((n, 10)) < 0.3 * (1 - correct), correct)
+        times = median[qs] * rng.lognormal(0, 0.4, (n, 10))
+        ids = [f"a{start + i}" for i in range(n)]
+        conn.executemany("INSERT INTO attempt VALUES (?, 's', 'bank', ?, 10, 0)",
+                         zip(ids, correct.sum(axis=1).tolist()))
+        conn.executemany(
+            "INSERT INTO answer_record (attempt_id, position, bank_id, question_id, is_correct, time_taken) "
+            "VALUES (?, ?, 'bank', ?, ?, ?)",
+            ((ids[i], j, int(qs[i, j]) + 1, bool(correct[i, j]), float(times[i, j]))
+             for i in range(n) for j in range(10)))
+        conn.commit()
+    conn.close()
+    return 1 / (1 + np.exp(b)), median, miskeyed
+
+
+def pandas_baseline(path):
+    conn = sqlite3.connect(path)
+    df = pd.read_sql_query(QUERY, conn)
+    conn.close()
+    groups = df.groupby(["bank_id", "question_id"])
+    return groups["is_correct"].mean(), groups["time_taken"].median()
+
+
+def measured(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "users.db")
+        start = time.perf_counter()
+        true_p, true_median, miskeyed = fill(path, args.records, args.questions)
+        print(f"{args.records} answers over {args.questions} questions (built in {time.perf_counter() - start:.1f}s)")
+
+        _, elapsed, peak = measured(pandas_baseline, path)
+        print(f"{'pandas (whole table)':<22} {args.records / elapsed:>10.0f} answers/s  peak {peak / 2 ** 20:7.1f} MiB")
+        acc, elapsed, peak = measured(calibrate, path, args.chunk)
+        print(f"{'chunked accumulator':<22} {args.records / elapsed:>10.0f} answers/s  peak {peak / 2 ** 20:7.1f} MiB")
+
+        result = acc.result()
+        stats = QuestionStats(**result)
+        qids = np.arange(1, args.questions + 1)
+        rows = stats.rows("bank", qids)
+        known = rows >= 0
+        p = stats.p_value[rows[known]]
+        median = stats.median_time[rows[known]]
+        flagged = stats.discrimination[rows[known]] < 0
+        fine = ~miskeyed[known]
+        print(f"calibrated {known.sum()} / {args.questions} questions, "
+              f"lookup {sum(a.nbytes for a in result.values()) / 1024:.0f} KiB")
+        print(f"p-value corr {np.corrcoef(p[fine], true_p[known][fine])[0, 1]:.3f}, "
+              f"median time error {np.median(np.abs(median / true_median[known] - 1)):.1%}, "
+              f"miskeyed flagged {flagged[~fine].sum()}/{(~fine).sum()}, "
+              f"false flags {flagged[fine].sum()}")
+
+
+if __name__ == "__main__":
+    main()
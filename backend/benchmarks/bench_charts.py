@@ -0,0 +1,101 @@
+"""
+Report chart throughput: per-call seaborn figures vs. the chart service.
+
+Renders the three report charts for ``--students`` synthetic 10-question
+results three ways:
+
+- legacy:   a fresh seaborn figure per chart (the previous report code)
+- template: ``ml_model.charts`` with the PNG cache disabled (figure reuse only)
+- cached:   ``ml_model.charts`` with the PNG cache, as served
+"""
+
+import argparse
+import time
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+from benchmarks.bench_parallel_reports import make_solutions
+from ml_model import charts
+
+
+def report_inputs(i):
+    df = pd.DataFrame(make_solutions(i))
+    topic_acc = df.groupby("topic")["is_correct"].mean() * 100
+    subtopic_acc = df.groupby("subtopic")["is_correct"].mean() * 100
+    fundamentals = {
+        "Listening": max(0, 100 - df["time_taken"].mean()),
+        "Grasping": df["is_correct"].mean() * 100,
+        "Retention": 100 - df[~df["is_correct"]].shape[0]/df.shape[0]*100,
+        "Application": 0.0,
+    }
+    return topic_acc, subtopic_acc, fundamentals
+
+
+def legacy_bar(x, y, palette, title, ylabel, figsize):
+    plt.figure(figsize=figsize)
+    sns.barplot(x=x, y=y, hue=x, palette=palette, legend=False)
+    plt.ylim(0, 100)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    buf = BytesIO()
+    plt.savefig(buf, format="png")
+    plt.close()
+    return buf.getvalue()
+
+
+def render_legacy(topic_acc, subtopic_acc, fundamentals):
+    legacy_bar(list(topic_acc.index), list(topic_acc.values), "Blues_d", "Topic Accuracy", "Accuracy (%)", (8, 5))
+    legacy_bar(list(subtopic_acc.index), list(subtopic_acc.values), "Greens_d", "Subtopic Accuracy",
+               "Accuracy (%)", (10, 5))
+    legacy_bar(list(fundamentals.keys()), list(fundamentals.values()), "Oranges_d", "Learning Fundamentals",
+               "Score (%)", (6, 4))
+
+
+def render_service(topic_acc, subtopic_acc, fundamentals):
+    charts.render_bar(charts.REPORT_TOPIC, topic_acc.index, topic_acc.values, "Topic Accuracy")
+    charts.render_bar(charts.REPORT_SUBTOPIC, subtopic_acc.index, subtopic_acc.values, "Subtopic Accuracy")
+    charts.render_bar(charts.REPORT_FUNDAMENTALS, fundamentals.keys(), fundamentals.values(),
+                      "Learning Fundamentals")
+
+
+def run(render, inputs):
+    start = time.perf_counter()
+    for args in inputs:
+        render(*args)
+    return 3 * len(inputs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--profiles", type=int, default=64,
+                        help="distinct score profiles among the students")
+    args = parser.parse_args()
+
+    inputs = [report_inputs(i % args.profiles) for i in range(args.students)]
+
+    legacy = run(render_legacy, inputs)
+
+    maxsize = charts._png_cache.maxsize
+    charts._png_cache.maxsize = 0
+    template = run(render_service, inputs)
+    charts._png_cache.maxsize = maxsize
+
+    charts.clear_cache()
+    cached = run(render_service, inputs)
+    info = charts.cache_info()
+
+    print(f"{args.students} students, {args.profiles} distinct profiles, 3 charts each")
+    print(f"{'legacy (seaborn per call)':<28} {legacy:8.1f} charts/s")
+    print(f"{'template, no cache':<28} {template:8.1f} charts/s  ({template / legacy:.1f}x)")
+    print(f"{'template + PNG cache':<28} {cached:8.1f} charts/s  ({cached / legacy:.1f}x, "
+          f"{info['hits']} hits / {info['misses']} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Time to first byte for /chatbot vs. /chatbot/stream, plus timeout and disconnect checks.
+
+Serves the app on a local port with the fake LLM (``--llm-latency`` seconds
+per answer, streamed word by word) and measures, over real HTTP, how long a
+client waits for the first byte and for the complete answer. Every prompt is
+unique, so the response cache never answers.
+
+Then checks that:
+- the stream's median TTFB is under half of /chatbot's;
+- a stream with ``CHATBOT_STREAM_TIMEOUT`` below the model latency ends with
+  an ``error`` event;
+- a client that disconnects after the first event stops the model stream
+  (fewer chunks are produced than a full answer has).
+Exits with status 1 if any check fails.
+
+Run from ``backend/``; the app's database, banks and reports live in a
+temporary directory.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+
+def request(port, path, message):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    start = time.perf_counter()
+    conn.request("POST", path, body=json.dumps({"message": message}),
+                 headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    first = response.read1(1 << 16) if hasattr(response, "read1") else response.read(1)
+    ttfb = time.perf_counter() - start
+    body = first + response.read()
+    total = time.perf_counter() - start
+    conn.close()
+    return ttfb, total, body.decode("utf-8")
+
+
+def run(args, tmp):
+    """Serve the app with all state under ``tmp`` and run the checks; returns the failures."""
+    os.environ.update({
+        "LLM_BACKEND": "fake", "LLM_FAKE_LATENCY": str(args.llm_latency), "SECRET_KEY": "bench",
+        "USERS_DB_PATH": os.path.join(tmp, "users.db"), "QUESTION_BANK_DIR": os.path.join(tmp, "banks"),
+        "REPORTS_DIR": os.path.join(tmp, "reports"), "QUESTION_STATS_PATH": os.path.join(tmp, "stats.npz"),
+        "ATTEMPT_DEAD_LETTER_PATH": os.path.join(tmp, "dead_letter.jsonl"),
+    })
+    sys.path.insert(0, os.getcwd())
+    from werkzeug.serving import make_server
+    import app as appmod
+    from llm_gateway import get_gateway
+
+    server = make_server("127.0.0.1", 0, appmod.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    print(f"{args.requests} unique prompts, fake LLM latency {args.llm_latency:.1f}s")
+    failures = []
+    median_ttfb = {}
+    for path in ("/chatbot", "/chatbot/stream"):
+        ttfbs, totals = [], []
+        for i in range(args.requests):
+            ttfb, total, _ = request(port, path, f"question {path} {i} about ratios and proportions")
+            ttfbs.append(ttfb)
+            totals.append(total)
+        median_ttfb[path] = statistics.median(ttfbs)
+        print(f"{path:<16} TTFB p50 {statistics.median(ttfbs) * 1000:7.1f}ms   "
+              f"complete p50 {statistics.median(totals) * 1000:7.1f}ms")
+
+    if not median_ttfb["/chatbot/stream"] < median_ttfb["/chatbot"] / 2:
+        failures.append("streaming TTFB is not clearly below the non-streaming TTFB")
+
+    appmod.CHATBOT_STREAM_TIMEOUT = args.llm_latency / 4
+    _, total, body = request(port, "/chatbot/stream", "a question that will time out")
+    print(f"timeout {appmod.CHATBOT_STREAM_TIMEOUT:.2f}s -> error event: {'event: error' in body} "
+          f"after {total:.2f}s")
+    if "event: error" not in body:
+        failures.append("timed-out stream did not end with an error event")
+    appmod.CHATBOT_STREAM_TIMEOUT = 60
+
+    model = get_gateway().model
+    before = model.chunks
+    message = "disconnect after the first chunk " * 5
+    body = json.dumps({"message": message}).encode()
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(b"POST /chatbot/stream HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Type: application/json\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        while b"data:" not in sock.recv(1 << 16):
+            pass
+    time.sleep(args.llm_latency * 1.5)
+    words = len(f"[fake x] {message}".split())
+    produced = model.chunks - before
+    print(f"disconnect after first event: {produced} of {words} chunks produced "
+          f"(stopped early: {produced < words})")
+    if produced >= words:
+        failures.append("disconnect did not stop the model stream")
+
+    server.shutdown()
+    print(json.dumps(get_gateway().stats()))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="chatbot-stream-") as tmp:
+        failures = run(args, tmp)
+    for failure in failures:
+        print("FAILED:", failure)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
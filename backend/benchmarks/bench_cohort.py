@@ -0,0 +1,42 @@
+"""
+Cohort report throughput (reports/min) at 1, 4 and all-core workers.
+
+Generates ``--students`` students with distinct 10-question score profiles,
+runs ``cohort.generate_cohort`` with each worker count, and reports
+wall-clock throughput. Process start-up and the per-process matplotlib
+import are included, as they are for a real run. Chart PNG caches are
+per process, so every run starts cold.
+
+Run from ``backend/``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_parallel_reports import make_solutions
+from cohort import cohort_summary, generate_cohort, write_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--workers", default=f"1,4,{os.cpu_count() or 1}")
+    args = parser.parse_args()
+
+    students = [(f"student{i}", make_solutions(i)) for i in range(args.students)]
+    print(f"{args.students} students, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'seconds':>8} {'reports/min':>12}")
+    for workers in dict.fromkeys(int(w) for w in args.workers.split(",")):
+        with tempfile.TemporaryDirectory() as out:
+            start = time.perf_counter()
+            results = generate_cohort(students, out, workers=workers)
+            write_summary(cohort_summary(results), out)
+            elapsed = time.perf_counter() - start
+            assert len(results) == args.students
+        print(f"{workers:>7} {elapsed:>8.2f} {args.students / elapsed * 60:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
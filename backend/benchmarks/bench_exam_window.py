@@ -0,0 +1,343 @@
+"""
+Exam window: many students taking a test at once, end to end.
+
+Each of ``--students`` simulated students runs the full flow:
+
+    signup -> login -> upload (question bank CSV) -> ``--submits`` x submit -> generate_report
+
+``--concurrency`` students run at the same time. The bank is synthetic
+(``--questions`` rows, ``--topics`` x ``--subtopics``, difficulty ``--mix``),
+and each student answers the served questions correctly with their own
+probability. The fake Gemini backend is used (``--llm-latency`` seconds per
+call), and every report is for a new student, so the report store never
+serves a cached one.
+
+Targets:
+- ``--target client`` (default): the Flask test client, in process
+- ``--target server``: ``gunicorn app:app`` with ``--workers`` workers on a
+  local port, with sessions in SQLite so any worker can serve any request
+
+Printed per endpoint: count, errors, p50/p95/p99/max latency and requests/s
+over the whole run. Also printed: the server-side stage timings from
+/metrics (select_questions, grading, charts, docx_save). ``--json PATH``
+writes the same numbers as JSON. With ``--baseline PATH`` (an earlier
+``--json`` output), the run exits with status 1 if any endpoint's p95 or
+any stage's mean got slower than the baseline by more than
+``--tolerance``, or if any request failed. CI can use this as a regression
+gate.
+
+Everything (database, banks, sessions, reports) lives in a temporary
+directory that is removed when the run ends. Run from ``backend/``.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_asgi import free_port, wait_until_up
+from benchmarks.synthetic import DIFFICULTY_MIX, make_question_bank
+
+ENDPOINTS = ("signup", "login", "upload", "submit", "generate_report")
+STAGES = ("select_questions", "grading", "charts", "docx_save")
+
+
+# -------------------- Targets --------------------
+class TestClientTarget:
+    """In-process Flask app; one test client per thread."""
+
+    def __init__(self):
+        import app as appmod
+        self.app = appmod.app
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    def post_json(self, path, body, headers=None):
+        resp = self._client().post(path, json=body, headers=headers or {})
+        return resp.status_code, resp.get_json(silent=True)
+
+    def upload(self, path, filename, payload, headers=None):
+        import io
+        resp = self._client().post(path, data={"file": (io.BytesIO(payload), filename)},
+                                   headers=headers or {}, content_type="multipart/form-data")
+        return resp.status_code, resp.get_json(silent=True)
+
+    def get_text(self, path):
+        return self._client().get(path).get_data(as_text=True)
+
+    def close(self):
+        import app as appmod
+        appmod.report_jobs.shutdown()
+        # Write buffered state now, while the temporary directory still exists.
+        appmod.attempt_writer.flush()
+        appmod.adaptive_engine.save()
+
+
+class ServerTarget:
+    """``gunicorn app:app`` on a local port."""
+
+    def __init__(self, workers, env):
+        self.port = free_port()
+        self.proc = subprocess.Popen(
+            [sys.executable, "-W", "ignore", "-m", "gunicorn", "app:app", "--workers", str(workers),
+             "--bind", f"127.0.0.1:{self.port}", "--timeout", "300"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        wait_until_up(self.port, self.proc)
+
+    def _request(self, method, path, body=b"", headers=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=300)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            data = resp.read()
+        finally:
+            conn.close()
+        return resp.status, data
+
+    def post_json(self, path, body, headers=None):
+        status, data = self._request("POST", path, json.dumps(body).encode(),
+                                     dict(headers or {}, **{"Content-Type": "application/json"}))
+        try:
+            return status, json.loads(data)
+        except ValueError:
+            return status, None  # a DOCX
+
+    def upload(self, path, filename, payload, headers=None):
+        boundary = uuid.uuid4().hex
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+                f"Content-Type: text/csv\r\n\r\n").encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+        status, data = self._request("POST", path, body, dict(
+            headers or {}, **{"Content-Type": f"multipart/form-data; boundary={boundary}"}))
+        return status, json.loads(data)
+
+    def get_text(self, path):
+        return self._request("GET", path)[1].decode()
+
+    def close(self):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+# -------------------- Student Flow --------------------
+class Recorder:
+    def __init__(self):
+        self.latencies = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+        self._lock = threading.Lock()
+
+    def call(self, name, fn, *args, ok=(200,)):
+        start = time.perf_counter()
+        status, body = fn(*args)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[name].append(elapsed)
+            if status not in ok:
+                self.errors[name] += 1
+        if status not in ok:
+            raise RuntimeError(f"{name}: HTTP {status} {body}")
+        return body
+
+
+def run_student(target, recorder, i, bank_csv, answer_key, submits, run_id):
+    rng = random.Random(i)
+    skill = rng.uniform(0.3, 0.95)
+    username = f"student-{run_id}-{i}"
+    credentials = {"username": username, "password": f"pw-{i}-exam"}
+
+    recorder.call("signup", target.post_json, "/signup", credentials)
+    token = recorder.call("login", target.post_json, "/login", credentials)["token"]
+    headers = {"X-Session-Token": token}
+
+    questions = recorder.call("upload", target.upload, "/upload", "bank.csv", bank_csv, headers)["questions"]
+    solutions = []
+    for _ in range(submits):
+        answers, time_logs = {}, {}
+        for q in questions:
+            qid = str(q["id"])
+            answers[qid] = answer_key[qid] if rng.random() < skill else "z"
+            time_logs[qid] = round(rng.uniform(5, 90), 2)
+        result = recorder.call("submit", target.post_json, "/submit",
+                               {"answers": answers, "time_logs": time_logs}, headers)
+        solutions = result["solutions"]
+        questions = result["questions"]
+
+    recorder.call("generate_report", target.post_json, "/generate_report",
+                  {"solutions": solutions, "student_name": username}, headers)
+
+
+# -------------------- Results --------------------
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def endpoint_stats(recorder, wall):
+    out = {}
+    for name in ENDPOINTS:
+        values = sorted(recorder.latencies[name])
+        out[name] = {
+            "count": len(values), "errors": recorder.errors[name],
+            "p50_ms": percentile(values, 50) * 1000, "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000 if values else float("nan"),
+            "rps": len(values) / wall,
+        }
+    return out
+
+
+def stage_stats(metrics_text):
+    """Mean duration per stage from the /metrics exposition."""
+    sums, counts = {}, {}
+    for line in metrics_text.splitlines():
+        for suffix, target in (("_sum", sums), ("_count", counts)):
+            prefix = f"stage_duration_seconds{suffix}{{stage=\""
+            if line.startswith(prefix):
+                stage, value = line[len(prefix):].split("\"}")
+                target[stage] = float(value)
+    return {stage: {"count": int(counts[stage]), "mean_ms": sums[stage] / counts[stage] * 1000}
+            for stage in STAGES if counts.get(stage)}
+
+
+def regressions(result, baseline, tolerance):
+    found = []
+    for name, stats in result["endpoints"].items():
+        if stats["errors"]:
+            found.append(f"{name}: {stats['errors']} failed requests")
+        old = baseline.get("endpoints", {}).get(name)
+        if old and stats["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {stats['p95_ms']:.1f} ms vs {old['p95_ms']:.1f} ms")
+    for stage, stats in result["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old and stats["mean_ms"] > old["mean_ms"] * (1 + tolerance):
+            found.append(f"stage {stage}: mean {stats['mean_ms']:.2f} ms vs {old['mean_ms']:.2f} ms")
+    return found
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        level, weight = part.rsplit("=", 1)
+        mix[level.strip()] = float(weight)
+    return mix
+
+
+def run(args, tmp):
+    """Run the exam window with all state under ``tmp``; returns timings and failures."""
+    env = {
+        "LLM_BACKEND": "fake", "LLM_FAKE_LATENCY": str(args.llm_latency), "SECRET_KEY": "bench",
+        "USERS_DB_PATH": os.path.join(tmp, "users.db"), "QUESTION_BANK_DIR": os.path.join(tmp, "banks"),
+        "REPORTS_DIR": os.path.join(tmp, "reports"), "QUESTION_STATS_PATH": os.path.join(tmp, "stats.npz"),
+        "SESSION_BACKEND": "sqlite", "SESSION_DB_PATH": os.path.join(tmp, "sessions.db"),
+    }
+    if args.target == "server":
+        # Each gunicorn worker writes its metrics here; /metrics adds them up.
+        env["METRICS_DIR"] = os.path.join(tmp, "metrics")
+    os.environ.update(env)
+
+    bank = make_question_bank(args.questions, num_topics=args.topics, subtopics_per_topic=args.subtopics,
+                              difficulty_mix=parse_mix(args.mix), seed=args.seed)
+    bank_csv = bank.to_csv(index=False, sep=";").encode()
+    answer_key = dict(zip(bank["id"].astype(str), bank["answer"]))
+
+    sys.path.insert(0, os.getcwd())
+    target = ServerTarget(args.workers, dict(os.environ)) if args.target == "server" else TestClientTarget()
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    failures = []
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            futures = [pool.submit(run_student, target, recorder, i, bank_csv, answer_key, args.submits, run_id)
+                       for i in range(args.students)]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    failures.append(str(e))
+        wall = time.perf_counter() - start
+        stages = stage_stats(target.get_text("/metrics"))
+    finally:
+        target.close()
+    return wall, stages, recorder, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["client", "server"], default="client")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers (server target)")
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--submits", type=int, default=3)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=8)
+    parser.add_argument("--subtopics", type=int, default=5)
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DIFFICULTY_MIX.items()),
+                        help="difficulty weights, e.g. 'Very easy=0.4,Easy=0.3,Moderate=0.2,Difficult=0.1'")
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="exam-window-") as tmp:
+        wall, stages, recorder, failures = run(args, tmp)
+
+    result = {
+        "config": vars(args),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "wall_seconds": wall,
+        "students_completed": args.students - len(failures),
+        "students_per_minute": (args.students - len(failures)) / wall * 60,
+        "endpoints": endpoint_stats(recorder, wall),
+        "stages": stages,
+    }
+
+    print(f"{args.students} students x {args.submits} submits, concurrency {args.concurrency}, "
+          f"{args.target} target, {args.questions}-question bank: {wall:.1f}s "
+          f"({result['students_per_minute']:.0f} students/min)")
+    print(f"{'endpoint':<16} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'req/s':>7}")
+    for name, s in result["endpoints"].items():
+        print(f"{name:<16} {s['count']:>6} {s['errors']:>6} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} "
+              f"{s['p99_ms']:>8.1f} {s['max_ms']:>8.1f} {s['rps']:>7.1f}")
+    print(f"\n{'stage':<16} {'count':>6} {'mean ms':>8}")
+    for stage, s in stages.items():
+        print(f"{stage:<16} {s['count']:>6} {s['mean_ms']:>8.2f}")
+    for failure in failures[:5]:
+        print("failed:", failure)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(result, json.load(f), args.tolerance)
+        for line in found:
+            print("REGRESSION", line)
+        if found:
+            raise SystemExit(1)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
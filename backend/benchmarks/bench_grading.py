@@ -0,0 +1,123 @@
+"""
+Grading cost: the per-item /submit loop vs. ``grading.grade`` / ``grade_many``.
+
+Grades ``--attempts`` synthetic attempts (10 answers each, with some unknown
+ids, padded/upper-cased answers and unparsable or negative times mixed in)
+against a ``--bank``-question bank, one attempt at a time with both
+implementations and all at once with ``grade_many``, and checks that every
+attempt gets the same score, solutions, average and slowest question.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from grading import grade, grade_many
+from question_bank import QuestionBank
+from benchmarks.synthetic import make_question_bank
+
+
+def legacy_grade(bank, answers, time_logs):
+    """The /submit loop before ``grading`` (same fields, per-item lookups)."""
+    correct_count = 0
+    solutions = []
+    total_time = 0
+    max_time_val = -1
+    max_time_q = None
+    for qid, user_ans in answers.items():
+        try:
+            row = bank.row(qid)
+            if row is None:
+                continue
+            correct_ans = str(row["answer"]).strip().lower()
+            is_correct = correct_ans == str(user_ans).strip().lower()
+            if is_correct:
+                correct_count += 1
+            q_time = float(time_logs.get(str(qid), 0))
+            total_time += q_time
+            if q_time > max_time_val:
+                max_time_val = q_time
+                max_time_q = row["question_text"]
+            solutions.append({
+                "question": row["question_text"],
+                "user_answer": user_ans,
+                "correct_answer": row["answer"],
+                "is_correct": is_correct,
+                "time_taken": round(q_time, 2),
+                "topic": row.get("topic", "General"),
+                "subtopic": row.get("subtopic", "General")
+            })
+        except Exception:
+            continue
+    avg_time = round(total_time / len(answers), 2) if answers else 0
+    return correct_count, solutions, avg_time, max_time_q, round(max_time_val, 2)
+
+
+def make_attempts(df, count, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = df["id"].to_numpy()
+    keys = df["answer"].to_numpy()
+    attempts = []
+    for _ in range(count):
+        answers, time_logs = {}, {}
+        for i in rng.choice(len(ids), 10, replace=False):
+            qid = str(ids[i]) if rng.random() < 0.9 else f"{ids[i]}.0"
+            if rng.random() < 0.05:
+                qid = str(len(ids) + 1 + int(rng.integers(1000)))  # unknown id
+            roll = rng.random()
+            answers[qid] = keys[i] if roll < 0.5 else (f" {keys[i].upper()} " if roll < 0.7 else "z")
+            roll = rng.random()
+            time_logs[qid] = "n/a" if roll < 0.03 else (-3.0 if roll < 0.06 else round(float(rng.uniform(1, 90)), 2))
+        attempts.append((answers, time_logs))
+    return attempts
+
+
+def comparable(graded):
+    solutions = [{k: v for k, v in s.items() if k not in ("question_id", "difficulty")} for s in graded.solutions]
+    return graded.score, solutions, graded.average_time, graded.max_time_question, round(graded.max_time_value, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bank", type=int, default=20000)
+    parser.add_argument("--attempts", type=int, default=10000)
+    args = parser.parse_args()
+
+    df = make_question_bank(args.bank)
+    bank = QuestionBank.from_frame(df)
+    attempts = make_attempts(df, args.attempts)
+
+    start = time.perf_counter()
+    legacy = [legacy_grade(bank, a, t) for a, t in attempts]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [grade(bank, a, t) for a, t in attempts]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk = grade_many(bank, attempts)
+    bulk_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores_only = grade_many(bank, attempts, with_solutions=False)
+    scores_s = time.perf_counter() - start
+
+    mismatched = [i for i, (old, new, many) in enumerate(zip(legacy, single, bulk))
+                  if old != comparable(new) or comparable(new) != comparable(many)]
+    mismatched += [i for i, (old, g) in enumerate(zip(legacy, scores_only)) if old[0] != g.score]
+
+    n = args.attempts
+    print(f"{n} attempts x 10 answers, {args.bank}-question bank")
+    print(f"{'per-item loop':<28} {legacy_s * 1000:9.1f} ms  {legacy_s / n * 1e6:7.1f} us/attempt")
+    print(f"{'grade() per attempt':<28} {single_s * 1000:9.1f} ms  {single_s / n * 1e6:7.1f} us/attempt")
+    print(f"{'grade_many (solutions)':<28} {bulk_s * 1000:9.1f} ms  {bulk_s / n * 1e6:7.1f} us/attempt")
+    print(f"{'grade_many (scores only)':<28} {scores_s * 1000:9.1f} ms  {scores_s / n * 1e6:7.1f} us/attempt")
+    print(f"mismatched attempts: {len(mismatched)} {mismatched[:10]}")
+    if mismatched:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Upload parsing throughput and peak memory: legacy retry loop vs. ingest.read_question_bank.
+
+Each run happens in a fresh subprocess so peak RSS (``VmHWM``, minus the
+RSS after imports) reflects that parse alone. The legacy path is the old
+``/upload`` body: ``file.read().decode()`` and then ``pd.read_csv`` with
+``;``, ``,``, ``\\t``, ``|`` in turn until one gives more than one column,
+then building the QuestionBank from the full DataFrame.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import make_question_bank
+
+WORKER = r"""
+import json, sys, time
+import pandas as pd
+from ingest import read_question_bank, standardize_dataset
+from question_bank import QuestionBank
+
+def status(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) * 1024
+
+def legacy(f):
+    f.read().decode()
+    f.seek(0)
+    for delim in [';', ',', '\t', '|']:
+        try:
+            df = pd.read_csv(f, sep=delim)
+            if df.shape[1] > 1:
+                break
+            f.seek(0)
+        except Exception:
+            f.seek(0)
+    df = standardize_dataset(df)
+    if "id" not in df.columns:
+        df.insert(0, "id", range(1, len(df)+1))
+    return QuestionBank.from_frame(df)
+
+mode, path = sys.argv[1:3]
+base = status("VmRSS:")
+start = time.perf_counter()
+with open(path, "rb") as f:
+    rows = len(legacy(f) if mode == "legacy" else read_question_bank(f, path))
+seconds = time.perf_counter() - start
+peak = status("VmHWM:")
+print(json.dumps({"rows": rows, "seconds": seconds, "peak": peak - base}))
+"""
+
+
+def run_worker(mode, path):
+    out = subprocess.run([sys.executable, "-c", WORKER, mode, path], capture_output=True,
+                         text=True, check=True, cwd=os.getcwd())
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--delimiters", default=";,|")
+    args = parser.parse_args()
+
+    df = make_question_bank(args.rows)
+    print(f"{'sep':>4} {'file MB':>8} {'legacy rows/s':>14} {'legacy peak MB':>15} "
+          f"{'new rows/s':>11} {'new peak MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for sep in args.delimiters:
+            path = os.path.join(tmp, "bank.csv")
+            df.to_csv(path, sep=sep, index=False)
+            size = os.path.getsize(path)
+            legacy = run_worker("legacy", path)
+            new = run_worker("new", path)
+            print(f"{sep!r:>4} {size / 1e6:>8.1f} {legacy['rows'] / legacy['seconds']:>14,.0f} "
+                  f"{legacy['peak'] / 1e6:>15.1f} {new['rows'] / new['seconds']:>11,.0f} "
+                  f"{new['peak'] / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Chatbot traffic against the fake LLM: a model per request vs. ``LLMGateway``.
+
+``--requests`` questions are sent from ``--threads`` concurrent clients,
+drawn from ``--distinct`` aptitude questions that students type with varying
+case and spacing. Each model call sleeps ``--llm-latency`` seconds. Also
+fires one burst of ``--burst`` identical concurrent prompts to show
+coalescing.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import llm
+from llm_gateway import LLMGateway, ResponseCache
+
+QUESTIONS = [
+    "How do I find the LCM of two numbers?",
+    "What is the formula for simple interest?",
+    "Explain time and work problems",
+    "How to solve train crossing a platform questions",
+    "What is a percentage increase?",
+    "How do I calculate average speed for a round trip?",
+    "Explain the blood relation questions trick",
+    "What is compound interest compounded half-yearly?",
+]
+
+
+def variant(question, rng):
+    words = question.split()
+    text = "  ".join(words) if rng.random() < 0.3 else " ".join(words)
+    return text.lower() if rng.random() < 0.5 else text
+
+
+def run(ask, prompts, threads):
+    def timed(prompt):
+        start = time.perf_counter()
+        ask(prompt)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        latencies = list(pool.map(timed, prompts))
+    return time.perf_counter() - start, latencies
+
+
+def report(name, elapsed, latencies, calls):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{name:<22} {elapsed:7.2f}s {len(latencies) / elapsed:8.1f} req/s "
+          f"p50 {statistics.median(latencies) * 1000:7.1f}ms p95 {p95 * 1000:7.1f}ms  model calls {calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--distinct", type=int, default=len(QUESTIONS))
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--burst", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    questions = [QUESTIONS[i % len(QUESTIONS)] + ("" if i < len(QUESTIONS) else f" (variant {i})")
+                 for i in range(args.distinct)]
+    prompts = [variant(rng.choice(questions), rng) for _ in range(args.requests)]
+
+    # Before: a new model per request, every request calls the model.
+    models = []
+
+    def direct(prompt):
+        model = llm.FakeModel(args.llm_latency)
+        models.append(model)
+        return model.generate_content(prompt).text
+
+    elapsed, latencies = run(direct, prompts, args.threads)
+    report("model per request", elapsed, latencies, sum(m.calls for m in models))
+
+    model = llm.FakeModel(args.llm_latency)
+    gateway = LLMGateway(ResponseCache(), model_factory=lambda: model)
+    elapsed, latencies = run(gateway.generate, prompts, args.threads)
+    report("gateway", elapsed, latencies, model.calls)
+    stats = gateway.stats()
+    print(f"  hits {stats['hits']}  misses {stats['misses']}  coalesced {stats['coalesced']}  "
+          f"avg call {stats['latency_avg'] * 1000:.1f}ms")
+
+    model = llm.FakeModel(args.llm_latency)
+    gateway = LLMGateway(ResponseCache(), model_factory=lambda: model)
+    burst = ["What is the formula for simple interest?"] * args.burst
+    elapsed, latencies = run(gateway.generate, burst, args.burst)
+    report(f"burst x{args.burst} identical", elapsed, latencies, model.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Cost of the request instrumentation in ``metrics``.
+
+1. Per-request overhead: ``--requests`` GETs to a trivial route on a bare
+   Flask app, an instrumented one, and an instrumented one with the sampling
+   profiler on (``PROFILE_SLOW_MS``), through the test client.
+2. ``Histogram.observe`` and ``Counter.inc`` on their own, with and without
+   ``METRICS_DIR`` snapshots.
+3. GET /metrics render time with a realistic number of series.
+
+Run from ``backend/``.
+"""
+
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+from flask import Flask
+
+
+def fresh_metrics(**env):
+    # ``metrics`` reads its settings at import time.
+    for key in ("METRICS_DIR", "PROFILE_SLOW_MS"):
+        os.environ.pop(key, None)
+    os.environ.update(env)
+    import metrics
+    return importlib.reload(metrics)
+
+
+def request_cost(requests, instrumented, **env):
+    app = Flask(__name__)
+
+    @app.route("/ping")
+    def ping():
+        return "pong"
+
+    if instrumented:
+        fresh_metrics(**env).instrument(app)
+    client = app.test_client()
+    for _ in range(200):
+        client.get("/ping")
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/ping")
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def op_cost(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--ops", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'GET /ping':<32} {'us/request':>10}")
+        base = request_cost(args.requests, False)
+        print(f"{'bare Flask':<32} {base:>10.1f}")
+        for name, env in (("instrumented", {}),
+                          ("instrumented + METRICS_DIR", {"METRICS_DIR": tmp}),
+                          ("instrumented + profiler", {"PROFILE_SLOW_MS": "1000000",
+                                                       "PROFILE_DIR": tmp})):
+            cost = request_cost(args.requests, True, **env)
+            print(f"{name:<32} {cost:>10.1f}  (+{cost - base:.1f})")
+
+        print(f"\n{'operation':<32} {'ns/op':>10}")
+        for name, env in (("", {}), (" + METRICS_DIR", {"METRICS_DIR": tmp})):
+            m = fresh_metrics(**env)
+            print(f"{'Histogram.observe' + name:<32} "
+                  f"{op_cost(lambda: m.STAGE_SECONDS.observe(0.01, stage='grading'), args.ops):>10.0f}")
+            print(f"{'Counter.inc' + name:<32} "
+                  f"{op_cost(lambda: m.LLM_EVENTS.inc(event='hits'), args.ops):>10.0f}")
+
+        m = fresh_metrics()
+        routes = ["/signup", "/login", "/upload", "/submit", "/generate_report", "/reports",
+                  "/reports/<job_id>", "/chatbot", "/chatbot/stream", "/chatbot/stats"]
+        for route in routes:
+            for status in (200, 400, 500):
+                m.REQUEST_SECONDS.observe(0.02, method="POST", route=route, status=status)
+        start = time.perf_counter()
+        body = m.REGISTRY.render()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\nGET /metrics with {len(routes) * 3} route series: "
+              f"{elapsed:.2f} ms, {len(body.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Generate many reports in parallel and check that each embeds its own charts.
+
+Every student gets a distinct score profile, so their charts differ. After
+generating ``--reports`` DOCX files concurrently (threads or processes), the
+PNGs embedded in each file are compared with charts rendered serially for
+that student's solutions; any cross-talk between concurrent reports shows
+up as a mismatch.
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+from docx import Document
+
+from ml_model import charts, report_generator
+
+TOPICS = ["Arithmetic", "Algebra", "Geometry", "Reasoning"]
+
+
+def make_solutions(i, n=10):
+    return [{
+        "question": f"Question {j}", "user_answer": "a", "correct_answer": "a",
+        "is_correct": (i >> j) & 1 == 1, "time_taken": float(5 + (i * 7 + j) % 40),
+        "topic": TOPICS[j % len(TOPICS)], "subtopic": f"{TOPICS[j % len(TOPICS)]} - {j % 3}",
+    } for j in range(n)]
+
+
+def expected_chart_hashes(solutions):
+    df = pd.DataFrame(solutions)
+    topic_acc = df.groupby("topic")["is_correct"].mean() * 100
+    subtopic_acc = df.groupby("subtopic")["is_correct"].mean() * 100
+    fundamentals = {
+        "Listening": max(0, 100 - df["time_taken"].mean()),
+        "Grasping": df["is_correct"].mean() * 100,
+        "Retention": 100 - df[~df["is_correct"]].shape[0]/df.shape[0]*100,
+        "Application": float("nan"),
+    }
+    charts = report_generator.render_charts(topic_acc.to_dict(), subtopic_acc.to_dict(), fundamentals)
+    return sorted(hashlib.sha1(buf.getvalue()).hexdigest() for buf in charts.values())
+
+
+def embedded_chart_hashes(path):
+    doc = Document(path)
+    return sorted(hashlib.sha1(rel.target_part.blob).hexdigest()
+                  for rel in doc.part.rels.values() if "image" in rel.reltype)
+
+
+def build(args):
+    i, output_dir = args
+    return report_generator.generate_report(make_solutions(i), output_dir, student_name=f"student{i}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=max(8, os.cpu_count() or 1))
+    parser.add_argument("--mode", choices=["threads", "processes"], default="threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        Pool = ThreadPoolExecutor if args.mode == "threads" else ProcessPoolExecutor
+        start = time.perf_counter()
+        with Pool(args.workers) as pool:
+            paths = list(pool.map(build, [(i, output_dir) for i in range(args.reports)]))
+        elapsed = time.perf_counter() - start
+
+        # Re-render from scratch so a wrongly cached PNG cannot vouch for itself.
+        charts.clear_cache()
+        mismatched = [i for i, path in enumerate(paths)
+                      if embedded_chart_hashes(path) != expected_chart_hashes(make_solutions(i))]
+        stray = [f for f in os.listdir(output_dir) if not f.endswith(".docx")]
+
+    print(f"{args.reports} reports with {args.workers} {args.mode}: {elapsed:.2f}s "
+          f"({args.reports / elapsed:.1f} reports/s)")
+    print(f"reports with wrong charts: {len(mismatched)} {mismatched[:10]}")
+    print(f"stray chart files on disk: {len(stray)}")
+    if mismatched or stray:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Login throughput per core for different password-hash settings.
+
+For each method in ``--methods`` this hashes one password and then verifies
+it ``--logins`` times from ``--threads`` concurrent "request" threads, once
+inline on the request thread and once through ``passwords.PasswordHasher``'s
+bounded pool, and reports logins/s divided by the CPUs available. The last
+line shows a stored hash being upgraded by a login after the method changes.
+
+Run from ``backend/``.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from passwords import PasswordHasher
+
+METHODS = "scrypt,pbkdf2:sha256:1000000,pbkdf2:sha256:600000,pbkdf2:sha256:100000"
+
+
+def logins_per_second(verify, stored, logins, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        ok = all(pool.map(lambda _: verify(stored, "correct horse"), range(logins)))
+    assert ok
+    return logins / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--methods", default=METHODS)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+    print(f"{cores} core(s), {args.threads} request threads")
+    print(f"{'method':<24} {'inline/s/core':>14} {'pool/s/core':>12} {'ms/login':>9}")
+    for method in args.methods.split(","):
+        stored = generate_password_hash("correct horse", method)
+        inline = logins_per_second(check_password_hash, stored, args.logins, args.threads)
+        hasher = PasswordHasher(method=method, workers=cores, queue=args.threads)
+        pooled = logins_per_second(hasher.verify, stored, args.logins, args.threads)
+        print(f"{method:<24} {inline / cores:>14.1f} {pooled / cores:>12.1f} {1000 * cores / pooled:>9.1f}")
+
+    old = PasswordHasher(method="pbkdf2:sha256:1000000")
+    new = PasswordHasher(method="pbkdf2:sha256:600000")
+    stored = old.hash("correct horse")
+    if new.verify(stored, "correct horse") and new.needs_rehash(stored):
+        stored = new.hash("correct horse")
+    print(f"rehash on login: {old.prefix} -> {stored.split('$', 1)[0]}, "
+          f"needs_rehash now {new.needs_rehash(stored)}")
+
+
+if __name__ == "__main__":
+    main()
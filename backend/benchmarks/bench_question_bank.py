@@ -0,0 +1,59 @@
+"""
+Per-request lookup latency of /submit: DataFrame scans vs. QuestionBank indexes.
+
+Simulates the lookups one /submit request performs (10 answered ids plus the
+difficulty filter for the next batch) at several bank sizes.
+"""
+
+import argparse
+import time
+
+from question_bank import QuestionBank
+from benchmarks.synthetic import make_question_bank, make_answers
+
+
+def scan_request(df, answers, level):
+    for qid in answers:
+        row = df[df["id"] == int(float(qid))].iloc[0]
+        str(row["answer"]).strip().lower()
+    return df[df["difficulty"].str.lower() == level.lower()]
+
+
+def indexed_request(bank, answers, level):
+    for qid in answers:
+        row = bank.row(qid)
+        str(row["answer"]).strip().lower()
+    return bank.difficulty_positions(level)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,5000,20000,50000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'scan ms':>10} {'indexed ms':>11} {'speedup':>8} {'build ms':>9}")
+    for size in map(int, args.sizes.split(",")):
+        df = make_question_bank(size)
+        answers, _ = make_answers(df)
+        start = time.perf_counter()
+        bank = QuestionBank.from_frame(df)
+        build = time.perf_counter() - start
+
+        scan = best_of(lambda: scan_request(df, answers, "Easy"), args.repeat)
+        indexed = best_of(lambda: indexed_request(bank, answers, "Easy"), args.repeat)
+        print(f"{size:>8} {scan * 1e3:>10.3f} {indexed * 1e3:>11.3f} "
+              f"{scan / indexed:>7.1f}x {build * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Per-report analysis CPU time: pandas DataFrame + groupbys vs. ``ml_model.aggregation``.
+
+For ``--sizes`` solutions, times everything ``generate_report`` computes
+before rendering: topic/subtopic accuracy, learning fundamentals, the summary
+statistics, and the question-wise rows written to the DOCX. Two versions run:
+
+- pandas: the previous code. It builds a DataFrame, runs three groupbys plus
+  two more for the summary, and walks the rows with ``iterrows``.
+- single pass: ``aggregate`` over the solution list.
+
+It checks that both produce the same numbers. For sizes up to
+``--full-max`` it also times a complete ``generate_report`` (charts and DOCX
+included) to show what share of a report the analysis is.
+"""
+
+import argparse
+import math
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from ml_model import charts, report_generator
+from ml_model.aggregation import aggregate
+
+TOPICS = [f"Topic {i}" for i in range(8)]
+LEVELS = ["Very easy", "Easy", "Moderate", "Difficult"]
+
+
+def make_solutions(n, seed=0):
+    rng = random.Random(seed)
+    solutions = []
+    for i in range(n):
+        topic = rng.choice(TOPICS)
+        solutions.append({
+            "question_id": i, "question": f"Question {i}", "user_answer": "a", "correct_answer": "a",
+            "is_correct": rng.random() < 0.7, "time_taken": round(rng.uniform(5, 90), 2),
+            "topic": topic, "subtopic": f"{topic} - {rng.randrange(5)}", "difficulty": rng.choice(LEVELS),
+        })
+    return solutions
+
+
+def legacy_analysis(solutions):
+    df = pd.DataFrame(solutions)
+    df["is_correct"] = df["is_correct"].astype(bool)
+    df["time_taken"] = df["time_taken"].astype(float)
+    topic_acc = df.groupby("topic")["is_correct"].mean() * 100
+    subtopic_acc = df.groupby("subtopic")["is_correct"].mean() * 100
+    fundamentals = {
+        "Listening": max(0, 100 - df["time_taken"].mean()),
+        "Grasping": df["is_correct"].mean() * 100,
+        "Retention": 100 - df[~df["is_correct"]].shape[0]/df.shape[0]*100,
+        "Application": df[df.get("difficulty", pd.Series(["Very easy"]*len(df))).isin(["Moderate","Difficult"])]["is_correct"].mean() * 100
+    }
+    summary_topics = df.groupby("topic")["is_correct"].mean() * 100
+    strengths = [topic for topic, acc in summary_topics.items() if acc >= 75]
+    weak_subtopics = [sub for sub, acc in (df.groupby("subtopic")["is_correct"].mean() * 100).items() if acc < 60]
+    rows = [f"{row['question']} {row['is_correct']} {row['time_taken']}" for _, row in df.iterrows()]
+    return topic_acc.to_dict(), subtopic_acc.to_dict(), fundamentals, strengths, weak_subtopics, len(rows)
+
+
+def single_pass(solutions):
+    stats = aggregate(solutions)
+    rows = [f"{row['question']} {row['is_correct']} {float(row['time_taken'])}" for row in solutions]
+    return (stats.topic_accuracy(), stats.subtopic_accuracy(), stats.fundamentals(),
+            stats.strengths(), stats.weak_subtopics(), len(rows))
+
+
+def same(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return (math.isnan(a) and math.isnan(b)) or math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def cpu_time(fn, arg, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,1000,100000")
+    parser.add_argument("--full-max", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'solutions':>9} {'pandas ms':>10} {'1-pass ms':>10} {'speedup':>8} {'full report ms':>15}")
+    for n in map(int, args.sizes.split(",")):
+        solutions = make_solutions(n)
+        assert same(legacy_analysis(solutions), single_pass(solutions)), f"results differ at {n}"
+        repeat = max(1, 2000 // n)
+        legacy = cpu_time(legacy_analysis, solutions, repeat)
+        fast = cpu_time(single_pass, solutions, repeat)
+
+        full = ""
+        if n <= args.full_max:
+            with tempfile.TemporaryDirectory() as tmp:
+                charts.clear_cache()
+                full = f"{cpu_time(lambda s: report_generator.generate_report(s, tmp), solutions, 3) * 1000:15.1f}"
+        print(f"{n:>9} {legacy * 1000:>10.2f} {fast * 1000:>10.2f} {legacy / fast:>7.1f}x {full}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Burst of end-of-test reports: synchronous /generate_report vs. the /reports job queue.
+
+Fires ``--reports`` concurrent report requests (with the fake LLM backend and
+``--llm-latency`` seconds of simulated Gemini time) and reports how long the
+HTTP requests are held and how long until every DOCX is ready.
+
+Run from ``backend/``; the app's database, banks and reports live in a
+temporary directory that is removed when the run ends.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def make_solutions(i, n=10):
+    return [{
+        "question": f"Question {j}", "user_answer": "a", "correct_answer": "a" if (i + j) % 3 else "b",
+        "is_correct": bool((i + j) % 3), "time_taken": 5.0 + j,
+        "topic": f"Topic {j % 3}", "subtopic": f"Sub {j % 5}",
+    } for j in range(n)]
+
+
+def run(args, tmp):
+    """Time both paths with all app state under ``tmp``; returns the timings."""
+    os.environ.update({
+        "LLM_BACKEND": "fake", "LLM_FAKE_LATENCY": str(args.llm_latency), "SECRET_KEY": "bench",
+        "REPORT_WORKERS": str(args.workers), "REPORTS_DIR": os.path.join(tmp, "reports"),
+        "USERS_DB_PATH": os.path.join(tmp, "users.db"), "QUESTION_BANK_DIR": os.path.join(tmp, "banks"),
+        "QUESTION_STATS_PATH": os.path.join(tmp, "stats.npz"),
+        "ATTEMPT_DEAD_LETTER_PATH": os.path.join(tmp, "dead_letter.jsonl"),
+    })
+    sys.path.insert(0, os.getcwd())
+    os.chdir(tmp)
+    import app as appmod
+
+    client = appmod.app.test_client()
+    payloads = [{"solutions": make_solutions(i), "student_name": f"bench{i}"} for i in range(args.reports)]
+
+    def sync_report(payload):
+        start = time.perf_counter()
+        assert client.post("/generate_report", json=payload).status_code == 200
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.reports) as pool:
+        held = list(pool.map(sync_report, payloads))
+    sync_total = time.perf_counter() - start
+
+    def enqueue(payload):
+        start = time.perf_counter()
+        # A new name, so the job renders instead of reusing the report above.
+        resp = client.post("/reports", json=dict(payload, student_name=f"job-{payload['student_name']}"))
+        assert resp.status_code == 202, resp.json
+        return time.perf_counter() - start, resp.json["status_url"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.reports) as pool:
+        queued = list(pool.map(enqueue, payloads))
+    pending = [url for _, url in queued]
+    while pending:
+        pending = [url for url in pending if client.get(url).status_code == 202]
+        time.sleep(0.05)
+    async_total = time.perf_counter() - start
+    appmod.report_jobs.shutdown()
+    return held, sync_total, queued, async_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=4, help="REPORT_WORKERS for the job queue")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="report-jobs-") as tmp:
+        held, sync_total, queued, async_total = run(args, tmp)
+
+    print(f"{args.reports} reports, fake LLM latency {args.llm_latency}s, {args.workers} report workers")
+    print(f"sync  /generate_report: request held max {max(held):.2f}s, all done in {sync_total:.2f}s")
+    print(f"async /reports:         request held max {max(t for t, _ in queued) * 1e3:.1f}ms, "
+          f"all done in {async_total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
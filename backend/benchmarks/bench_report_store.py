@@ -0,0 +1,79 @@
+"""
+/generate_report with the report store: first request vs. repeated requests.
+
+Posts ``--students`` distinct solution sets, then posts each one
+``--repeat`` more times. Reports the median latency of a miss (render +
+store) and of a hit (served from disk). It then has ``--writers`` threads
+build the same new report at once while a reader polls the target path, and
+checks that every file the reader saw was a complete DOCX.
+
+Run from ``backend/``; reports go to a temporary ``REPORTS_DIR``.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+from benchmarks.bench_report_jobs import make_solutions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.update(LLM_BACKEND="fake", REPORTS_DIR=os.path.join(tmp, "reports"),
+                      USERS_DB_PATH=os.path.join(tmp, "users.db"), SECRET_KEY="bench")
+    sys.path.insert(0, os.getcwd())
+    import app as appmod
+    from report_jobs import cached_report
+
+    client = appmod.app.test_client()
+    payloads = [{"solutions": make_solutions(i, 30), "student_name": f"bench{i}"} for i in range(args.students)]
+
+    def post(payload):
+        start = time.perf_counter()
+        assert client.post("/generate_report", json=payload).status_code == 200
+        return time.perf_counter() - start
+
+    misses = [post(p) for p in payloads]
+    hits = [post(p) for _ in range(args.repeat) for p in payloads]
+    miss, hit = statistics.median(misses), statistics.median(hits)
+    print(f"{'miss (render)':<16} {miss * 1000:>9.1f} ms")
+    print(f"{'hit (from disk)':<16} {hit * 1000:>9.1f} ms   {miss / hit:.0f}x faster")
+
+    solutions = make_solutions(999, 30)
+    seen, stop = [], threading.Event()
+    done_before = set(os.listdir(appmod.REPORTS_DIR))
+
+    def reader():
+        while not stop.is_set():
+            for name in os.listdir(appmod.REPORTS_DIR):
+                if name.endswith(".docx") and name not in done_before:
+                    with open(os.path.join(appmod.REPORTS_DIR, name), "rb") as f:
+                        seen.append(zipfile.is_zipfile(f))
+
+    watcher = threading.Thread(target=reader)
+    watcher.start()
+    writers = [threading.Thread(target=lambda: cached_report(solutions, appmod.REPORTS_DIR, "race"))
+               for _ in range(args.writers)]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    watcher.join()
+    assert seen and all(seen), "reader saw a partial report"
+    print(f"{args.writers} concurrent writers: {len(seen)} reads of the new report, all complete DOCX files")
+
+
+if __name__ == "__main__":
+    main()
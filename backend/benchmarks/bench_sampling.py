@@ -0,0 +1,111 @@
+"""
+select_questions: legacy pandas groupby/concat sampler vs. sampling.stratified_sample.
+
+Checks that both produce the same per-(topic, subtopic) allocation for the
+same bank and used set, then times a 10-question selection as the number of
+subtopics grows.
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from bitset import QuestionBitset
+from question_bank import QuestionBank
+from sampling import stratified_sample
+from benchmarks.synthetic import make_question_bank
+
+
+def legacy_select(available, already_used, num=10):
+    """select_questions as it was before the sampling engine."""
+    available = available[~available["id"].isin(already_used)]
+    selected = pd.DataFrame()
+    if available.empty:
+        return selected
+
+    grouped = available.groupby(["topic", "subtopic"], sort=False)
+    group_counts = grouped.size()
+    total_questions = group_counts.sum()
+
+    group_allocation = {k: (count / total_questions) * num for k, count in group_counts.items()}
+    floor_alloc = {k: int(v) for k, v in group_allocation.items()}
+    remaining_slots = num - sum(floor_alloc.values())
+    fractional_parts = {k: group_allocation[k] - floor_alloc[k] for k in group_allocation}
+    for k in sorted(fractional_parts, key=fractional_parts.get, reverse=True):
+        if remaining_slots <= 0:
+            break
+        floor_alloc[k] += 1
+        remaining_slots -= 1
+
+    for key, count in floor_alloc.items():
+        group = grouped.get_group(key)
+        selected = pd.concat([selected, group.sample(min(count, len(group)), replace=False)])
+
+    if len(selected) < num:
+        remaining = available[~available["id"].isin(selected["id"])]
+        if not remaining.empty:
+            extra = min(num - len(selected), len(remaining))
+            selected = pd.concat([selected, remaining.sample(extra, replace=False)])
+    return selected.head(num)
+
+
+def new_select(bank, level, already_used, num=10, rng=None):
+    layout = bank.layout(level)
+    return stratified_sample(layout, already_used.contains(layout.order), num=num, rng=rng)
+
+
+def to_bitset(bank, ids):
+    used = QuestionBitset(len(bank))
+    used.add([bank.position(qid) for qid in ids])
+    return used
+
+
+def allocation(frame):
+    return Counter(zip(frame["topic"], frame["subtopic"]))
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--subtopics", default="5,50,500,2500")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--checks", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'subtopics':>9} {'legacy ms':>10} {'new ms':>8} {'speedup':>8} {'same alloc':>11}")
+    for per_topic in map(int, args.subtopics.split(",")):
+        df = make_question_bank(args.rows, num_topics=4, subtopics_per_topic=per_topic)
+        bank = QuestionBank.from_frame(df)
+        level = "Easy"
+        available = df[df["difficulty"].str.lower() == "easy"]
+        rng = np.random.default_rng(1)
+
+        same = True
+        for _ in range(args.checks):
+            used = set(rng.choice(available["id"].to_numpy(), len(available) // 3, replace=False).tolist())
+            legacy = allocation(legacy_select(available, used))
+            new = allocation(bank.take(new_select(bank, level, to_bitset(bank, used), rng=rng)))
+            same &= legacy == new
+
+        used = set(available["id"].to_numpy()[::3].tolist())
+        legacy_t = best_of(lambda: legacy_select(available, used), args.repeat)
+        used_bits = to_bitset(bank, used)
+        new_t = best_of(lambda: new_select(bank, level, used_bits, rng=rng), args.repeat * 10)
+        print(f"{per_topic * 4:>9} {legacy_t * 1e3:>10.2f} {new_t * 1e3:>8.3f} "
+              f"{legacy_t / new_t:>7.0f}x {str(same):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Worker cold start: import time and memory of the app, and of a gunicorn fleet.
+
+1. ``import app`` in a fresh interpreter, ``--repeat`` times.
+   - eager: the app plus everything it used to import up front (pandas, the
+     report renderer with matplotlib/seaborn/python-docx, the Gemini SDK,
+     flasgger)
+   - lazy:  the app as shipped, where those load on first use
+   Reports median wall time and peak RSS.
+
+2. ``gunicorn app:app`` with ``--workers`` workers, as started, with
+   ``GUNICORN_PRELOAD=1``, and with ``GUNICORN_WARM_IMPORTS=1`` added.
+   Reports the time until /chatbot/stats answers, and the total PSS of the
+   master plus workers after ``--warmup`` requests. PSS counts a shared page
+   once, split between the processes that map it.
+
+Run from ``backend/``.
+"""
+
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_asgi import free_port
+
+EAGER = "import pandas, ml_model.report_generator, google.generativeai, flasgger"
+PROBE = r"""
+import resource, sys, time
+start = time.perf_counter()
+import app
+{extra}
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def import_cost(extra, env, repeat):
+    times, rss = [], []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-W", "ignore", "-c", PROBE.format(extra=extra)],
+                             env=env, capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(out[-2]))
+        rss.append(int(out[-1]) / 1024)
+    return statistics.median(times), statistics.median(rss)
+
+
+def pss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def get(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def gunicorn_fleet(env, workers, warmup):
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-W", "ignore", "-m", "gunicorn", "app:app",
+                             "--workers", str(workers), "--bind", f"127.0.0.1:{port}"],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {proc.returncode}")
+            try:
+                if get(port, "/chatbot/stats") == 200:
+                    break
+            except OSError:
+                time.sleep(0.05)
+        ready = time.perf_counter() - start
+        while len(children(proc.pid)) < workers:
+            time.sleep(0.05)
+        time.sleep(1)
+        for _ in range(warmup):
+            get(port, "/chatbot/stats")
+        total = pss_mb(proc.pid) + sum(pss_mb(pid) for pid in children(proc.pid))
+        return ready, total
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, USERS_DB_PATH=os.path.join(tmp, "users.db"), LLM_BACKEND="fake",
+                   SECRET_KEY="bench", QUESTION_STATS_PATH=os.path.join(tmp, "stats.npz"))
+
+        print(f"{'import app':<22} {'seconds':>8} {'peak RSS MiB':>13}")
+        for name, extra in (("eager (previous)", EAGER), ("lazy", "")):
+            seconds, rss = import_cost(extra, env, args.repeat)
+            print(f"{name:<22} {seconds:>8.2f} {rss:>13.1f}")
+
+        print(f"\n{f'gunicorn, {args.workers} workers':<22} {'ready s':>8} {'total PSS MiB':>14}")
+        for name, extra in (("default", {}), ("preload", {"GUNICORN_PRELOAD": "1"}),
+                            ("preload + warm", {"GUNICORN_PRELOAD": "1", "GUNICORN_WARM_IMPORTS": "1"})):
+            ready, pss = gunicorn_fleet(dict(env, **extra), args.workers, args.warmup)
+            print(f"{name:<22} {ready:>8.2f} {pss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
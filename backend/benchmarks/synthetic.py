@@ -0,0 +1,47 @@
+"""
+Synthetic question banks for benchmarks.
+"""
+
+import numpy as np
+import pandas as pd
+
+DIFFICULTY_MIX = {"Very easy": 0.25, "Easy": 0.25, "Moderate": 0.25, "Difficult": 0.25}
+
+
+def make_question_bank(num_questions, num_topics=8, subtopics_per_topic=5,
+                       difficulty_mix=None, seed=0):
+    """
+    Build a standardized question DataFrame (same columns as an uploaded bank
+    after ``standardize_dataset``) with ``num_questions`` rows.
+    """
+    rng = np.random.default_rng(seed)
+    mix = difficulty_mix or DIFFICULTY_MIX
+    levels = list(mix)
+    weights = np.array([mix[level] for level in levels], dtype=float)
+    weights /= weights.sum()
+
+    topic_idx = rng.integers(0, num_topics, num_questions)
+    sub_idx = rng.integers(0, subtopics_per_topic, num_questions)
+    answers = np.array(["a", "b", "c", "d"])[rng.integers(0, 4, num_questions)]
+
+    return pd.DataFrame({
+        "id": np.arange(1, num_questions + 1),
+        "question_text": [f"Question {i}" for i in range(1, num_questions + 1)],
+        "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4",
+        "answer": answers,
+        "topic": [f"Topic {t}" for t in topic_idx],
+        "subtopic": [f"Topic {t} - Sub {s}" for t, s in zip(topic_idx, sub_idx)],
+        "difficulty": np.array(levels)[rng.choice(len(levels), num_questions, p=weights)],
+    })
+
+
+def make_answers(bank_df, num=10, correct_ratio=0.7, seed=0):
+    """Random ``answers``/``time_logs`` payload for ``num`` questions of ``bank_df``."""
+    rng = np.random.default_rng(seed)
+    rows = bank_df.sample(min(num, len(bank_df)), random_state=seed)
+    answers, time_logs = {}, {}
+    for _, row in rows.iterrows():
+        right = rng.random() < correct_ratio
+        answers[str(row["id"])] = row["answer"] if right else "z"
+        time_logs[str(row["id"])] = round(float(rng.uniform(5, 90)), 2)
+    return answers, time_logs
@@ -0,0 +1,67 @@
+"""
+Packed bitset over dense question positions.
+
+Used to track which questions a student has already seen: one bit per row of
+the question bank instead of a Python ``set`` of boxed ids per difficulty.
+A 20k-question bank costs 2.5 KB per active student in memory and usually a
+few dozen bytes once serialized, since only a handful of bits are ever set.
+"""
+
+import zlib
+
+import numpy as np
+
+_MASKS = np.array([128, 64, 32, 16, 8, 4, 2, 1], dtype=np.uint8)
+
+
+class QuestionBitset:
+    """Fixed-size set of integer positions in ``[0, size)`` backed by a packed uint8 array."""
+
+    __slots__ = ("size", "bits")
+
+    def __init__(self, size, bits=None):
+        self.size = int(size)
+        nbytes = (self.size + 7) // 8
+        if bits is None:
+            bits = np.zeros(nbytes, dtype=np.uint8)
+        elif len(bits) != nbytes:
+            raise ValueError(f"Expected {nbytes} bytes for {self.size} bits, got {len(bits)}")
+        self.bits = bits
+
+    def add(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        np.bitwise_or.at(self.bits, positions >> 3, _MASKS[positions & 7])
+
+    def discard(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        np.bitwise_and.at(self.bits, positions >> 3, ~_MASKS[positions & 7])
+
+    def clear(self):
+        self.bits[:] = 0
+
+    def contains(self, positions):
+        """Bool array: which of ``positions`` are in the set."""
+        positions = np.asarray(positions, dtype=np.int64)
+        return (self.bits[positions >> 3] & _MASKS[positions & 7]) != 0
+
+    def difference(self, candidates):
+        """``candidates`` that are not in the set, order preserved."""
+        candidates = np.asarray(candidates, dtype=np.int64)
+        return candidates[~self.contains(candidates)]
+
+    def positions(self):
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.size))
+
+    def __len__(self):
+        return int(np.unpackbits(self.bits, count=self.size).sum())
+
+    def __bool__(self):
+        return bool(self.bits.any())
+
+    def to_bytes(self):
+        """Compressed representation; pair with ``size`` to restore via ``from_bytes``."""
+        return zlib.compress(self.bits.tobytes(), 6)
+
+    @classmethod
+    def from_bytes(cls, data, size):
+        return cls(size, np.frombuffer(zlib.decompress(data), dtype=np.uint8).copy())
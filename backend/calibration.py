@@ -0,0 +1,252 @@
+"""
+Question statistics calibrated from stored answers.
+
+An offline job reads every ``answer_record`` row (joined with its attempt's
+score) in chunks of ``--chunk`` rows and accumulates, per (bank_id,
+question_id):
+
+- ``p_value``: share of answers that were correct
+- ``median_time``: median time to answer, from a fixed log-spaced histogram
+  (``TIME_EDGES``), so memory is per question rather than per answer
+- ``discrimination``: point-biserial correlation between answering this
+  question correctly and the rest of the attempt's score
+
+The result is a compact ``.npz`` lookup (``QUESTION_STATS_PATH``, default
+``backend/question_stats.npz``) that the app loads at startup with
+``QuestionStats.load``. Questions with fewer than ``CALIBRATION_MIN_RESPONSES``
+answers are treated as uncalibrated.
+
+Usage: ``python calibration.py [--db users.db] [--out question_stats.npz] [--chunk 100000]``
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from database import database_path
+
+DEFAULT_STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_stats.npz")
+STATS_PATH = os.getenv("QUESTION_STATS_PATH", DEFAULT_STATS_PATH)
+MIN_RESPONSES = int(os.getenv("CALIBRATION_MIN_RESPONSES", 20))
+# Negatively discriminating questions (strong students miss them more often
+# than weak ones) usually have a wrong answer key or an ambiguous wording.
+MIN_DISCRIMINATION = float(os.getenv("CALIBRATION_MIN_DISCRIMINATION", 0.0))
+
+TIME_EDGES = np.concatenate([[0.0], np.geomspace(0.25, 3600, 127)])
+
+QUERY = (
+    "SELECT r.bank_id, r.question_id, r.is_correct, r.time_taken, a.score "
+    "FROM answer_record r JOIN attempt a ON a.id = r.attempt_id"
+)
+
+# Per-position arrays for one bank (NaN / False where uncalibrated).
+BankStats = namedtuple("BankStats", ["p_value", "median_time", "discrimination", "flagged"])
+
+
+# -------------------- Accumulation --------------------
+class StatsAccumulator:
+    """Running sums per (bank_id, question_id); memory grows with questions, not answers."""
+
+    def __init__(self, capacity=1024):
+        self.keys = {}
+        self.n = np.zeros(capacity, dtype=np.int64)
+        self.correct = np.zeros(capacity, dtype=np.int64)
+        self.rest = np.zeros((capacity, 3))  # sum(rest), sum(rest^2), sum(rest * correct)
+        self.hist = np.zeros((capacity, len(TIME_EDGES)), dtype=np.uint32)
+
+    def _index(self, bank_ids, question_ids):
+        import pandas as pd
+
+        # A chunk holds few banks: factorize question ids bank by bank.
+        bank_codes, banks = pd.factorize(np.asarray(bank_ids, dtype=object))
+        question_ids = np.asarray(question_ids, dtype=np.int64)
+        idx = np.empty(len(question_ids), dtype=np.int64)
+        for code, bank in enumerate(banks):
+            rows = bank_codes == code
+            codes, uniques = pd.factorize(question_ids[rows])
+            mapping = np.array([self.keys.setdefault((bank, int(q)), len(self.keys)) for q in uniques],
+                               dtype=np.int64)
+            idx[rows] = mapping[codes]
+        if len(self.keys) > len(self.n):
+            self._grow(max(len(self.keys), 2 * len(self.n)))
+        return idx
+
+    def _grow(self, capacity):
+        extra = capacity - len(self.n)
+        self.n = np.concatenate([self.n, np.zeros(extra, dtype=np.int64)])
+        self.correct = np.concatenate([self.correct, np.zeros(extra, dtype=np.int64)])
+        self.rest = np.concatenate([self.rest, np.zeros((extra, 3))])
+        self.hist = np.concatenate([self.hist, np.zeros((extra, len(TIME_EDGES)), dtype=np.uint32)])
+
+    def add(self, bank_ids, question_ids, is_correct, times, scores):
+        """Fold in one chunk of answers (equal-length sequences)."""
+        if not len(bank_ids):
+            return
+        idx = self._index(bank_ids, question_ids)
+        size = len(self.n)
+        correct = np.asarray(is_correct, dtype=np.int64)
+        rest = np.asarray(scores, dtype=float) - correct
+        self.n += np.bincount(idx, minlength=size)
+        self.correct += np.bincount(idx, weights=correct, minlength=size).astype(np.int64)
+        self.rest[:, 0] += np.bincount(idx, weights=rest, minlength=size)
+        self.rest[:, 1] += np.bincount(idx, weights=rest * rest, minlength=size)
+        self.rest[:, 2] += np.bincount(idx, weights=rest * correct, minlength=size)
+
+        times = np.nan_to_num(np.asarray(times, dtype=float), nan=0.0)
+        bins = np.clip(np.searchsorted(TIME_EDGES, times, side="right") - 1, 0, len(TIME_EDGES) - 1)
+        np.add.at(self.hist, (idx, bins), 1)
+
+    def result(self):
+        """Stats arrays sorted by (bank_id, question_id), ready for ``QuestionStats``."""
+        count = len(self.keys)
+        n = self.n[:count].astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p = self.correct[:count] / n
+            mean_rest = self.rest[:count, 0] / n
+            var_rest = self.rest[:count, 1] / n - mean_rest ** 2
+            cov = self.rest[:count, 2] / n - p * mean_rest
+            discrimination = cov / np.sqrt(p * (1 - p) * var_rest)
+        discrimination[~np.isfinite(discrimination)] = np.nan
+
+        # Median: first histogram bin holding the n/2-th answer, reported at its midpoint.
+        cumulative = np.cumsum(self.hist[:count], axis=1)
+        median_bin = (cumulative < (n / 2)[:, None]).sum(axis=1)
+        upper = np.append(TIME_EDGES[1:], TIME_EDGES[-1])
+        median_time = (TIME_EDGES[median_bin] + upper[median_bin]) / 2
+
+        keys = list(self.keys)
+        bank_ids = sorted({bank for bank, _ in keys})
+        bank_index = {bank: i for i, bank in enumerate(bank_ids)}
+        bank = np.array([bank_index[b] for b, _ in keys], dtype=np.int32)
+        question_id = np.array([q for _, q in keys], dtype=np.int64)
+        order = np.lexsort((question_id, bank))
+        return {
+            "bank_ids": np.array(bank_ids, dtype=str),
+            "bank": bank[order],
+            "question_id": question_id[order],
+            "n": self.n[:count][order].astype(np.uint32),
+            "p_value": p[order].astype(np.float32),
+            "median_time": median_time[order].astype(np.float32),
+            "discrimination": discrimination[order].astype(np.float32),
+        }
+
+
+def calibrate(db_path, chunk=100_000):
+    """Stream every stored answer of ``db_path`` through a ``StatsAccumulator``."""
+    import pandas as pd
+
+    acc = StatsAccumulator()
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        for frame in pd.read_sql_query(QUERY, conn, chunksize=chunk):
+            acc.add(frame["bank_id"], frame["question_id"], frame["is_correct"],
+                    frame["time_taken"], frame["score"])
+    finally:
+        conn.close()
+    return acc
+
+
+def save(stats, path):
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp, **stats)
+    os.replace(tmp, path)
+
+
+# -------------------- Lookup --------------------
+class QuestionStats:
+    """Calibrated statistics looked up by bank and question id."""
+
+    def __init__(self, bank_ids=(), bank=None, question_id=None, n=None, p_value=None,
+                 median_time=None, discrimination=None, min_responses=MIN_RESPONSES):
+        self._banks = {str(bank_id): i for i, bank_id in enumerate(bank_ids)}
+        empty = np.zeros(0)
+        self.bank = bank if bank is not None else empty.astype(np.int32)
+        self.question_id = question_id if question_id is not None else empty.astype(np.int64)
+        self.n = n if n is not None else empty.astype(np.uint32)
+        self.p_value = p_value if p_value is not None else empty.astype(np.float32)
+        self.median_time = median_time if median_time is not None else empty.astype(np.float32)
+        self.discrimination = discrimination if discrimination is not None else empty.astype(np.float32)
+        self.min_responses = min_responses
+        self._per_bank = {}
+
+    @classmethod
+    def load(cls, path=STATS_PATH):
+        """Stats written by the calibration job, or an empty lookup if there are none yet."""
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def __len__(self):
+        return len(self.question_id)
+
+    def rows(self, bank_id, question_ids):
+        """Row of each question id in the lookup (-1: unknown or too few answers)."""
+        question_ids = np.asarray(question_ids, dtype=np.int64)
+        code = self._banks.get(bank_id)
+        if code is None:
+            return np.full(len(question_ids), -1, dtype=np.int64)
+        start, end = np.searchsorted(self.bank, [code, code + 1])
+        i = np.minimum(np.searchsorted(self.question_id[start:end], question_ids) + start, end - 1)
+        found = (self.question_id[i] == question_ids) & (self.n[i] >= self.min_responses)
+        return np.where(found, i, -1)
+
+    def for_bank(self, bank_id, bank):
+        """``BankStats`` aligned with ``bank``'s row positions, or None if the bank is uncalibrated."""
+        if bank_id not in self._banks:
+            return None
+        stats = self._per_bank.get(bank_id)
+        if stats is None:
+            rows = self.rows(bank_id, bank.ids)
+            known = rows >= 0
+
+            def column(values):
+                return np.where(known, values[np.maximum(rows, 0)], np.nan).astype(np.float32)
+
+            discrimination = column(self.discrimination)
+            stats = BankStats(column(self.p_value), column(self.median_time), discrimination,
+                              discrimination < MIN_DISCRIMINATION)
+            self._per_bank[bank_id] = stats
+        return stats
+
+    def annotate(self, bank_id, solutions):
+        """Copy of ``solutions`` with ``p_value`` / ``median_time`` added where calibrated."""
+        if not solutions or bank_id not in self._banks:
+            return solutions
+        ids = [s.get("question_id") for s in solutions]
+        valid = [isinstance(qid, (int, np.integer)) or str(qid).isdigit() for qid in ids]
+        rows = self.rows(bank_id, [int(qid) if ok else -1 for qid, ok in zip(ids, valid)])
+        annotated = []
+        for solution, row in zip(solutions, rows):
+            solution = dict(solution)
+            if row >= 0:
+                solution["p_value"] = round(float(self.p_value[row]), 4)
+                solution["median_time"] = round(float(self.median_time[row]), 2)
+            annotated.append(solution)
+        return annotated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate question statistics from stored answers.")
+    parser.add_argument("--db", default=database_path())
+    parser.add_argument("--out", default=STATS_PATH)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    acc = calibrate(args.db, chunk=args.chunk)
+    stats = acc.result()
+    save(stats, args.out)
+    answers = int(acc.n[:len(acc.keys)].sum())
+    calibrated = int((stats["n"] >= MIN_RESPONSES).sum())
+    print(f"{answers} answers, {len(stats['n'])} questions ({calibrated} calibrated) "
+          f"in {time.perf_counter() - start:.1f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Reports for a whole class, from the command line.
+
+Reads many students' solutions from one file, renders each student's DOCX
+report with ``report_generator.generate_report`` on a process pool (one
+process per core by default), and prints progress as reports finish. It
+then writes a cohort summary to the output directory:
+
+- ``cohort_summary.json``: per topic and subtopic, how many students
+  answered it and the distribution of their accuracy (mean, min, quartiles,
+  max), plus each student's overall accuracy
+- ``cohort_topic_perf.png`` / ``cohort_subtopic_perf.png``: mean accuracy
+  per topic and subtopic (``visualization.plot_topic_performance`` /
+  ``plot_subtopic_performance``)
+
+Input formats, chosen by extension:
+- ``.json``: ``{"<student>": [solution, ...]}`` or
+  ``[{"student_name": ..., "solutions": [...]}, ...]``
+- ``.jsonl``: one ``{"student_name": ..., "solutions": [...]}`` per line
+- ``.csv``: one row per answer, with a ``student_name`` column next to the
+  solution fields (``question``, ``is_correct``, ``time_taken``, ``topic``, ...)
+
+Solutions have the shape returned by /submit; blank CSV cells are read as
+``None``. A student whose report fails is listed at the end and the others
+still get theirs; the exit status is then 1.
+
+Usage: ``python cohort.py solutions.json --out reports/cohort [--workers N]``
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ml_model.aggregation import aggregate
+
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+
+# -------------------- Input --------------------
+def _csv_solution(row):
+    # Blank cells become None; the report reads every column of every answer.
+    solution = {k: (None if v == "" else v) for k, v in row.items() if k != "student_name"}
+    solution["is_correct"] = str(row.get("is_correct", "")).strip().lower() in TRUE_VALUES
+    solution["time_taken"] = float(row.get("time_taken") or "nan")
+    return solution
+
+
+def load_cohort(path):
+    """List of ``(student_name, solutions)`` in file order."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="" if ext == ".csv" else None, encoding="utf-8") as f:
+        if ext == ".csv":
+            grouped = {}
+            for row in csv.DictReader(f):
+                grouped.setdefault(row["student_name"], []).append(_csv_solution(row))
+            students = list(grouped.items())
+        elif ext == ".jsonl":
+            records = [json.loads(line) for line in f if line.strip()]
+            students = [(r["student_name"], r["solutions"]) for r in records]
+        else:
+            data = json.load(f)
+            if isinstance(data, dict):
+                students = list(data.items())
+            else:
+                students = [(r["student_name"], r["solutions"]) for r in data]
+
+    names = [name for name, _ in students]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate student names (reports would overwrite each other): {duplicates}")
+    bad = [name for name in names if not name or os.sep in name]
+    if bad:
+        raise ValueError(f"Student names must be non-empty and contain no '{os.sep}': {bad}")
+    return students
+
+
+# -------------------- Report Pool --------------------
+def build_student_report(student_name, solutions, output_dir):
+    """Render one student's report; returns what the cohort summary needs."""
+    from ml_model import report_generator
+
+    start = time.perf_counter()
+    path = report_generator.generate_report(solutions, output_dir, student_name=student_name)
+    stats = aggregate(solutions)
+    return {
+        "student_name": student_name,
+        "path": os.path.abspath(path),
+        "seconds": time.perf_counter() - start,
+        "accuracy": stats.accuracy,
+        "topics": stats.topic_accuracy(),
+        "subtopics": stats.subtopic_accuracy(),
+    }
+
+
+def generate_cohort(students, output_dir, workers=None, progress=None):
+    """
+    Build every student's report on ``workers`` processes (default: all
+    cores). ``progress(done, total, result)`` is called as each one finishes.
+    Returns the results in input order; a student whose report failed gets
+    ``{"student_name": ..., "error": ...}`` and the others still run.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(build_student_report, name, solutions, output_dir): name
+                   for name, solutions in students}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"student_name": futures[future], "error": f"{type(e).__name__}: {e}"}
+            results[futures[future]] = result
+            if progress is not None:
+                progress(len(results), len(futures), result)
+    return [results[name] for name, _ in students]
+
+
+# -------------------- Cohort Summary --------------------
+def distribution(values):
+    values = sorted(values)
+    if len(values) > 1:
+        q1, median, q3 = statistics.quantiles(values, n=4, method="inclusive")
+    else:
+        q1 = median = q3 = values[0]
+    return {"students": len(values), "mean": statistics.fmean(values), "min": values[0],
+            "p25": q1, "median": median, "p75": q3, "max": values[-1]}
+
+
+def cohort_summary(results):
+    """Accuracy distributions across students, per topic and per subtopic."""
+    topics, subtopics = {}, {}
+    for result in results:
+        for key, acc in result["topics"].items():
+            topics.setdefault(key, []).append(acc)
+        for key, acc in result["subtopics"].items():
+            subtopics.setdefault(key, []).append(acc)
+    return {
+        "students": len(results),
+        "overall": distribution([r["accuracy"] for r in results]) if results else None,
+        "topics": {key: distribution(values) for key, values in sorted(topics.items())},
+        "subtopics": {key: distribution(values) for key, values in sorted(subtopics.items())},
+        "student_accuracy": {r["student_name"]: r["accuracy"] for r in results},
+    }
+
+
+def write_summary(summary, output_dir):
+    """Write the JSON summary and the two cohort charts; returns their paths."""
+    from ml_model.visualization import plot_subtopic_performance, plot_topic_performance
+
+    json_path = os.path.join(output_dir, "cohort_summary.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    paths = [json_path]
+    if summary["topics"]:
+        paths.append(plot_topic_performance({k: d["mean"] for k, d in summary["topics"].items()},
+                                            student_id="cohort", save_dir=output_dir))
+    if summary["subtopics"]:
+        paths.append(plot_subtopic_performance({k: d["mean"] for k, d in summary["subtopics"].items()},
+                                               student_id="cohort", save_dir=output_dir))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate reports for a whole class.")
+    parser.add_argument("solutions", help=".json, .jsonl or .csv file of students' solutions")
+    parser.add_argument("--out", default="cohort_reports")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    try:
+        students = load_cohort(args.solutions)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"cannot read {args.solutions}: {e}")
+
+    def progress(done, total, result):
+        if "error" in result:
+            print(f"[{done}/{total}] {result['student_name']}: FAILED: {result['error']}",
+                  file=sys.stderr, flush=True)
+            return
+        print(f"[{done}/{total}] {result['student_name']}: {result['accuracy']:.0f}% "
+              f"({result['seconds']:.2f}s) -> {result['path']}", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    results = generate_cohort(students, args.out, workers=args.workers, progress=progress)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if "error" in r]
+    results = [r for r in results if "error" not in r]
+    summary = cohort_summary(results)
+    for path in write_summary(summary, args.out):
+        print(path)
+    for topic, d in summary["topics"].items():
+        print(f"{topic:<30} {d['students']:>4} students  mean {d['mean']:5.1f}%  "
+              f"p25 {d['p25']:5.1f}%  median {d['median']:5.1f}%  p75 {d['p75']:5.1f}%")
+    print(f"{len(results)} reports in {elapsed:.1f}s ({len(results) / elapsed * 60:.0f} reports/min)",
+          file=sys.stderr)
+    if failed:
+        print(f"{len(failed)} reports failed: {', '.join(r['student_name'] for r in failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+SQLite configuration for the users / attempts database.
+
+Every gunicorn worker opens its own connections to the same file, so:
+
+- the path is resolved absolutely (``backend/users.db`` by default,
+  ``USERS_DB_PATH`` to move it) instead of depending on the working
+  directory or Flask's instance folder;
+- each new SQLite connection gets WAL journaling (readers never block the
+  writer), a busy timeout (writers queue instead of failing with "database is
+  locked") and ``synchronous=NORMAL`` (no fsync per commit in WAL mode);
+- the pool keeps a few connections per worker and never shares one across
+  threads mid-use; ``dispose_engine`` drops inherited connections after a fork.
+"""
+
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.db")
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 30000))
+SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+
+def database_path():
+    return os.path.abspath(os.getenv("USERS_DB_PATH", DEFAULT_DB_PATH))
+
+
+def engine_options():
+    return {
+        "connect_args": {"timeout": BUSY_TIMEOUT_MS / 1000, "check_same_thread": False},
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": BUSY_TIMEOUT_MS / 1000,
+    }
+
+
+@event.listens_for(Engine, "connect")
+def _configure_sqlite(dbapi_conn, _):
+    if not isinstance(dbapi_conn, sqlite3.Connection):
+        return
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    cursor.close()
+
+
+def configure_database(app, db):
+    """Point ``app`` at the shared SQLite file with tuned engine options and bind ``db``."""
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{database_path()}"
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options()
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+
+
+def create_tables(app, db, attempts=5):
+    """
+    ``db.create_all()`` that tolerates other workers starting at the same
+    time: create_all checks then creates, so two processes can both see a
+    table missing and the second CREATE fails with "already exists".
+    """
+    with app.app_context():
+        for attempt in range(attempts):
+            try:
+                db.create_all()
+                return
+            except OperationalError:
+                if attempt == attempts - 1:
+                    raise
+
+
+def dispose_engine(app, db):
+    """Forget pooled connections inherited from a parent process (call after fork)."""
+    with app.app_context():
+        db.engine.dispose(close=False)
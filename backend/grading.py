@@ -0,0 +1,185 @@
+"""
+Answer grading for /submit and offline re-grading.
+
+``grade_many`` flattens any number of attempts (``answers`` / ``time_logs``
+maps, as posted to /submit) into arrays, resolves every question id with one
+``QuestionBank.positions`` search, compares submitted answers against the
+answer codes normalized at upload time, and reduces score, time totals,
+slowest question and per-topic counts with array operations. ``grade`` is
+the single-attempt case used by /submit.
+
+The results match the original per-item /submit loop: unknown ids are
+skipped, the average is over every submitted answer, and the slowest question
+is the first one with the largest time above -1. An unparsable time still
+counts towards the score but drops the answer from ``solutions``.
+
+Offline: ``python grading.py <bank_id> attempts.jsonl`` re-grades one JSON
+attempt per line against a stored bank and prints one JSON result per line.
+"""
+
+import json
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+
+GENERAL_TOPIC = "General"
+
+
+@dataclass
+class Grade:
+    score: int
+    answered: int
+    total_time: float
+    average_time: float
+    max_time_question: str = None
+    max_time_value: float = -1
+    topic_breakdown: dict = field(default_factory=dict)
+    solutions: list = None
+
+    def summary(self):
+        return {
+            "score": self.score,
+            "average_time": self.average_time,
+            "max_time_question": self.max_time_question,
+            "max_time_value": round(self.max_time_value, 2),
+            "topic_breakdown": self.topic_breakdown,
+        }
+
+
+def _time(time_logs, qid):
+    try:
+        return float(time_logs.get(str(qid), 0)), True
+    except (AttributeError, TypeError, ValueError):
+        return 0.0, False
+
+
+def grade(bank, answers, time_logs=None, with_solutions=True):
+    """Grade one attempt; returns a ``Grade``."""
+    return grade_many(bank, [(answers, time_logs)], with_solutions=with_solutions)[0]
+
+
+def grade_many(bank, attempts, with_solutions=True):
+    """
+    Grade ``attempts`` (iterable of ``(answers, time_logs)``) against ``bank``.
+    Returns one ``Grade`` per attempt; ``with_solutions=False`` skips building
+    the per-question solution dicts (enough for re-scoring archives).
+    """
+    qids, given, times, time_ok, owner, answered = [], [], [], [], [], []
+    for k, (answers, time_logs) in enumerate(attempts):
+        time_logs = time_logs or {}
+        answered.append(len(answers))
+        for qid, user_ans in answers.items():
+            t, ok = _time(time_logs, qid)
+            qids.append(qid)
+            given.append(user_ans)
+            times.append(t)
+            time_ok.append(ok)
+            owner.append(k)
+
+    num = len(answered)
+    positions = bank.positions(qids)
+    owner = np.array(owner, dtype=np.int64)
+    times = np.array(times, dtype=float)
+    time_ok = np.array(time_ok, dtype=bool)
+
+    valid = positions >= 0
+    valid[valid] = bank.answer_codes[positions[valid]] >= 0
+    user_codes = np.array([bank.answer_code(ans) for ans in given], dtype=np.int32)
+    correct = valid & (bank.answer_codes[np.where(valid, positions, 0)] == user_codes)
+    kept = valid & time_ok
+
+    scores = np.bincount(owner, weights=correct, minlength=num).astype(np.int64)
+    totals = np.bincount(owner, weights=np.where(kept, times, 0), minlength=num)
+
+    # Slowest question: first kept answer (in submission order) with the largest time > -1.
+    candidates = np.flatnonzero(kept & (times > -1))
+    slowest = {}
+    if len(candidates):
+        order = candidates[np.lexsort((candidates, -times[candidates], owner[candidates]))]
+        firsts = order[np.unique(owner[order], return_index=True)[1]]
+        slowest = {int(owner[i]): int(i) for i in firsts}
+
+    breakdowns = _topic_breakdowns(bank, positions, owner, kept, correct, num)
+
+    items = np.flatnonzero(kept)
+    records = bank.records(positions[items]) if with_solutions else []
+    solutions = [[] for _ in range(num)] if with_solutions else [None] * num
+    question_ids = bank.ids[positions[items]]
+    for j, (i, row) in enumerate(zip(items, records)):
+        solutions[owner[i]].append({
+            "question_id": int(question_ids[j]),
+            "question": row["question_text"],
+            "user_answer": given[i],
+            "correct_answer": row["answer"],
+            "is_correct": bool(correct[i]),
+            "time_taken": round(float(times[i]), 2),
+            "topic": row.get("topic", GENERAL_TOPIC),
+            "subtopic": row.get("subtopic", GENERAL_TOPIC),
+            "difficulty": row.get("difficulty"),
+        })
+
+    slow_items = list(slowest.values())
+    slow_text = dict(zip(slow_items, bank.values("question_text", positions[slow_items])))
+
+    grades = []
+    for k in range(num):
+        i = slowest.get(k)
+        grades.append(Grade(
+            score=int(scores[k]),
+            answered=answered[k],
+            total_time=float(totals[k]),
+            average_time=round(float(totals[k]) / answered[k], 2) if answered[k] else 0,
+            max_time_question=slow_text.get(i),
+            max_time_value=float(times[i]) if i is not None else -1,
+            topic_breakdown=breakdowns[k],
+            solutions=solutions[k],
+        ))
+    return grades
+
+
+def _topic_breakdowns(bank, positions, owner, kept, correct, num):
+    """Per attempt: ``{topic: {"correct", "total", "accuracy"}}`` over the kept answers."""
+    items = np.flatnonzero(kept)
+    groups = bank.group_codes[positions[items]]
+    num_groups = len(bank.group_keys) + 1  # last slot: no (topic, subtopic) group
+    groups = np.where(groups >= 0, groups, num_groups - 1)
+    cell = owner[items] * num_groups + groups
+    total = np.bincount(cell, minlength=num * num_groups).reshape(num, num_groups)
+    right = np.bincount(cell, weights=correct[items], minlength=num * num_groups).reshape(num, num_groups)
+
+    topics = [key[0] for key in bank.group_keys] + [GENERAL_TOPIC]
+    breakdowns = [{} for _ in range(num)]
+    for k, g in zip(*np.nonzero(total)):
+        entry = breakdowns[k].setdefault(str(topics[g]), {"correct": 0, "total": 0})
+        entry["correct"] += int(right[k, g])
+        entry["total"] += int(total[k, g])
+    for breakdown in breakdowns:
+        for entry in breakdown.values():
+            entry["accuracy"] = round(100 * entry["correct"] / entry["total"], 2)
+    return breakdowns
+
+
+# -------------------- Offline Re-grading --------------------
+def main(argv=None):
+    from bank_storage import BankStore
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python grading.py <bank_id> <attempts.jsonl>", file=sys.stderr)
+        return 2
+    bank = BankStore().get(argv[0])
+    if bank is None:
+        print(f"Unknown bank: {argv[0]}", file=sys.stderr)
+        return 1
+    with open(argv[1], encoding="utf-8") as f:
+        attempts = [json.loads(line) for line in f if line.strip()]
+    grades = grade_many(bank, [(a.get("answers", {}), a.get("time_logs", {})) for a in attempts],
+                        with_solutions=False)
+    for attempt, result in zip(attempts, grades):
+        print(json.dumps({"id": attempt.get("id"), **result.summary()}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings. gunicorn reads this file from the working directory, so
+``gunicorn app:app`` in ``backend/`` picks it up. Worker count and bind
+address keep gunicorn's defaults (``WEB_CONCURRENCY``, ``PORT``).
+
+- ``GUNICORN_PRELOAD=1``: import the app once in the master and fork the
+  workers from it. Modules, the calibration table and other read-only state
+  are then shared copy-on-write instead of loaded once per worker, and
+  workers start without re-importing anything.
+- ``GUNICORN_WARM_IMPORTS=1`` (with preload): also import the dependencies
+  the app otherwise loads on first use (pandas for uploads, the report
+  renderer, the Gemini SDK), so no worker pays for them on a request.
+
+``post_fork`` drops what a worker must not inherit from the master: pooled
+SQLite connections opened while creating tables, and the ``random`` seed.
+Thread and process pools are already created per process on first use.
+"""
+
+import importlib
+import os
+import random
+import sys
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "0").lower() in ("1", "true", "yes")
+WARM_IMPORTS = os.getenv("GUNICORN_WARM_IMPORTS", "0").lower() in ("1", "true", "yes")
+WARM_MODULES = ("pandas", "ml_model.report_generator", "google.generativeai")
+
+
+def when_ready(server):
+    if preload_app and WARM_IMPORTS:
+        for name in WARM_MODULES:
+            importlib.import_module(name)
+
+
+def post_fork(server, worker):
+    appmod = sys.modules.get("app")
+    if appmod is None:
+        return  # not preloaded: the worker imports the app itself
+    from database import dispose_engine
+
+    dispose_engine(appmod.app, appmod.db)
+    random.seed()
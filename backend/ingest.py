@@ -0,0 +1,138 @@
+"""
+Question bank ingestion: delimiter sniffing, chunked CSV parsing and column
+standardization.
+
+CSV uploads are parsed exactly once: the delimiter is picked from the first
+few KB, the header is mapped to the standard column names up front, and the
+body is read in chunks with explicit string dtypes straight from the upload
+stream (no full ``read().decode()`` copy, no re-parse per candidate
+delimiter). Each chunk is folded into a ``QuestionBankBuilder``, so peak
+memory is the compact bank plus one chunk rather than a full DataFrame.
+pandas is imported with the first upload rather than with the app.
+"""
+
+import csv
+import io
+
+from question_bank import QuestionBankBuilder
+
+DELIMITERS = [';', ',', '\t', '|']
+SNIFF_BYTES = 64 * 1024
+CHUNK_ROWS = 50_000
+
+COLUMN_ALIASES = {
+    "question_text": ["question_text","questiontext", "question text", "question", "ques", "q"],
+    "option_a": ["optiona", "option a", "a", "a)", "ans_a", "answer_a", "opt1", "option_a","A","A)"],
+    "option_b": ["optionb", "option b", "b", "b)", "ans_b", "answer_b", "opt2", "option_b","B","B)"],
+    "option_c": ["optionc", "option c", "c", "c)", "ans_c", "answer_c", "opt3", "option_c","C","C)"],
+    "option_d": ["optiond", "option d", "d", "d)", "ans_d", "answer_d", "opt4", "option_d","D","D)"],
+    "answer": ["answer", "ans", "solution", "correct answer", "correct", "answer key"],
+    "topic": ["topic", "subject", "category", "chapter"],
+    "subtopic": ["subtopic", "sub-topic", "section", "sub_section", "subchapter","tag","tags","Tags"],
+    "difficulty": ["difficulty", "level", "hardness"]
+}
+
+COLUMN_DEFAULTS = {
+    "question_text": "No question text",
+    "answer": "a",
+    "difficulty": "Very easy",
+    "topic": "N/A",
+    "subtopic": "N/A"
+}
+
+# Everything a question is matched or displayed by is text; reading these as
+# strings keeps dtypes stable across chunks.
+TEXT_COLUMNS = set(COLUMN_ALIASES)
+
+
+class IngestError(ValueError):
+    """The uploaded file could not be turned into a question bank."""
+
+
+# -------------------- Column Standardization --------------------
+def standardize_columns(columns):
+    """Map raw header names to standard column names (unmatched names are lower-cased)."""
+    columns = [str(c).strip().lower() for c in columns]
+    new_cols = {}
+    for std_col, variants in COLUMN_ALIASES.items():
+        for variant in variants:
+            if variant.lower() in columns:
+                new_cols[variant.lower()] = std_col
+                break
+    return [new_cols.get(c, c) for c in columns]
+
+
+def add_defaults(df):
+    for col, val in COLUMN_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = val
+    return df
+
+
+def standardize_dataset(df):
+    df.columns = standardize_columns(df.columns)
+    return add_defaults(df)
+
+
+# -------------------- Delimiter Sniffing --------------------
+def sniff_delimiter(sample):
+    """
+    First delimiter (in ``DELIMITERS`` order) that splits the header into more
+    than one column without any sample row having more fields than the header.
+    """
+    lines = sample.splitlines()
+    if len(sample) >= SNIFF_BYTES and len(lines) > 1:
+        lines = lines[:-1]  # the last line is probably cut off
+    for delim in DELIMITERS:
+        rows = list(csv.reader(lines, delimiter=delim))
+        if not rows or len(rows[0]) <= 1:
+            continue
+        if all(len(row) <= len(rows[0]) for row in rows[1:]):
+            return delim
+    return None
+
+
+# -------------------- Readers --------------------
+def iter_csv_chunks(stream, chunk_rows=CHUNK_ROWS):
+    """Yield standardized DataFrame chunks (with ``id``) from a seekable binary CSV stream."""
+    import pandas as pd
+
+    sample = stream.read(SNIFF_BYTES).decode("utf-8-sig", errors="replace")
+    stream.seek(0)
+    delim = sniff_delimiter(sample)
+    if delim is None:
+        raise IngestError("Failed to detect delimiter. Please use CSV with ; , \\t or |")
+
+    header = next(csv.reader(io.StringIO(sample), delimiter=delim))
+    names = standardize_columns(header)
+    dtype = {raw: str for raw, name in zip(header, names) if name in TEXT_COLUMNS}
+
+    next_id = 1
+    for chunk in pd.read_csv(stream, sep=delim, dtype=dtype, chunksize=chunk_rows, encoding="utf-8"):
+        chunk.columns = names
+        chunk = add_defaults(chunk)
+        if "id" not in chunk.columns:
+            chunk.insert(0, "id", range(next_id, next_id + len(chunk)))
+            next_id += len(chunk)
+        yield chunk
+
+
+def read_question_bank(stream, filename, chunk_rows=CHUNK_ROWS):
+    """QuestionBank from an uploaded CSV/XLSX stream, parsed once."""
+    import pandas as pd
+
+    builder = QuestionBankBuilder()
+    try:
+        if filename.endswith(".xlsx"):
+            df = standardize_dataset(pd.read_excel(stream))
+            if "id" not in df.columns:
+                df.insert(0, "id", range(1, len(df)+1))
+            builder.add(df)
+        else:
+            for chunk in iter_csv_chunks(stream, chunk_rows):
+                builder.add(chunk)
+        return builder.build()
+    except IngestError:
+        raise
+    except Exception as e:
+        raise IngestError(f"Failed to read file: {str(e)}") from e
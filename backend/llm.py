@@ -0,0 +1,107 @@
+"""
+Gemini client setup.
+
+``LLM_BACKEND=fake`` swaps Gemini for a local ``FakeModel`` (optionally with
+``LLM_FAKE_LATENCY`` seconds of delay per call, spread over the chunks when
+streaming) so reports and the chatbot can be exercised without network
+access or an API key.
+
+The Gemini SDK is imported on the first ``create_model()`` call rather than
+at import time; it is the slowest import in the app.
+"""
+
+import asyncio
+import os
+import time
+
+from dotenv import load_dotenv
+
+MODEL_NAME = "gemini-2.5-flash-lite"
+
+load_dotenv()
+GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+
+if LLM_BACKEND == "gemini" and not GEMINI_API_KEY:
+    print("⚠️ No Gemini API key found. Set GOOGLE_API_KEY in .env")
+
+_genai = None
+
+
+def genai():
+    """The configured ``google.generativeai`` module, imported on first use."""
+    global _genai
+    if _genai is None:
+        import google.generativeai as module
+        if GEMINI_API_KEY:
+            module.configure(api_key=GEMINI_API_KEY)
+        _genai = module
+    return _genai
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stand-in for ``genai.GenerativeModel`` that answers locally."""
+
+    def __init__(self, latency=None):
+        self.latency = float(os.getenv("LLM_FAKE_LATENCY", 0) if latency is None else latency)
+        self.calls = 0
+        self.chunks = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        text = f"[fake {MODEL_NAME}] {' '.join(str(prompt).split()[:40])}"
+        if stream:
+            return self._stream(text)
+        if self.latency:
+            time.sleep(self.latency)
+        return FakeResponse(text)
+
+    def _stream(self, text):
+        # Word-sized chunks spread over ``latency``, like a streamed completion.
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if self.latency:
+                time.sleep(self.latency / len(words))
+            self.chunks += 1
+            yield FakeResponse(word if i == 0 else " " + word)
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        text = f"[fake {MODEL_NAME}] {' '.join(str(prompt).split()[:40])}"
+        if stream:
+            return self._astream(text)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return FakeResponse(text)
+
+    async def _astream(self, text):
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if self.latency:
+                await asyncio.sleep(self.latency / len(words))
+            self.chunks += 1
+            yield FakeResponse(word if i == 0 else " " + word)
+
+
+def is_enabled():
+    """Whether an LLM backend is available (a fake one counts)."""
+    return LLM_BACKEND == "fake" or bool(GEMINI_API_KEY)
+
+
+def create_model():
+    if LLM_BACKEND == "fake":
+        return FakeModel()
+    return genai().GenerativeModel(MODEL_NAME)
+
+
+def report_summary_prompt(student_name):
+    return (
+        f"Summarize the test performance of student {student_name}. "
+        "Provide a concise, professional analysis highlighting strengths, weaknesses, "
+        "and any suggestions for improvement."
+    )
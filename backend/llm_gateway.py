@@ -0,0 +1,373 @@
+"""
+Single entry point for LLM calls (/chatbot and report summaries).
+
+``LLMGateway.generate(prompt)`` adds, in front of one shared model instance:
+
+- a response cache keyed by the normalized prompt (whitespace collapsed,
+  case-folded), LRU-bounded with a TTL, optionally persisted to SQLite so
+  every worker process (and the report pool) shares answers;
+- in-flight coalescing: concurrent identical prompts wait for one call
+  instead of each making their own;
+- hit / miss / coalesced / error counters and call latency.
+
+``LLMGateway.stream(prompt, timeout)`` yields the answer in chunks as the
+model produces them (used by /chatbot/stream). The model is read on a
+helper thread, so the timeout holds even while a chunk is stuck, and
+closing the generator (client gone) stops reading the model's stream.
+
+``agenerate`` / ``astream`` are the asyncio equivalents used by the ASGI
+entry point (``asgi.py``); they await ``generate_content_async`` instead of
+holding a thread for the whole call, and share the same cache and counters.
+
+Configuration:
+- ``LLM_CACHE_SIZE``: in-process entries (default 1024, 0 disables caching)
+- ``LLM_CACHE_TTL``: seconds an answer stays valid (default 24h)
+- ``LLM_CACHE_DB``: SQLite file for the shared cache (unset: in-process only)
+"""
+
+import asyncio
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import llm
+import metrics
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 24 * 3600
+
+
+def normalize_prompt(prompt):
+    return " ".join(str(prompt).split()).casefold()
+
+
+def prompt_key(prompt):
+    return hashlib.sha256(f"{llm.MODEL_NAME}\n{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+# -------------------- Response Cache --------------------
+class ResponseCache:
+    """LRU of ``key -> (text, expires)``, backed by an optional SQLite table."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL, db_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.db_path = os.path.abspath(db_path) if db_path else None
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, text TEXT NOT NULL, expires REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _remember(self, key, text, expires):
+        with self._lock:
+            self._items[key] = (text, expires)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get(self, key):
+        if self.maxsize <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                if entry[1] >= now:
+                    self._items.move_to_end(key)
+                    return entry[0]
+                del self._items[key]
+        if self.db_path:
+            row = self._connect().execute(
+                "SELECT text, expires FROM llm_cache WHERE key = ? AND expires >= ?", (key, now)
+            ).fetchone()
+            if row:
+                self._remember(key, *row)
+                return row[0]
+        return None
+
+    def put(self, key, text):
+        if self.maxsize <= 0:
+            return
+        expires = time.time() + self.ttl
+        self._remember(key, text, expires)
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO llm_cache (key, text, expires) VALUES (?, ?, ?)",
+                             (key, text, expires))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self):
+        return len(self._items)
+
+
+# -------------------- Gateway --------------------
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.text = None
+        self.error = None
+
+
+class LLMGateway:
+    """Cached, coalescing front for one shared model instance."""
+
+    def __init__(self, cache=None, model_factory=None):
+        self.cache = cache if cache is not None else ResponseCache()
+        self._model_factory = model_factory or llm.create_model
+        self._model = None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._ainflight = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0,
+                       "calls": 0, "latency_total": 0.0, "latency_max": 0.0}
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._model_factory()
+        return self._model
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._stats[name] += value
+        metrics.LLM_EVENTS.inc(value, event=name)
+
+    def _record_call(self, start):
+        # Caller holds ``self._lock``.
+        elapsed = time.perf_counter() - start
+        self._stats["calls"] += 1
+        self._stats["latency_total"] += elapsed
+        self._stats["latency_max"] = max(self._stats["latency_max"], elapsed)
+        metrics.LLM_CALL_SECONDS.observe(elapsed)
+
+    def generate(self, prompt):
+        """Text of the model's answer to ``prompt``."""
+        key = prompt_key(prompt)
+        text = self.cache.get(key)
+        if text is not None:
+            self._count("hits")
+            return text
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        metrics.LLM_EVENTS.inc(event="misses" if leader else "coalesced")
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.text
+
+        start = time.perf_counter()
+        try:
+            flight.text = self.model.generate_content(prompt).text
+            self.cache.put(key, flight.text)
+        except Exception as e:
+            flight.error = e
+            self._count("errors")
+            raise
+        finally:
+            with self._lock:
+                self._record_call(start)
+                del self._inflight[key]
+            flight.done.set()
+        return flight.text
+
+    def stream(self, prompt, timeout=None):
+        """
+        Yield the answer to ``prompt`` chunk by chunk; the full text is cached
+        once the stream completes. Raises ``TimeoutError`` if the answer is not
+        complete within ``timeout`` seconds.
+        """
+        key = prompt_key(prompt)
+        text = self.cache.get(key)
+        if text is not None:
+            self._count("hits")
+            yield text
+            return
+        self._count("misses")
+
+        chunks = queue.Queue()
+        cancelled = threading.Event()
+
+        def produce():
+            try:
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    if cancelled.is_set():
+                        break
+                    chunks.put(("chunk", chunk.text))
+                chunks.put(("end", None))
+            except Exception as e:
+                chunks.put(("error", e))
+
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        threading.Thread(target=produce, name="llm-stream", daemon=True).start()
+        parts = []
+        try:
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                try:
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    kind, value = chunks.get(timeout=remaining)
+                except queue.Empty:
+                    self._count("errors")
+                    raise TimeoutError(f"LLM response not complete after {timeout}s") from None
+                if kind == "end":
+                    break
+                if kind == "error":
+                    self._count("errors")
+                    raise value
+                parts.append(value)
+                yield value
+            self.cache.put(key, "".join(parts))
+        finally:
+            cancelled.set()
+            with self._lock:
+                self._record_call(start)
+
+    # -------------------- Async --------------------
+    async def _acall(self, prompt, stream=False):
+        model = self.model
+        if hasattr(model, "generate_content_async"):
+            return await model.generate_content_async(prompt, stream=stream)
+        response = await asyncio.to_thread(model.generate_content, prompt)
+        if stream:
+            return _single_chunk(response)
+        return response
+
+    async def agenerate(self, prompt):
+        """Async ``generate``: concurrent identical prompts on the event loop share one call."""
+        key = prompt_key(prompt)
+        text = self.cache.get(key)
+        if text is not None:
+            self._count("hits")
+            return text
+
+        future = self._ainflight.get(key)
+        if future is not None:
+            self._count("coalesced")
+            return await asyncio.shield(future)
+
+        future = self._ainflight[key] = asyncio.get_running_loop().create_future()
+        self._count("misses")
+        start = time.perf_counter()
+        try:
+            text = (await self._acall(prompt)).text
+            self.cache.put(key, text)
+            future.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._count("errors")
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn when there are none
+            raise
+        finally:
+            del self._ainflight[key]
+            with self._lock:
+                self._record_call(start)
+
+    async def astream(self, prompt, timeout=None):
+        """Async ``stream``; ``timeout`` bounds the whole answer."""
+        key = prompt_key(prompt)
+        text = self.cache.get(key)
+        if text is not None:
+            self._count("hits")
+            yield text
+            return
+        self._count("misses")
+
+        start = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        chunks = None
+        parts = []
+        try:
+            try:
+                response = await asyncio.wait_for(self._acall(prompt, stream=True), timeout)
+                chunks = aiter(response)
+                while True:
+                    remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                    try:
+                        chunk = await asyncio.wait_for(anext(chunks), remaining)
+                    except StopAsyncIteration:
+                        break
+                    parts.append(chunk.text)
+                    yield chunk.text
+            except TimeoutError:
+                self._count("errors")
+                raise TimeoutError(f"LLM response not complete after {timeout}s") from None
+            except Exception:
+                self._count("errors")
+                raise
+            self.cache.put(key, "".join(parts))
+        finally:
+            if chunks is not None and hasattr(chunks, "aclose"):
+                await chunks.aclose()
+            with self._lock:
+                self._record_call(start)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["latency_avg"] = stats["latency_total"] / stats["calls"] if stats["calls"] else 0.0
+        stats["cache_size"] = len(self.cache)
+        return stats
+
+
+async def _single_chunk(response):
+    yield response
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Process-wide gateway configured from the environment."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(ResponseCache(
+                    maxsize=int(os.getenv("LLM_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+                    ttl=float(os.getenv("LLM_CACHE_TTL", DEFAULT_CACHE_TTL)),
+                    db_path=os.getenv("LLM_CACHE_DB"),
+                ))
+    return _gateway
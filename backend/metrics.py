@@ -0,0 +1,342 @@
+"""
+Request metrics in the Prometheus text format, and an opt-in sampling profiler.
+
+Metrics (served on GET /metrics):
+
+- ``http_request_duration_seconds{method,route,status}``: per-route latency
+  histogram, recorded when the view returns (a streamed body is not
+  included)
+- ``llm_events_total{event}``: gateway cache hits / misses / coalesced calls
+  and errors; ``llm_call_duration_seconds``: latency of actual model calls
+- ``stage_duration_seconds{stage}``: ``select_questions``, ``grading``,
+  ``charts``, ``docx_save`` and ``report_job`` (queue wait included)
+
+Each process keeps its own registry. With ``METRICS_DIR`` set, every process
+(gunicorn workers, the report pool) also writes a snapshot to
+``METRICS_DIR/<pid>.json`` at most every ``METRICS_FLUSH_INTERVAL`` seconds,
+and /metrics adds up the snapshots of processes that are still running
+(files of exited ones are deleted as it goes). Without it, /metrics shows
+the worker that answered, and stages run in the report pool are not visible.
+
+Profiler: with ``PROFILE_SLOW_MS`` set, one background thread samples the
+stacks of in-flight requests every ``PROFILE_INTERVAL_MS`` (default 5 ms).
+A request that takes at least ``PROFILE_SLOW_MS``, or one sent with
+``X-Profile: 1``, has its samples written to ``PROFILE_DIR`` in collapsed
+stack format (``frame;frame;frame count``), which flamegraph.pl and
+speedscope read directly.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1.0))
+PROFILE_SLOW_MS = os.getenv("PROFILE_SLOW_MS")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+# -------------------- Metric Types --------------------
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def snapshot(self):
+        with self._lock:
+            return {json.dumps(key): self._copy(value) for key, value in self._series.items()}
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+        REGISTRY.touched()
+
+    @staticmethod
+    def merge(a, b):
+        return a + b
+
+    def lines(self, series):
+        for key, value in sorted(series.items()):
+            yield f"{self.name}{self._labels(json.loads(key))} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help_text, labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (not cumulative) counts, then sum and count.
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+        REGISTRY.touched()
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _copy(self, value):
+        return list(value)
+
+    @staticmethod
+    def merge(a, b):
+        return [x + y for x, y in zip(a, b)]
+
+    def lines(self, series):
+        for key, value in sorted(series.items()):
+            key = json.loads(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), value):
+                cumulative += count
+                yield f"{self.name}_bucket{self._labels(key, [('le', str(bound))])} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {value[-2]}"
+            yield f"{self.name}_count{self._labels(key)} {value[-1]}"
+
+
+# -------------------- Registry --------------------
+def _pid_alive(pid):
+    if os.name == "nt":
+        return True  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def touched(self):
+        if METRICS_DIR and time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Write this process's snapshot to ``METRICS_DIR`` (no-op without it)."""
+        if not METRICS_DIR:
+            return
+        self._last_flush = time.monotonic()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _snapshots(self):
+        yield self.snapshot()
+        if not METRICS_DIR or not os.path.isdir(METRICS_DIR):
+            return
+        own = f"{os.getpid()}.json"
+        for name in os.listdir(METRICS_DIR):
+            pid = name.split(".", 1)[0]
+            path = os.path.join(METRICS_DIR, name)
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                # Left by a worker that exited or was replaced (or a temp file it never renamed).
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            if name.endswith(".json") and name != own:
+                try:
+                    with open(path) as f:
+                        yield json.load(f)
+                except (OSError, ValueError):
+                    continue  # being replaced right now
+
+    def render(self):
+        """All metrics, summed over the processes that reported, in text format 0.0.4."""
+        merged = {name: {} for name in self.metrics}
+        for snapshot in self._snapshots():
+            for name, series in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                target = merged[name]
+                for key, value in series.items():
+                    target[key] = metric.merge(target[key], value) if key in target else value
+
+        out = []
+        for name, metric in self.metrics.items():
+            out.append(f"# HELP {name} {metric.help}")
+            out.append(f"# TYPE {name} {metric.kind}")
+            out.extend(metric.lines(merged[name]))
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time spent in the view, by route.",
+                            ("method", "route", "status"))
+LLM_EVENTS = Counter("llm_events_total", "LLM gateway cache hits, misses, coalesced calls and errors.",
+                     ("event",))
+LLM_CALL_SECONDS = Histogram("llm_call_duration_seconds", "Latency of model calls (cache misses).")
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Time spent in a hot-path stage.", ("stage",))
+
+
+def stage(name):
+    """``with stage("grading"): ...`` records the block's duration."""
+    return STAGE_SECONDS.time(stage=name)
+
+
+# -------------------- Sampling Profiler --------------------
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads from one background thread."""
+
+    def __init__(self, interval=PROFILE_INTERVAL, output_dir=PROFILE_DIR):
+        self.interval = interval
+        self.output_dir = output_dir
+        self._active = {}  # thread id -> tally of collapsed stacks
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Threads do not survive fork; each worker process starts its own.
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def start(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self._ensure_thread()
+            self._active[ident] = _Tally()
+
+    def stop(self):
+        with self._lock:
+            return self._active.pop(threading.get_ident(), _Tally())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, tally in self._active.items():
+                    frame = frames.get(ident)
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_name(frame))
+                        frame = frame.f_back
+                    if stack:
+                        tally[";".join(reversed(stack))] += 1
+
+    def dump(self, tally, label):
+        """Write ``tally`` as collapsed stacks; returns the file path."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe = "".join(c if c.isalnum() else "_" for c in label).strip("_") or "request"
+        path = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{safe}.folded")
+        with open(path, "w") as f:
+            for stack, count in tally.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+# -------------------- Flask Integration --------------------
+def instrument(app):
+    """Time every request of ``app``, add GET /metrics and, if enabled, the profiler."""
+    from flask import Response, g, request
+
+    profiler = SamplingProfiler() if PROFILE_SLOW_MS else None
+    slow = float(PROFILE_SLOW_MS or 0) / 1000
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+        if profiler is not None:
+            profiler.start()
+
+    def _finish_request(status):
+        start = g.pop("request_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=status)
+        if profiler is not None:
+            tally = profiler.stop()
+            if tally and (elapsed >= slow or request.headers.get("X-Profile") == "1"):
+                path = profiler.dump(tally, f"{request.method} {route}")
+                print(f"Profiled {request.method} {request.path} ({elapsed * 1000:.0f} ms): {path}")
+
+    @app.after_request
+    def _record_request(response):
+        _finish_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _record_failed_request(exc):
+        # after_request is skipped when an exception escapes the view; without
+        # this the thread would stay registered with the profiler for good.
+        _finish_request(500)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+    return profiler
@@ -1,18 +1,27 @@
 """
 ml_model package initializer.
 Expose report generator and visualization functions.
+
+The names are resolved on first access (PEP 562) so importing the package,
+or ``ml_model.aggregation``, does not load matplotlib, seaborn or python-docx.
 """
 
-from .report_generator import generate_report
-from .visualization import (
-    plot_accuracy,
-    plot_topic_performance,
-    plot_subtopic_performance,
-)
+import importlib
+
+_EXPORTS = {
+    "generate_report": "report_generator",
+    "plot_accuracy": "visualization",
+    "plot_topic_performance": "visualization",
+    "plot_subtopic_performance": "visualization",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    "generate_report",
-    "plot_accuracy",
-    "plot_topic_performance",
-    "plot_subtopic_performance",
-]
\ No newline at end of file
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
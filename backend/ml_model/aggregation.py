@@ -0,0 +1,131 @@
+"""
+Single-pass aggregation of a report's solutions.
+
+``aggregate`` walks the solutions once and keeps plain counters: overall
+score and time, per-topic and per-subtopic counts, the "Application" subset
+and the calibrated pace / difficulty-weighted sums. The charts, the DOCX and
+the written summary all read the resulting ``ReportStats`` instead of each
+grouping a DataFrame again.
+
+Results match the pandas code this replaces:
+
+- solutions without a topic (subtopic) are left out of that breakdown, and
+  breakdowns are sorted by key, as ``groupby`` does
+- missing times are skipped when averaging
+- Application is NaN when no Moderate/Difficult question was answered
+"""
+
+import math
+
+APPLICATION_LEVELS = ("Moderate", "Difficult")
+STRENGTH = 75      # topic accuracy (%) at or above which a topic is a strength
+WEAK_SUBTOPIC = 60  # subtopic accuracy (%) below which a subtopic needs work
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _accuracy(counts):
+    return {key: correct / total * 100 for key, (correct, total) in sorted(counts.items())}
+
+
+class ReportStats:
+    """Counters for one report; build with ``aggregate``."""
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.time_sum = 0.0
+        self.timed = 0
+        self.topics = {}      # topic -> [correct, answered]
+        self.subtopics = {}   # subtopic -> [correct, answered]
+        self.applied = [0, 0]
+        self.pace_sum = 0.0
+        self.paced = 0
+        self.weight_sum = 0.0
+        self.weighted_correct = 0.0
+
+    def add(self, solution):
+        correct = bool(solution["is_correct"])
+        time_taken = float(solution["time_taken"])
+        self.total += 1
+        self.correct += correct
+        if not math.isnan(time_taken):
+            self.time_sum += time_taken
+            self.timed += 1
+
+        for key, counts in ((solution.get("topic"), self.topics), (solution.get("subtopic"), self.subtopics)):
+            if not _missing(key):
+                entry = counts.setdefault(key, [0, 0])
+                entry[0] += correct
+                entry[1] += 1
+
+        if solution.get("difficulty") in APPLICATION_LEVELS:
+            self.applied[0] += correct
+            self.applied[1] += 1
+
+        # Calibrated statistics (see ``calibration.QuestionStats.annotate``).
+        median = solution.get("median_time")
+        if not _missing(median) and not math.isnan(time_taken):
+            self.pace_sum += median / max(time_taken, median, 0.01)
+            self.paced += 1
+        p_value = solution.get("p_value")
+        if not _missing(p_value):
+            self.weight_sum += 1 - p_value
+            self.weighted_correct += (1 - p_value) * correct
+
+    # -------------------- Derived Values --------------------
+    @property
+    def incorrect(self):
+        return self.total - self.correct
+
+    @property
+    def accuracy(self):
+        return self.correct / self.total * 100 if self.total else 0
+
+    @property
+    def average_time(self):
+        return self.time_sum / self.timed if self.timed else float("nan")
+
+    def topic_accuracy(self):
+        return _accuracy(self.topics)
+
+    def subtopic_accuracy(self):
+        return _accuracy(self.subtopics)
+
+    def strengths(self):
+        return [topic for topic, acc in self.topic_accuracy().items() if acc >= STRENGTH]
+
+    def weaknesses(self):
+        return [topic for topic, acc in self.topic_accuracy().items() if acc < STRENGTH]
+
+    def weak_subtopics(self):
+        return [sub for sub, acc in self.subtopic_accuracy().items() if acc < WEAK_SUBTOPIC]
+
+    def fundamentals(self):
+        """
+        Learning fundamentals (%). With calibrated statistics, Listening is the
+        pace against each question's median time (capped at 100%) and
+        Application the accuracy weighted by difficulty (1 - p_value).
+        """
+        grasping = self.correct / self.total * 100 if self.total else float("nan")
+        result = {
+            "Listening": max(0, 100 - self.average_time),
+            "Grasping": grasping,
+            "Retention": 100 - self.incorrect / self.total * 100 if self.total else float("nan"),
+            "Application": self.applied[0] / self.applied[1] * 100 if self.applied[1] else float("nan"),
+        }
+        if self.paced:
+            result["Listening"] = self.pace_sum / self.paced * 100
+        if self.weight_sum > 0:
+            result["Application"] = self.weighted_correct / self.weight_sum * 100
+        return result
+
+
+def aggregate(solutions):
+    """``ReportStats`` for a list of solution dicts (as returned by /submit)."""
+    stats = ReportStats()
+    for solution in solutions:
+        stats.add(solution)
+    return stats
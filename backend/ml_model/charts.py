@@ -0,0 +1,179 @@
+"""
+Chart rendering service shared by reports and visualization helpers.
+
+Building a matplotlib figure (and going through seaborn) costs far more than
+drawing it, so bar charts are drawn on cached figure templates: one Figure
+per (chart kind, labels) per thread, whose bar heights and title are updated
+in place for each render. Rendered PNGs are also cached by (chart, labels,
+values rounded to ``VALUE_DECIMALS``, title); with 10-question tests many
+students produce exactly the same score profile.
+
+``CHART_CACHE_SIZE`` sets the number of cached PNGs (0 disables the cache).
+"""
+
+import os
+import threading
+from io import BytesIO
+from collections import OrderedDict, namedtuple
+
+import matplotlib
+matplotlib.use("Agg")  # Non-GUI backend for server-side plotting
+from matplotlib.figure import Figure
+import seaborn as sns
+
+VALUE_DECIMALS = 1
+TEMPLATES_PER_THREAD = 32
+
+# palette: seaborn palette name (one colour per bar) or None to use ``color``
+# ylim:    fixed y-range, or None to autoscale to the data
+# rotate:  rotate x labels 30° and tighten the layout (long topic names)
+ChartSpec = namedtuple("ChartSpec", ["name", "figsize", "palette", "color", "ylabel", "ylim", "rotate"])
+
+REPORT_TOPIC = ChartSpec("report_topic", (8, 5), "Blues_d", None, "Accuracy (%)", (0, 100), False)
+REPORT_SUBTOPIC = ChartSpec("report_subtopic", (10, 5), "Greens_d", None, "Accuracy (%)", (0, 100), False)
+REPORT_FUNDAMENTALS = ChartSpec("report_fundamentals", (6, 4), "Oranges_d", None, "Score (%)", (0, 100), False)
+TOPIC_PERFORMANCE = ChartSpec("topic_performance", (7, 5), None, "skyblue", "Accuracy (%)", None, True)
+SUBTOPIC_PERFORMANCE = ChartSpec("subtopic_performance", (7, 5), None, "orange", "Accuracy (%)", None, True)
+
+
+class _LRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+_png_cache = _LRU(int(os.getenv("CHART_CACHE_SIZE", 1024)))
+_local = threading.local()
+
+
+class _BarTemplate:
+    """A pre-built bar chart whose heights and title are updated per render."""
+
+    def __init__(self, spec, labels):
+        self.spec = spec
+        self.fig = Figure(figsize=spec.figsize)
+        self.ax = self.fig.subplots()
+        if spec.palette:
+            colors = sns.color_palette(spec.palette, len(labels))
+        else:
+            colors = spec.color
+        self.bars = self.ax.bar(range(len(labels)), [0] * len(labels), color=colors)
+        self.ax.set_xticks(range(len(labels)))
+        if spec.rotate:
+            self.ax.set_xticklabels(labels, rotation=30, ha="right")
+        else:
+            self.ax.set_xticklabels(labels)
+        if spec.ylim:
+            self.ax.set_ylim(*spec.ylim)
+        self.ax.set_ylabel(spec.ylabel)
+        # Lay out with a placeholder title so tight_layout leaves room for
+        # the real one, which render() sets later.
+        self.title = self.ax.set_title("Title")
+        if spec.rotate:
+            self.fig.tight_layout()
+
+    def render(self, values, title):
+        for bar, value in zip(self.bars, values):
+            bar.set_height(value)
+        if not self.spec.ylim:
+            self.ax.relim()
+            self.ax.autoscale_view()
+        self.title.set_text(title)
+        return _png_bytes(self.fig)
+
+
+def _png_bytes(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def _template(spec, labels):
+    templates = getattr(_local, "templates", None)
+    if templates is None:
+        templates = _local.templates = OrderedDict()
+    key = (spec.name, labels)
+    template = templates.get(key)
+    if template is None:
+        template = templates[key] = _BarTemplate(spec, labels)
+        while len(templates) > TEMPLATES_PER_THREAD:
+            templates.popitem(last=False)
+    templates.move_to_end(key)
+    return template
+
+
+# One shared NaN object: NaN != NaN, but tuples compare items by identity
+# first, so missing scores (e.g. no Moderate questions) still hit the cache.
+_NAN = float("nan")
+
+
+def _round(values):
+    return tuple(_NAN if v != v else round(v, VALUE_DECIMALS) for v in map(float, values))
+
+
+# -------------------- Public API --------------------
+def render_bar(spec, labels, values, title):
+    """PNG bytes of a bar chart of ``values`` over ``labels``."""
+    labels = tuple(str(label) for label in labels)
+    values = _round(values)
+    key = ("bar", spec.name, labels, values, title)
+    png = _png_cache.get(key)
+    if png is None:
+        png = _template(spec, labels).render(values, title)
+        _png_cache.put(key, png)
+    return png
+
+
+def render_pie(values, labels, title, figsize=(5, 5)):
+    """PNG bytes of a pie chart (cached; pies are cheap to rebuild on a miss)."""
+    labels = tuple(labels)
+    values = _round(values)
+    key = ("pie", labels, values, title, figsize)
+    png = _png_cache.get(key)
+    if png is None:
+        fig = Figure(figsize=figsize)
+        ax = fig.subplots()
+        ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+        ax.set_title(title)
+        png = _png_bytes(fig)
+        _png_cache.put(key, png)
+    return png
+
+
+def cache_info():
+    return {"hits": _png_cache.hits, "misses": _png_cache.misses,
+            "size": len(_png_cache), "maxsize": _png_cache.maxsize}
+
+
+def clear_cache():
+    _png_cache.clear()
@@ -1,31 +1,27 @@
 import os
-import pandas as pd
-import matplotlib
-matplotlib.use("Agg")  # Non-GUI backend for server-side plotting
-import matplotlib.pyplot as plt
-import seaborn as sns
+from io import BytesIO
 from docx import Document
 from docx.shared import Inches
 import random
 
+import metrics
+
+from . import charts
+from .aggregation import aggregate
+
 # ------------------ Enhanced Rule-based AI Summary ------------------
-def generate_ai_summary(df):
+def generate_ai_summary(stats):
     """
     Generate a professional, polished summary paragraph with performance analysis and motivation.
-    No student name repeated in the paragraph.
+    No student name repeated in the paragraph. ``stats`` is an ``aggregation.ReportStats``.
     """
-    total_questions = len(df)
-    correct_count = df['is_correct'].sum()
-    accuracy = (correct_count / total_questions) * 100 if total_questions > 0 else 0
-    avg_time = df['time_taken'].mean() if 'time_taken' in df else 0
+    accuracy = stats.accuracy
+    avg_time = stats.average_time
 
     # Identify strengths and weaknesses
-    topic_acc = df.groupby("topic")["is_correct"].mean() * 100
-    strengths = [topic for topic, acc in topic_acc.items() if acc >= 75]
-    weaknesses = [topic for topic, acc in topic_acc.items() if acc < 75]
-
-    subtopic_acc = df.groupby("subtopic")["is_correct"].mean() * 100
-    weak_subtopics = [sub for sub, acc in subtopic_acc.items() if acc < 60]
+    strengths = stats.strengths()
+    weaknesses = stats.weaknesses()
+    weak_subtopics = stats.weak_subtopics()
 
     # Professional phrasing templates
     intro_templates = [
@@ -57,61 +53,43 @@ def generate_ai_summary(df):
     paragraph += random.choice(motivation_templates)
     return paragraph
 
+# ------------------ Charts ------------------
+def render_charts(topic_acc, subtopic_acc, fundamentals):
+    """
+    Render the report's three charts from ``{label: percent}`` dicts;
+    returns {"topic", "subtopic", "fundamentals"} -> PNG BytesIO.
+    """
+    return {
+        "topic": BytesIO(charts.render_bar(
+            charts.REPORT_TOPIC, topic_acc.keys(), topic_acc.values(), "Topic Accuracy")),
+        "subtopic": BytesIO(charts.render_bar(
+            charts.REPORT_SUBTOPIC, subtopic_acc.keys(), subtopic_acc.values(), "Subtopic Accuracy")),
+        "fundamentals": BytesIO(charts.render_bar(
+            charts.REPORT_FUNDAMENTALS, fundamentals.keys(), fundamentals.values(), "Learning Fundamentals")),
+    }
+
 # ------------------ Report Generation ------------------
-def generate_report(solutions, output_dir="reports", student_name="Student"):
+def generate_report(solutions, output_dir="reports", student_name="Student", filename=None):
     """
     Generate a Word report with charts, question-wise analysis, 
     result analysis, and a professional AI-generated motivational paragraph.
     Student name mentioned only once.
+    Saved as ``filename`` in ``output_dir`` (default ``<student_name>_report.docx``).
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    df = pd.DataFrame(solutions)
-    df["is_correct"] = df["is_correct"].astype(bool)
-    df["time_taken"] = df["time_taken"].astype(float)
-
-    # ----- Topic Accuracy -----
-    topic_acc = df.groupby("topic")["is_correct"].mean() * 100
-    plt.figure(figsize=(8,5))
-    sns.barplot(x=topic_acc.index, y=topic_acc.values, palette="Blues_d")
-    plt.ylim(0,100)
-    plt.ylabel("Accuracy (%)")
-    plt.title("Topic Accuracy")
-    topic_chart_path = os.path.join(output_dir, "topic_accuracy.png")
-    plt.savefig(topic_chart_path)
-    plt.close()
-
-    # ----- Subtopic Accuracy -----
-    subtopic_acc = df.groupby("subtopic")["is_correct"].mean() * 100
-    plt.figure(figsize=(10,5))
-    sns.barplot(x=subtopic_acc.index, y=subtopic_acc.values, palette="Greens_d")
-    plt.ylim(0,100)
-    plt.ylabel("Accuracy (%)")
-    plt.title("Subtopic Accuracy")
-    subtopic_chart_path = os.path.join(output_dir, "subtopic_accuracy.png")
-    plt.savefig(subtopic_chart_path)
-    plt.close()
-
-    # ----- Learning Fundamentals -----
-    fundamentals = {
-        "Listening": max(0, 100 - df["time_taken"].mean()),
-        "Grasping": df["is_correct"].mean() * 100,
-        "Retention": 100 - df[~df["is_correct"]].shape[0]/df.shape[0]*100,
-        "Application": df[df.get("difficulty", pd.Series(["Very easy"]*len(df))).isin(["Moderate","Difficult"])]["is_correct"].mean() * 100
-    }
+    # ----- Topic & Subtopic Accuracy, Learning Fundamentals (one pass) -----
+    stats = aggregate(solutions)
+    topic_acc = stats.topic_accuracy()
+    subtopic_acc = stats.subtopic_accuracy()
+    fundamentals = stats.fundamentals()
 
-    plt.figure(figsize=(6,4))
-    sns.barplot(x=list(fundamentals.keys()), y=list(fundamentals.values()), palette="Oranges_d")
-    plt.ylim(0,100)
-    plt.ylabel("Score (%)")
-    plt.title("Learning Fundamentals")
-    fundamentals_chart_path = os.path.join(output_dir, "fundamentals.png")
-    plt.savefig(fundamentals_chart_path)
-    plt.close()
+    with metrics.stage("charts"):
+        images = render_charts(topic_acc, subtopic_acc, fundamentals)
 
     # ----- Generate Word Report -----
-    report_path = os.path.join(output_dir, f"{student_name}_report.docx")
+    report_path = os.path.join(output_dir, filename or f"{student_name}_report.docx")
     doc = Document()
     doc.add_heading(f"{student_name} - Performance Report", 0)
     doc.add_paragraph("This report provides detailed insights into performance by topic, subtopic, and learning fundamentals.\n")
@@ -120,42 +98,50 @@ def generate_report(solutions, output_dir="reports", student_name="Student"):
     doc.add_heading("Learning Fundamentals", level=1)
     for k, v in fundamentals.items():
         doc.add_paragraph(f"{k}: {v:.2f}%")
-    doc.add_picture(fundamentals_chart_path, width=Inches(5))
+    doc.add_picture(images["fundamentals"], width=Inches(5))
 
     # Topic Accuracy
     doc.add_heading("Topic Accuracy", level=1)
-    doc.add_picture(topic_chart_path, width=Inches(5))
+    doc.add_picture(images["topic"], width=Inches(5))
 
     # Subtopic Accuracy
     doc.add_heading("Subtopic Accuracy", level=1)
-    doc.add_picture(subtopic_chart_path, width=Inches(5))
+    doc.add_picture(images["subtopic"], width=Inches(5))
 
     # ----- Result Analysis -----
     doc.add_heading("Result Analysis", level=1)
-    total_questions = len(df)
-    correct_count = df['is_correct'].sum()
-    incorrect_count = total_questions - correct_count
-    avg_time = df['time_taken'].mean()
-    doc.add_paragraph(f"Total Questions: {total_questions}")
-    doc.add_paragraph(f"Correct Answers: {correct_count}")
-    doc.add_paragraph(f"Incorrect Answers: {incorrect_count}")
-    doc.add_paragraph(f"Average Time per Question: {avg_time:.2f} seconds")
+    doc.add_paragraph(f"Total Questions: {stats.total}")
+    doc.add_paragraph(f"Correct Answers: {stats.correct}")
+    doc.add_paragraph(f"Incorrect Answers: {stats.incorrect}")
+    doc.add_paragraph(f"Average Time per Question: {stats.average_time:.2f} seconds")
 
     # Question-wise Performance
     doc.add_heading("Question-wise Performance", level=1)
-    for i, row in df.iterrows():
+    for row in solutions:
         doc.add_paragraph(
             f"Q: {row['question']}\n"
             f"Topic/Subtopic: {row['topic']} / {row['subtopic']}\n"
             f"Your Answer: {row['user_answer']} | Correct Answer: {row['correct_answer']} | "
-            f"{'✅ Correct' if row['is_correct'] else '❌ Incorrect'} | Time Taken: {row['time_taken']}s"
+            f"{'✅ Correct' if row['is_correct'] else '❌ Incorrect'} | Time Taken: {float(row['time_taken'])}s"
         )
 
     # ----- AI-generated Summary & Motivation -----
     doc.add_heading("AI Analysis", level=1)
-    ai_text = generate_ai_summary(df)
+    ai_text = generate_ai_summary(stats)
     doc.add_paragraph(ai_text)
 
-    doc.save(report_path)
+    with metrics.stage("docx_save"):
+        doc.save(report_path)
     print(f"Report generated: {report_path}")
     return report_path
+
+# ------------------ Gemini AI Analysis ------------------
+def append_ai_analysis(report_path, ai_summary):
+    """
+    Append the Gemini-generated analysis as a final section of an existing report.
+    """
+    doc = Document(report_path)
+    doc.add_heading("Gemini AI Analysis", level=1)
+    doc.add_paragraph(ai_summary)
+    doc.save(report_path)
+    return report_path
@@ -1,7 +1,13 @@
 import os
-import matplotlib
-matplotlib.use("Agg")  # Use non-GUI backend
-import matplotlib.pyplot as plt
+
+from . import charts
+
+
+def _write(png, chart_path):
+    with open(chart_path, "wb") as f:
+        f.write(png)
+    return chart_path
+
 
 def plot_accuracy(accuracy, student_id="student", save_dir="backend/reports"):
     """
@@ -11,13 +17,9 @@ def plot_accuracy(accuracy, student_id="student", save_dir="backend/reports"):
     labels = ["Correct", "Incorrect"]
     correct = accuracy
     incorrect = 100 - correct
-    plt.figure(figsize=(5, 5))
-    plt.pie([correct, incorrect], labels=labels, autopct="%1.1f%%", startangle=90)
-    plt.title(f"Accuracy of {student_id}")
+    png = charts.render_pie([correct, incorrect], labels, f"Accuracy of {student_id}")
     chart_path = os.path.join(save_dir, f"{student_id}_accuracy.png")
-    plt.savefig(chart_path)
-    plt.close()
-    return chart_path
+    return _write(png, chart_path)
 
 
 def plot_topic_performance(topic_perf, student_id="student", save_dir="backend/reports"):
@@ -28,16 +30,9 @@ def plot_topic_performance(topic_perf, student_id="student", save_dir="backend/r
     os.makedirs(save_dir, exist_ok=True)
     topics = list(topic_perf.keys())
     scores = list(topic_perf.values())
-    plt.figure(figsize=(7, 5))
-    plt.bar(topics, scores, color="skyblue")
-    plt.ylabel("Accuracy (%)")
-    plt.title(f"Topic Performance - {student_id}")
-    plt.xticks(rotation=30, ha='right')
-    plt.tight_layout()
+    png = charts.render_bar(charts.TOPIC_PERFORMANCE, topics, scores, f"Topic Performance - {student_id}")
     chart_path = os.path.join(save_dir, f"{student_id}_topic_perf.png")
-    plt.savefig(chart_path)
-    plt.close()
-    return chart_path
+    return _write(png, chart_path)
 
 
 def plot_subtopic_performance(subtopic_perf, student_id="student", save_dir="backend/reports"):
@@ -48,13 +43,6 @@ def plot_subtopic_performance(subtopic_perf, student_id="student", save_dir="bac
     os.makedirs(save_dir, exist_ok=True)
     subtopics = list(subtopic_perf.keys())
     scores = list(subtopic_perf.values())
-    plt.figure(figsize=(7, 5))
-    plt.bar(subtopics, scores, color="orange")
-    plt.ylabel("Accuracy (%)")
-    plt.title(f"Subtopic Performance - {student_id}")
-    plt.xticks(rotation=30, ha='right')
-    plt.tight_layout()
+    png = charts.render_bar(charts.SUBTOPIC_PERFORMANCE, subtopics, scores, f"Subtopic Performance - {student_id}")
     chart_path = os.path.join(save_dir, f"{student_id}_subtopic_perf.png")
-    plt.savefig(chart_path)
-    plt.close()
-    return chart_path
\ No newline at end of file
+    return _write(png, chart_path)
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Database models.
+
+``Attempt`` is one graded /submit and ``AnswerRecord`` one answered question
+of it. Attempts are written in batches by ``attempt_log.AttemptWriter``
+rather than through the session, so their ids are generated up front.
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+
+# -------------------- User Model --------------------
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(100), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+
+
+# -------------------- Attempt History --------------------
+class Attempt(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    student = db.Column(db.String(100), nullable=False, index=True)
+    bank_id = db.Column(db.String(64), nullable=False)
+    difficulty = db.Column(db.String(20))
+    result = db.Column(db.String(20))
+    score = db.Column(db.Integer, nullable=False)
+    answered = db.Column(db.Integer, nullable=False)
+    total_time = db.Column(db.Float)
+    average_time = db.Column(db.Float)
+    elapsed_time = db.Column(db.Float)
+    submitted_at = db.Column(db.Float, nullable=False, index=True)
+
+
+class AnswerRecord(db.Model):
+    __tablename__ = "answer_record"
+
+    id = db.Column(db.Integer, primary_key=True)
+    attempt_id = db.Column(db.String(32), db.ForeignKey("attempt.id"), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    bank_id = db.Column(db.String(64), nullable=False)
+    question_id = db.Column(db.Integer, nullable=False)
+    question = db.Column(db.Text)
+    topic = db.Column(db.String(200))
+    subtopic = db.Column(db.String(200))
+    difficulty = db.Column(db.String(20))
+    user_answer = db.Column(db.Text)
+    correct_answer = db.Column(db.Text)
+    is_correct = db.Column(db.Boolean, nullable=False)
+    time_taken = db.Column(db.Float)
+
+    def to_solution(self):
+        """The ``solutions`` entry /submit returned for this answer."""
+        return {
+            "question_id": self.question_id,
+            "question": self.question,
+            "user_answer": self.user_answer,
+            "correct_answer": self.correct_answer,
+            "is_correct": self.is_correct,
+            "time_taken": self.time_taken,
+            "topic": self.topic,
+            "subtopic": self.subtopic,
+            "difficulty": self.difficulty,
+        }
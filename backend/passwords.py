@@ -0,0 +1,107 @@
+"""
+Password hashing and login session tokens.
+
+Hashing is deliberately CPU-heavy, so it runs on a bounded thread pool
+(``hashlib``'s scrypt/PBKDF2 release the GIL): at most
+``PASSWORD_HASH_WORKERS`` hashes run at once per process, and at most
+``PASSWORD_HASH_QUEUE`` more wait; beyond that ``HasherBusy`` is raised and
+the endpoint answers 503 instead of piling up requests.
+
+``PASSWORD_HASH_METHOD`` picks the Werkzeug method and cost (default:
+Werkzeug's, currently ``scrypt``; e.g. ``pbkdf2:sha256:600000``). Stored
+hashes made with other parameters still verify and are re-hashed on the
+next successful login.
+
+/login returns a signed, timestamped session token (``SECRET_KEY``,
+``SESSION_TOKEN_TTL`` seconds) that later requests send as
+``X-Session-Token`` or ``Authorization: Bearer``; app.py answers 401 to a
+forged or expired one.
+"""
+
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.security import check_password_hash, generate_password_hash
+
+HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD") or None
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 64))
+TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", 12 * 3600))
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+if not SECRET_KEY:
+    # Tokens then only verify in the process that issued them.
+    print("⚠️ No SECRET_KEY set; session tokens won't be shared between workers.")
+    SECRET_KEY = secrets.token_hex(32)
+
+
+class HasherBusy(Exception):
+    """Raised when ``PASSWORD_HASH_QUEUE`` hashes are already waiting."""
+
+
+class PasswordHasher:
+    def __init__(self, method=HASH_METHOD, workers=HASH_WORKERS, queue=HASH_QUEUE):
+        self.method = method
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._prefix = None
+
+    def _executor(self):
+        # Pools do not survive fork; each worker process builds its own.
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+                    self._pid = os.getpid()
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        if self.method:
+            return self._run(generate_password_hash, password, self.method)
+        return self._run(generate_password_hash, password)
+
+    def verify(self, stored, password):
+        return self._run(check_password_hash, stored, password)
+
+    @property
+    def prefix(self):
+        """``method:params`` of hashes made now (e.g. ``scrypt:32768:8:1``)."""
+        if self._prefix is None:
+            sample = generate_password_hash("", self.method) if self.method else generate_password_hash("")
+            self._prefix = sample.split("$", 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, stored):
+        return stored.split("$", 1)[0] != self.prefix
+
+
+hasher = PasswordHasher()
+
+# -------------------- Session Tokens --------------------
+_serializer = URLSafeTimedSerializer(SECRET_KEY, salt="session-token")
+
+
+def issue_token(username):
+    return _serializer.dumps({"u": username})
+
+
+def token_username(token, max_age=TOKEN_TTL):
+    """Username in a valid, unexpired token, else None."""
+    try:
+        return _serializer.loads(token, max_age=max_age).get("u")
+    except (BadSignature, AttributeError):
+        return None
@@ -0,0 +1,288 @@
+"""
+In-memory index over an uploaded question bank.
+
+The bank is built once per upload so that /submit and select_questions can
+look questions up by id, difficulty and (topic, subtopic) without scanning
+the whole DataFrame on every request.
+
+A bank is a set of flat arrays (question columns plus indexes), so the same
+structure can be built from a DataFrame at upload time or memory-mapped from
+disk by ``bank_storage``.
+
+pandas is only needed to build a bank from an upload, so it is imported
+there; serving a stored bank never loads it.
+"""
+
+import numpy as np
+
+from sampling import GroupLayout, build_layout
+
+
+def _normalize_level(level):
+    return level.lower() if isinstance(level, str) else None
+
+
+def normalize_answer(answer):
+    """Answer text as /submit compares it: stripped and lower-cased."""
+    return str(answer).strip().lower()
+
+
+def _parse_id(qid):
+    try:
+        return float(qid)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class StringColumn:
+    """
+    Text column stored as one UTF-8 blob plus ``offsets`` (Arrow-style), with a
+    ``nulls`` mask for missing values. All three arrays can be memory-mapped.
+    """
+
+    def __init__(self, data, offsets, nulls):
+        self.data = data
+        self.offsets = offsets
+        self.nulls = nulls
+
+    @classmethod
+    def from_values(cls, values):
+        import pandas as pd
+
+        nulls = pd.isna(values)
+        encoded = [b"" if null else str(v).encode("utf-8") for v, null in zip(values, nulls)]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets, np.asarray(nulls, dtype=bool))
+
+    def __len__(self):
+        return len(self.nulls)
+
+    def __getitem__(self, pos):
+        if self.nulls[pos]:
+            return None
+        return self.data[self.offsets[pos]:self.offsets[pos + 1]].tobytes().decode("utf-8")
+
+    def take(self, positions):
+        return [self[int(pos)] for pos in positions]
+
+    @classmethod
+    def concat(cls, parts):
+        shifts = np.cumsum([0] + [part.offsets[-1] for part in parts[:-1]])
+        offsets = np.concatenate(
+            [np.zeros(1, dtype=np.int64)] + [part.offsets[1:] + shift for part, shift in zip(parts, shifts)]
+        )
+        data = np.concatenate([np.zeros(0, dtype=np.uint8)] + [part.data for part in parts])
+        nulls = np.concatenate([np.zeros(0, dtype=bool)] + [part.nulls for part in parts])
+        return cls(data, offsets, nulls)
+
+
+def _take(column, positions):
+    if isinstance(column, StringColumn):
+        return column.take(positions)
+    return column[positions].tolist()
+
+
+def _column_part(series):
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.to_numpy()
+    return StringColumn.from_values(series.to_numpy(dtype=object))
+
+
+def _concat_column(parts):
+    if all(isinstance(part, np.ndarray) for part in parts):
+        return np.concatenate(parts)
+    # A column that is text in any chunk is text everywhere.
+    parts = [part if isinstance(part, StringColumn) else StringColumn.from_values(part.astype(object))
+             for part in parts]
+    return StringColumn.concat(parts)
+
+
+def _encode(local_codes, local_keys, mapping):
+    """Translate chunk-local factor codes into codes of the running ``mapping`` (key -> code)."""
+    lookup = np.array([mapping.setdefault(key, len(mapping)) for key in local_keys] + [-1], dtype=np.int64)
+    return lookup[np.asarray(local_codes, dtype=np.int64)]
+
+
+class QuestionBankBuilder:
+    """
+    Builds a QuestionBank from one or more standardized DataFrame chunks, so
+    large uploads can be folded into the compact column arrays chunk by chunk
+    instead of being concatenated into one big DataFrame first.
+    """
+
+    def __init__(self):
+        self._names = None
+        self._parts = {}
+        self._ids = []
+        self._level_codes = []
+        self._levels = {}
+        self._group_codes = []
+        self._groups = {}
+
+    def add(self, df):
+        import pandas as pd
+
+        df = df.loc[:, ~df.columns.duplicated()]
+        names = [str(c) for c in df.columns]
+        if self._names is None:
+            self._names = names
+        elif names != self._names:
+            raise ValueError("All chunks of a question bank must have the same columns")
+
+        for name, (_, series) in zip(names, df.items()):
+            self._parts.setdefault(name, []).append(_column_part(series))
+        self._ids.append(pd.to_numeric(df["id"], errors="coerce").to_numpy(dtype=float))
+
+        level_codes, level_keys = pd.factorize(df["difficulty"].map(_normalize_level))
+        self._level_codes.append(_encode(level_codes, level_keys, self._levels))
+
+        grouped = df.groupby(["topic", "subtopic"], sort=False)
+        group_codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        self._group_codes.append(_encode(group_codes, grouped.size().index, self._groups))
+        return self
+
+    def build(self):
+        empty = np.zeros(0, dtype=np.int64)
+        # Concatenate column by column, dropping the chunk parts as we go, so
+        # the peak is one column's worth of duplication rather than the bank's.
+        columns = {name: _concat_column(self._parts.pop(name)) for name in list(self._parts)}
+
+        raw_ids = np.concatenate([np.zeros(0)] + self._ids)
+        valid = ~np.isnan(raw_ids) & (raw_ids == np.floor(raw_ids))
+        ids = np.where(valid, raw_ids, -1).astype(np.int64)
+        sorted_ids, first = np.unique(ids[valid], return_index=True)
+        sorted_pos = np.flatnonzero(valid)[first].astype(np.int64)
+
+        level_codes = np.concatenate([empty] + self._level_codes)
+        levels = {level: np.flatnonzero(level_codes == code) for level, code in self._levels.items()}
+
+        group_codes = np.concatenate([empty] + self._group_codes)
+        layouts = {level: build_layout(pos, group_codes) for level, pos in levels.items()}
+
+        # Answer keys are normalized once here and factorized, so grading is an
+        # integer comparison (-1: the bank has no answer column).
+        if "answer" in columns:
+            import pandas as pd
+
+            keys = [normalize_answer(v) for v in _take(columns["answer"], np.arange(len(ids)))]
+            answer_codes, answer_vocab = pd.factorize(pd.Series(keys, dtype=object))
+            answer_codes, answer_vocab = answer_codes.astype(np.int32), list(answer_vocab)
+        else:
+            answer_codes, answer_vocab = np.full(len(ids), -1, dtype=np.int32), []
+
+        return QuestionBank(columns, ids, sorted_ids, sorted_pos, group_codes,
+                            list(self._groups), levels, layouts, answer_codes, answer_vocab)
+
+
+class QuestionBank:
+    """
+    Question columns plus lookup indexes:
+
+    - ``id -> row position`` via sorted ids (first occurrence wins, like ``.iloc[0]``)
+    - lower-cased difficulty -> sorted row positions
+    - a per-row (topic, subtopic) group code and the list of group keys
+    - per-difficulty ``GroupLayout`` used by ``sampling.stratified_sample``
+    - normalized answer keys as codes into ``answer_vocab``, for ``grading``
+    """
+
+    def __init__(self, columns, ids, sorted_ids, sorted_pos, group_codes, group_keys, levels, layouts,
+                 answer_codes, answer_vocab):
+        self.columns = columns
+        self.ids = ids
+        self.sorted_ids = sorted_ids
+        self.sorted_pos = sorted_pos
+        self.group_codes = group_codes
+        self.group_keys = group_keys
+        self.levels = levels
+        self.layouts = layouts
+        self.answer_codes = answer_codes
+        self.answer_vocab = answer_vocab
+        self._answer_index = {key: code for code, key in enumerate(answer_vocab)}
+        self._group_index = {key: code for code, key in enumerate(group_keys)}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a bank from a standardized question DataFrame."""
+        return QuestionBankBuilder().add(df.reset_index(drop=True)).build()
+
+    def __len__(self):
+        return len(self.ids)
+
+    # -------------------- Lookups --------------------
+    def position(self, qid):
+        """Row position for a question id (``"12"``, ``12.0`` or ``12``), or None."""
+        pos = self.positions([qid])[0]
+        return int(pos) if pos >= 0 else None
+
+    def positions(self, qids):
+        """Row positions for a sequence of question ids in one search (-1 where unknown)."""
+        values = np.array([_parse_id(qid) for qid in qids], dtype=float)
+        # int(float(qid)) semantics: truncate toward zero; inf/nan never match.
+        ok = np.isfinite(values) & (np.abs(values) < 2 ** 62)
+        wanted = np.trunc(np.where(ok, values, 0)).astype(np.int64)
+        i = np.searchsorted(self.sorted_ids, wanted)
+        found = ok & (i < len(self.sorted_ids))
+        i = np.minimum(i, max(len(self.sorted_ids) - 1, 0))
+        if len(self.sorted_ids):
+            found &= self.sorted_ids[i] == wanted
+            return np.where(found, self.sorted_pos[i], -1).astype(np.int64)
+        return np.full(len(values), -1, dtype=np.int64)
+
+    def answer_code(self, answer):
+        """Code of a submitted answer in ``answer_vocab`` (-2 if no question has that key)."""
+        return self._answer_index.get(normalize_answer(answer), -2)
+
+    def record(self, pos):
+        """Question at row ``pos`` as a plain dict."""
+        return self.records([pos])[0]
+
+    def records(self, positions):
+        """Questions at ``positions`` as a list of dicts, in the given order."""
+        positions = np.asarray(positions, dtype=np.int64)
+        values = {name: _take(column, positions) for name, column in self.columns.items()}
+        return [dict(zip(values, row)) for row in zip(*values.values())]
+
+    def row(self, qid):
+        """The question for ``qid`` as a dict, or None if unknown."""
+        pos = self.position(qid)
+        if pos is None:
+            return None
+        return self.record(pos)
+
+    def values(self, name, positions):
+        """Values of column ``name`` at ``positions`` as a list."""
+        return _take(self.columns[name], np.asarray(positions, dtype=np.int64))
+
+    def take(self, positions):
+        """Rows at ``positions`` as a DataFrame, in the given order."""
+        import pandas as pd
+
+        return pd.DataFrame(self.records(positions), columns=list(self.columns))
+
+    def difficulty_positions(self, level):
+        """Row positions of every question at ``level`` (case-insensitive)."""
+        return self.levels.get(_normalize_level(level), np.empty(0, dtype=np.int64))
+
+    def ids_for_difficulty(self, level):
+        return self.ids[self.difficulty_positions(level)]
+
+    def group_positions(self, topic, subtopic):
+        code = self._group_index.get((topic, subtopic))
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.group_codes == code)
+
+    def layout(self, level):
+        """Grouped sampling layout for ``level`` (empty if the level is unknown)."""
+        layout = self.layouts.get(_normalize_level(level))
+        if layout is None:
+            return GroupLayout(np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64))
+        return layout
+
+    def available_positions(self, level, used):
+        """Positions at ``level`` not yet in the ``used`` bitset."""
+        return used.difference(self.difficulty_positions(level))
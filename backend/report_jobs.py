@@ -0,0 +1,222 @@
+"""
+Report generation pipeline and background job queue.
+
+``build_report`` is the full report pipeline (charts + DOCX, then the Gemini
+analysis section); ``cached_report`` runs it through the ``ReportStore``.
+``ReportJobQueue`` runs it on a process pool so that HTTP workers only
+enqueue a job and poll for its status, instead of holding a request open for
+the charts, the DOCX write and the Gemini call.
+
+Job state is a small JSON file per job in ``REPORT_JOBS_DIR`` (default
+``<REPORTS_DIR>/jobs``), written atomically when the job is queued, starts,
+and finishes. Any gunicorn worker can therefore answer ``GET
+/reports/<job_id>``, not only the one that accepted the job, and the queue
+depth limit counts the jobs of all workers on the host.
+
+Each gunicorn worker starts its own pool on its first job, so a host runs
+up to ``WEB_CONCURRENCY`` x ``REPORT_WORKERS`` report processes.
+
+Configuration:
+- ``REPORT_WORKERS``: pool size per HTTP worker (default: half the CPUs
+  divided by ``WEB_CONCURRENCY``, at least 1, so the host total stays near
+  half the CPUs)
+- ``REPORT_QUEUE_DEPTH``: max queued + running jobs (host-wide) before new ones are refused
+- ``REPORT_JOB_TTL``: seconds a finished job stays queryable
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import llm
+import metrics
+from llm_gateway import get_gateway
+from report_store import REPORTS_DIR, ReportStore, report_key
+
+JOBS_DIR = os.getenv("REPORT_JOBS_DIR", os.path.join(REPORTS_DIR, "jobs"))
+JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+FINISHED = ("done", "failed")
+
+
+def build_report(solutions, output_dir, student_name="Student", filename=None):
+    """Generate the DOCX report and, if an LLM is configured, append its analysis."""
+    # matplotlib, seaborn and python-docx load with the first report, not the app.
+    from ml_model import report_generator
+
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = report_generator.generate_report(
+        solutions=solutions,
+        output_dir=output_dir,
+        student_name=student_name,
+        filename=filename
+    )
+
+    if llm.is_enabled():
+        try:
+            ai_summary = get_gateway().generate(llm.report_summary_prompt(student_name))
+            report_generator.append_ai_analysis(report_path, ai_summary.strip())
+        except Exception as e:
+            print("Gemini AI analysis error:", e)
+
+    # Pool processes are long-lived; publish their stage timings now.
+    metrics.REGISTRY.flush()
+    return os.path.abspath(report_path)
+
+
+def cached_report(solutions, output_dir, student_name="Student"):
+    """Stored report for these inputs from the store at ``output_dir``, built on a miss."""
+    key = report_key(solutions, student_name, llm.is_enabled())
+    # A fixed file name: the student name is free text and only names the download.
+    return ReportStore(output_dir).get_or_build(
+        key, lambda workdir: build_report(solutions, workdir, student_name, filename="report.docx"))
+
+
+# -------------------- Job State Files --------------------
+def _job_path(jobs_dir, job_id):
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+
+def write_job(jobs_dir, job_id, **state):
+    """Replace the job's state file (temp file + rename, so readers never see half of it)."""
+    path = _job_path(jobs_dir, job_id)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(dict(state, job_id=job_id, updated=time.time()), f)
+    os.replace(tmp, path)
+
+
+def read_job(jobs_dir, job_id):
+    try:
+        with open(_job_path(jobs_dir, job_id)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def run_job(jobs_dir, job_id, solutions, output_dir, student_name):
+    """Pool entry point: ``cached_report`` with the job's state file kept up to date."""
+    write_job(jobs_dir, job_id, status="running", student_name=student_name)
+    try:
+        path = cached_report(solutions, output_dir, student_name)
+    except Exception as e:
+        write_job(jobs_dir, job_id, status="failed", student_name=student_name, error=str(e))
+        raise
+    write_job(jobs_dir, job_id, status="done", student_name=student_name, path=path)
+    return path
+
+
+def _on_job_done(jobs_dir, job_id, student_name, start):
+    def callback(future):
+        # Recorded in the HTTP worker: submit-to-done time, queue wait included.
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="report_job")
+        error = future.exception()
+        if error is not None:
+            # The pool process may have died before it could record the failure.
+            state = read_job(jobs_dir, job_id)
+            if state is None or state["status"] not in FINISHED:
+                write_job(jobs_dir, job_id, status="failed", student_name=student_name, error=str(error))
+    return callback
+
+
+class QueueFull(Exception):
+    """Raised when ``REPORT_QUEUE_DEPTH`` jobs are already queued or running."""
+
+
+class ReportJobQueue:
+    def __init__(self, max_workers=None, max_pending=None, job_ttl=None, jobs_dir=None):
+        default_workers = max(1, (os.cpu_count() or 2) // 2 // int(os.getenv("WEB_CONCURRENCY", 1)))
+        self.max_workers = max_workers or int(os.getenv("REPORT_WORKERS", default_workers))
+        self.max_pending = max_pending or int(os.getenv("REPORT_QUEUE_DEPTH", 32))
+        self.job_ttl = job_ttl or float(os.getenv("REPORT_JOB_TTL", 3600))
+        self.jobs_dir = os.path.abspath(jobs_dir or JOBS_DIR)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+
+    def _executor(self):
+        # Created lazily (and re-created after a fork) so a preloaded app never
+        # hands a parent's pool to a gunicorn worker.
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._pool_pid = os.getpid()
+        return self._pool
+
+    def _discard_pool(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, solutions, output_dir, student_name="Student"):
+        """Queue a report; returns its job id or raises ``QueueFull``."""
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        with self._lock:
+            pending = self._expire()
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} reports already queued")
+            job_id = uuid.uuid4().hex
+            # Written before submit: the pool process may already be marking it running.
+            write_job(self.jobs_dir, job_id, status="queued", student_name=student_name)
+            args = (run_job, self.jobs_dir, job_id, solutions, output_dir, student_name)
+            try:
+                try:
+                    future = self._executor().submit(*args)
+                except BrokenProcessPool:
+                    # A pool process died (OOM, SIGKILL); the pool refuses all work from then on.
+                    self._discard_pool()
+                    future = self._executor().submit(*args)
+            except Exception:
+                os.remove(_job_path(self.jobs_dir, job_id))
+                raise
+            future.add_done_callback(_on_job_done(self.jobs_dir, job_id, student_name, time.perf_counter()))
+        return job_id
+
+    def status(self, job_id):
+        """
+        ``None`` for unknown jobs, else a dict with ``status`` one of
+        queued / running / done / failed, plus ``path`` or ``error``.
+        """
+        if not JOB_ID.match(job_id):
+            return None
+        state = read_job(self.jobs_dir, job_id)
+        if state is None:
+            return None
+        info = {"job_id": job_id, "student_name": state["student_name"], "status": state["status"]}
+        for field in ("path", "error"):
+            if field in state:
+                info[field] = state[field]
+        return info
+
+    def _expire(self):
+        """Drop state files not updated within ``job_ttl``; returns the number of unfinished jobs."""
+        cutoff = time.time() - self.job_ttl
+        pending = 0
+        with os.scandir(self.jobs_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                state = read_job(self.jobs_dir, entry.name[:-len(".json")])
+                if state is None:
+                    continue
+                if state["updated"] < cutoff:
+                    # Finished long ago, or abandoned by a worker that was killed.
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+                elif state["status"] not in FINISHED:
+                    pending += 1
+        return pending
+
+    def shutdown(self, wait=True):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=wait)
+        self._pool = None
@@ -0,0 +1,123 @@
+"""
+Content-addressed store for generated reports.
+
+A report is saved as ``<REPORTS_DIR>/<key>.docx``, where ``key`` hashes the
+solutions, the student name, ``TEMPLATE_VERSION`` and whether the LLM
+analysis section is on. Posting the same solutions again returns the stored
+file and does not render anything. The friendly ``<student>_report.docx``
+name is only used as the download name.
+
+Reports are rendered into a private temporary directory and then moved into
+place with ``os.replace``. A reader (another gunicorn worker, a report pool
+process) therefore sees either no file or a complete one. Two processes
+rendering the same key both produce a valid file, and the last rename wins.
+
+Retention, applied after every new report:
+- ``REPORT_CACHE_MAX_AGE``: seconds since a report was last served (default 7 days)
+- ``REPORT_CACHE_MAX_BYTES``: total size; least recently served go first (default 512 MiB)
+
+``REPORTS_DIR`` defaults to ``backend/reports`` next to this file, whatever
+the working directory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports"))
+MAX_AGE = float(os.getenv("REPORT_CACHE_MAX_AGE", 7 * 24 * 3600))
+MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Bump when ml_model.report_generator changes what a report looks like.
+TEMPLATE_VERSION = 1
+
+TMP_PREFIX = ".tmp-"
+STALE_TMP_AGE = 3600
+
+
+def report_key(solutions, student_name, ai_analysis=False):
+    """Hex digest identifying the report for these inputs."""
+    payload = json.dumps([TEMPLATE_VERSION, student_name, bool(ai_analysis), solutions],
+                         sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def download_name(student_name):
+    safe = student_name.replace("/", "_").replace("\\", "_")
+    return f"{safe}_report.docx"
+
+
+class ReportStore:
+    def __init__(self, root=REPORTS_DIR, max_age=MAX_AGE, max_bytes=MAX_BYTES):
+        self.root = os.path.abspath(root)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.docx")
+
+    def get(self, key):
+        """Path of the stored report, or ``None``. Marks it as recently served."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_or_build(self, key, build):
+        """
+        Stored report for ``key``, else ``build(output_dir)`` (which writes a
+        report into ``output_dir`` and returns its path) and store the result.
+        """
+        path = self.get(key)
+        if path is not None:
+            return path
+
+        os.makedirs(self.root, exist_ok=True)
+        workdir = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=self.root)
+        try:
+            os.replace(build(workdir), self.path(key))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        self.prune(keep=self.path(key))
+        return self.path(key)
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith(TMP_PREFIX):
+                    # Left behind by a killed worker.
+                    if time.time() - stat.st_mtime > STALE_TMP_AGE:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                elif entry.name.endswith(".docx") and len(entry.name) == 69:  # sha256 hex + ".docx"
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def prune(self, keep=None):
+        """Apply the age and size limits, sparing ``keep``; returns the number of reports removed."""
+        entries = sorted(self._entries())
+        cutoff = time.time() - self.max_age
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                # A worker already sending this file keeps its open handle.
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
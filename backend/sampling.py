@@ -0,0 +1,104 @@
+"""
+Stratified question sampling on precomputed group offset arrays.
+
+For every difficulty level the bank keeps a ``GroupLayout``: the level's row
+positions sorted by (topic, subtopic) group, plus CSR-style offsets marking
+where each group starts. Sampling then reduces to a handful of NumPy
+operations over that layout, with a Python loop only over the (at most
+``num``) groups that actually receive questions.
+
+The allocation matches the original pandas implementation of
+``select_questions``: proportional quotas, floors, then the remaining slots go
+to the largest fractional parts (ties broken by the group's first available
+row).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# order:   row positions at the level, grouped rows first (sorted by group code,
+#          then position), followed by rows whose topic/subtopic is missing
+# offsets: start of each group inside ``order``; offsets[-1] is the number of
+#          grouped rows, so the ungrouped tail is order[offsets[-1]:]
+GroupLayout = namedtuple("GroupLayout", ["order", "offsets"])
+
+
+def build_layout(positions, group_codes):
+    """Build the ``GroupLayout`` for sorted row ``positions``."""
+    codes = group_codes[positions]
+    grouped = codes >= 0
+    ranked = np.argsort(codes[grouped], kind="stable")
+    grouped_pos = positions[grouped][ranked]
+    sorted_codes = codes[grouped][ranked]
+
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1) != 0)
+    offsets = np.append(starts, len(grouped_pos)).astype(np.int64)
+    order = np.concatenate([grouped_pos, positions[~grouped]]).astype(np.int64)
+    return GroupLayout(order, offsets)
+
+
+def allocate(counts, num):
+    """
+    Largest-remainder allocation of ``num`` slots over groups of size ``counts``
+    (already in tie-break order). Returns an int array aligned with ``counts``.
+    """
+    counts = np.asarray(counts)
+    total = counts.sum()
+    if total == 0:
+        return np.zeros(len(counts), dtype=np.int64)
+    quota = (counts / total) * num
+    alloc = quota.astype(np.int64)
+    remaining = num - int(alloc.sum())
+    if remaining > 0:
+        ranked = np.argsort(-(quota - alloc), kind="stable")
+        alloc[ranked[:remaining]] += 1
+    return alloc
+
+
+def _rng(rng):
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def stratified_sample(layout, excluded, num=10, rng=None):
+    """
+    Draw up to ``num`` row positions from ``layout``.
+
+    ``excluded`` is a bool array aligned with ``layout.order`` marking rows that
+    may not be drawn (already used). ``rng`` is a ``numpy.random.Generator``,
+    a seed, or None for fresh entropy.
+    """
+    rng = _rng(rng)
+    order, offsets = layout
+    available = ~np.asarray(excluded, dtype=bool)
+    if not available.any():
+        return np.empty(0, dtype=np.int64)
+
+    starts = offsets[:-1]
+    picked = []
+    if len(starts):
+        counts = np.add.reduceat(available[:offsets[-1]], starts).astype(np.int64)
+        masked = np.where(available, order, np.iinfo(np.int64).max)
+        first = np.minimum.reduceat(masked[:offsets[-1]], starts)
+
+        live = np.flatnonzero(counts)
+        live = live[np.argsort(first[live], kind="stable")]
+        alloc = allocate(counts[live], num)
+
+        for group, take in zip(live[alloc > 0], alloc[alloc > 0]):
+            start, end = offsets[group], offsets[group + 1]
+            candidates = np.flatnonzero(available[start:end]) + start
+            picked.append(rng.choice(candidates, min(take, len(candidates)), replace=False))
+
+    picked = np.concatenate(picked) if picked else np.empty(0, dtype=np.int64)
+    if len(picked) < num:
+        rest = available.copy()
+        rest[picked] = False
+        pool = np.flatnonzero(rest)
+        if len(pool):
+            extra = rng.choice(pool, min(num - len(picked), len(pool)), replace=False)
+            picked = np.concatenate([picked, extra])
+
+    return order[picked[:num]]
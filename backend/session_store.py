@@ -0,0 +1,167 @@
+"""
+Per-student test sessions.
+
+Each student (keyed by username or session token) gets a ``SessionState``
+holding the question bank they are working on, their current difficulty,
+the questions they have already seen (a ``QuestionBitset`` over bank rows),
+when they started and, with adaptive selection, their ability estimates
+(``adaptive.Ability.to_dict()``).
+
+Two backends are available, picked with ``SESSION_BACKEND``:
+
+- ``memory`` (default): in-process dict with TTL eviction. Fine for a single
+  worker / ``flask run``.
+- ``sqlite``: a shared SQLite file (``SESSION_DB_PATH``), so every gunicorn
+  worker sees the same sessions.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+from bitset import QuestionBitset
+
+DEFAULT_DIFFICULTY = "Very easy"
+DEFAULT_TTL = 2 * 3600
+
+
+@dataclass
+class SessionState:
+    bank_id: str = None
+    difficulty: str = DEFAULT_DIFFICULTY
+    used: QuestionBitset = None  # bank row positions already served
+    start_time: float = field(default_factory=time.time)
+    ability: dict = None
+
+    def to_json(self):
+        used = self.used if self.used is not None else QuestionBitset(0)
+        return json.dumps({
+            "bank_id": self.bank_id,
+            "difficulty": self.difficulty,
+            "used": base64.b64encode(used.to_bytes()).decode("ascii"),
+            "bank_size": used.size,
+            "start_time": self.start_time,
+            "ability": self.ability,
+        })
+
+    @classmethod
+    def from_json(cls, raw):
+        data = json.loads(raw)
+        used = QuestionBitset.from_bytes(base64.b64decode(data["used"]), data["bank_size"])
+        return cls(
+            bank_id=data.get("bank_id"),
+            difficulty=data.get("difficulty", DEFAULT_DIFFICULTY),
+            used=used,
+            start_time=data.get("start_time", time.time()),
+            ability=data.get("ability"),
+        )
+
+
+# -------------------- In-process Store --------------------
+class MemorySessionStore:
+    """Sessions in a dict; entries idle for longer than ``ttl`` seconds are evicted."""
+
+    def __init__(self, ttl=DEFAULT_TTL, sweep_every=256):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._sweep_every = sweep_every
+        self._writes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            state, expires = entry
+            if expires < time.time():
+                del self._sessions[key]
+                return None
+            return state
+
+    def save(self, key, state):
+        now = time.time()
+        with self._lock:
+            self._sessions[key] = (state, now + self.ttl)
+            self._writes += 1
+            if self._writes % self._sweep_every == 0:
+                self._sweep(now)
+
+    def delete(self, key):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def _sweep(self, now):
+        expired = [key for key, (_, expires) in self._sessions.items() if expires < now]
+        for key in expired:
+            del self._sessions[key]
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+# -------------------- Shared SQLite Store --------------------
+class SQLiteSessionStore:
+    """Sessions in a SQLite file shared by all worker processes."""
+
+    def __init__(self, path, ttl=DEFAULT_TTL, sweep_every=256):
+        self.path = os.path.abspath(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        self._sweep_every = sweep_every
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "key TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE key = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return SessionState.from_json(row[0]) if row else None
+
+    def save(self, key, state):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, data, expires) VALUES (?, ?, ?)",
+                (key, state.to_json(), now + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % self._sweep_every == 0:
+                conn.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def create_session_store():
+    """Build the store selected by ``SESSION_BACKEND`` / ``SESSION_TTL`` / ``SESSION_DB_PATH``."""
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    ttl = float(os.getenv("SESSION_TTL", DEFAULT_TTL))
+    if backend == "sqlite":
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db")
+        return SQLiteSessionStore(os.getenv("SESSION_DB_PATH", default_path), ttl=ttl)
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    return MemorySessionStore(ttl=ttl)